@@ -1,8 +1,10 @@
+import sys
 import tkinter as tk
 from utils.app_launcher_classes import AppLauncher
 
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app_launcher = AppLauncher(root)
+    # --isolated runs each app in its own process
+    app_launcher = AppLauncher(root, isolated="--isolated" in sys.argv)
     root.mainloop()
\ No newline at end of file
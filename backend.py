@@ -1,23 +1,82 @@
 import os
-from jnius import autoclass, PythonJavaClass, java_method
+import json
+from utils.notes_index import NoteIndex
+from utils.notes_manifest import NoteManifest
+from utils.note_history import NoteHistory
+from utils.encryption import TOKEN_PREFIX, VaultLocked, get_vault
 
-# Define the Java class for the MethodChannel
-PythonActivity = autoclass('org.kivy.android.PythonActivity')
-Context = autoclass('android.content.Context')
-Environment = autoclass('android.os.Environment')
+try:
+    from jnius import autoclass, PythonJavaClass, java_method
+    HAS_JNIUS = True
+except ImportError:
+    # Local stand-ins so the handler can be exercised off-device
+    HAS_JNIUS = False
+
+    class PythonJavaClass:
+        pass
+
+    def java_method(signature, name=None):
+        def decorator(function):
+            return function
+        return decorator
+
+    def autoclass(name):
+        raise RuntimeError(f"jnius is not available to load '{name}'")
+
+if HAS_JNIUS:
+    # Define the Java class for the MethodChannel
+    PythonActivity = autoclass('org.kivy.android.PythonActivity')
+    Context = autoclass('android.content.Context')
+    Environment = autoclass('android.os.Environment')
+
+# Upper bound on notes returned by a single paginated call
+MAX_PAGE_SIZE = 200
+DEFAULT_PREVIEW_CHARS = 120
 
 # Define the Python class that will handle the method calls
 class MethodHandler(PythonJavaClass):
     __javacontext__ = 'app'
 
+    def __init__(self, notes_dir="notes"):
+        super().__init__()
+        self.note_index = NoteIndex(notes_dir)
+        self.manifest = NoteManifest(notes_dir)
+        self.vault = get_vault()
+        self.history = NoteHistory(notes_dir, vault=self.vault)
+
+    def _read_note(self, title, limit=None):
+        """
+        Read a note, or only its first `limit` characters. Encrypted notes
+        are decrypted; raises VaultLocked until unlockVault() succeeded.
+        """
+        with open(self.note_index.note_path(title), "r") as file:
+            head = file.read(len(TOKEN_PREFIX))
+            if head == TOKEN_PREFIX:
+                # Sealed notes can only be decrypted whole
+                text = self.vault.open(head + file.read(), title)
+            else:
+                text = head + (file.read() if limit is None else file.read(max(0, limit - len(head))))
+        return text if limit is None else text[:limit]
+
+    def _page(self, offset, limit, sort_key):
+        """Return (total, titles) for one page of the cached note index."""
+        self.note_index.refresh()
+        reverse = sort_key.startswith("-")
+        sort_key = sort_key.lstrip("-").capitalize() or "Title"
+        titles = self.note_index.query(sort_key=sort_key, reverse=reverse)
+        offset = max(0, int(offset))
+        limit = max(0, min(int(limit), MAX_PAGE_SIZE))
+        return len(titles), titles[offset:offset + limit]
+
     @java_method('(Ljava/lang/String;)Ljava/lang/String;')
     def getNoteContent(self, title):
         """Fetch note content from local storage."""
         try:
-            with open(f"notes/{title}.txt", "r") as file:
-                return file.read()
+            return self._read_note(title)
         except FileNotFoundError:
             return f"Note '{title}' not found locally."
+        except VaultLocked:
+            return f"Note '{title}' is encrypted; unlock the vault first."
         except Exception as e:
             return f"Failed to load note content: {e}"
 
@@ -25,22 +84,150 @@ class MethodHandler(PythonJavaClass):
     def getNotes(self):
         """Fetch notes locally from device storage."""
         try:
-            notes_dir = "notes"
-            if not os.path.exists(notes_dir):
-                os.makedirs(notes_dir)
-            return [f[:-4] for f in os.listdir(notes_dir) if f.endswith(".txt")]
+            self.note_index.refresh()
+            return self.note_index.titles()
         except Exception as e:
             return [f"Failed to load notes: {e}"]
 
+    @java_method('(IILjava/lang/String;)Ljava/lang/String;')
+    def getNotesPage(self, offset, limit, sortKey):
+        """
+        Fetch one page of note titles as JSON.
+
+        sortKey is "title", "modified" or "size"; prefix it with "-" to
+        reverse the order.
+        """
+        try:
+            total, titles = self._page(offset, limit, sortKey)
+            notes = []
+            for title in titles:
+                modified, size = self.note_index.entries[title]
+                notes.append({"title": title, "modified": modified, "size": size})
+            return json.dumps({"total": total, "offset": offset, "notes": notes})
+        except Exception as e:
+            return json.dumps({"error": f"Failed to load notes: {e}"})
+
+    @java_method('(IILjava/lang/String;I)Ljava/lang/String;')
+    def getNotePreviews(self, offset, limit, sortKey, previewChars):
+        """
+        Fetch one page of notes with a short preview of each, as JSON.
+
+        Only the first previewChars characters of each note are read.
+        """
+        try:
+            total, titles = self._page(offset, limit, sortKey)
+            preview_chars = previewChars if previewChars > 0 else DEFAULT_PREVIEW_CHARS
+            notes = []
+            for title in titles:
+                try:
+                    notes.append({"title": title, "preview": self._read_note(title, preview_chars)})
+                except FileNotFoundError:
+                    continue
+                except (VaultLocked, ValueError):
+                    notes.append({"title": title, "preview": "", "locked": True})
+            return json.dumps({"total": total, "offset": offset, "notes": notes})
+        except Exception as e:
+            return json.dumps({"error": f"Failed to load notes: {e}"})
+
+    @java_method('(Ljava/lang/String;)Ljava/lang/String;')
+    def getNotesContent(self, titlesJson):
+        """
+        Fetch the content of many notes in one call.
+
+        titlesJson is a JSON array of titles; the result maps each title to
+        its content, and lists the titles that could not be read and the
+        encrypted ones that stay locked until unlockVault().
+        """
+        try:
+            titles = json.loads(titlesJson)
+        except ValueError as e:
+            return json.dumps({"error": f"Invalid title list: {e}"})
+
+        notes, missing, locked = {}, [], []
+        for title in titles[:MAX_PAGE_SIZE]:
+            try:
+                notes[title] = self._read_note(title)
+            except VaultLocked:
+                locked.append(title)
+            except (OSError, ValueError):
+                missing.append(title)
+        return json.dumps({"notes": notes, "missing": missing, "locked": locked})
+
     @java_method('(Ljava/lang/String;Ljava/lang/String;)V')
     def saveNote(self, title, content):
         """Save the current note."""
         try:
-            with open(f"notes/{title}.txt", "w") as file:
-                file.write(content)
+            os.makedirs(self.note_index.notes_dir, exist_ok=True)
+            stored = self.vault.seal(content, title)
+            self.history.seed(title, self.note_index.note_path(title),
+                              lambda previous: self.vault.open(previous, title))
+            with open(self.note_index.note_path(title), "w") as file:
+                file.write(stored)
+            # Manifest first: its write touches the folder, the index sync must come after
+            self.manifest.record_save(title, stored)
+            self.history.record(title, content)
+            self.note_index.update(title)
         except Exception as e:
             print(f"Failed to save note: {e}")
 
+    @java_method('(Ljava/lang/String;)Z')
+    def deleteNote(self, title):
+        """Delete a note from local storage."""
+        try:
+            os.remove(self.note_index.note_path(title))
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Failed to delete note: {e}")
+            return False
+        self.manifest.record_delete(title)
+        self.note_index.remove(title)
+        return True
+
+    @java_method('(Ljava/lang/String;)Z')
+    def unlockVault(self, passphrase):
+        """Unlock encrypted notes for this session; False if the passphrase is wrong."""
+        if not self.vault.enabled or self.vault.unlocked:
+            return True
+        try:
+            return self.vault.unlock(passphrase)
+        except RuntimeError as e:
+            print(f"Failed to unlock notes: {e}")
+            return False
+
+    @java_method('()Ljava/lang/String;')
+    def getManifestHash(self):
+        """Return the current root hash of the notes manifest."""
+        self._sync_manifest()
+        return self.manifest.root_hash
+
+    @java_method('(Ljava/lang/String;)Ljava/lang/String;')
+    def getChangesSince(self, manifestHash):
+        """
+        Return the titles added, changed and removed since manifestHash, as JSON.
+
+        The response carries the new manifest hash to pass on the next call.
+        If manifestHash is unknown, "reset" is true and every title is listed
+        as added.
+        """
+        try:
+            self._sync_manifest()
+            return json.dumps(self.manifest.changes_since(manifestHash))
+        except Exception as e:
+            return json.dumps({"error": f"Failed to compute changes: {e}"})
+
+    def _sync_manifest(self):
+        """
+        Pick up notes edited outside the handler before answering.
+
+        The folder's mtime only changes when notes are added or removed, and
+        other calls consume that change through refresh(), so every note is
+        re-stat'ed here; reconcile() then rehashes only the notes whose
+        (mtime, size) differ from the manifest.
+        """
+        self.note_index.refresh(force=True)
+        self.manifest.reconcile(self.note_index.entries)
+
 # Set up the MethodChannel
 def setup_channel():
     activity = PythonActivity.mActivity
@@ -51,4 +238,5 @@ def setup_channel():
     method_channel.setMethodCallHandler(handler)
 
 # Call the setup function to initialize the channel
-setup_channel()
\ No newline at end of file
+if HAS_JNIUS:
+    setup_channel()
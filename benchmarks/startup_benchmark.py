@@ -0,0 +1,95 @@
+"""
+Cold-start profile of the app launcher.
+
+Run from the repository root:
+
+    python benchmarks/startup_benchmark.py [runs]
+
+Import time: runs `python -X importtime` on the launcher module in a fresh
+interpreter and lists the slowest imports, next to bare tkinter. Nothing
+an app needs (pyperclip, the note indexes, ...) should show up here; apps
+are imported on first launch.
+
+Window time (needs a display): spawns app_launcher's setup in a fresh
+process and times it until the first window is drawn, against a bare Tk
+window, median of several runs.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BARE_TK = """
+import tkinter as tk
+root = tk.Tk()
+root.update()
+root.destroy()
+"""
+
+LAUNCHER = """
+import tkinter as tk
+from utils.app_launcher_classes import AppLauncher
+root = tk.Tk()
+AppLauncher(root)
+root.update()
+root.destroy()
+"""
+
+
+def import_profile(module):
+    """Returns [(cumulative_us, self_us, name)] from -X importtime for one module."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows
+
+
+def report_imports():
+    baseline = import_profile("tkinter")
+    rows = import_profile("utils.app_launcher_classes")
+    total = next(cumulative for cumulative, _, name in rows if name.strip() == "utils.app_launcher_classes")
+    tk_total = next(cumulative for cumulative, _, name in baseline if name.strip() == "tkinter")
+    print(f"Import time: launcher module {total / 1000:.1f} ms, bare tkinter {tk_total / 1000:.1f} ms")
+    print("  slowest imports (self time):")
+    for cumulative, self_us, name in sorted(rows, key=lambda row: row[1], reverse=True)[:10]:
+        print(f"    {self_us / 1000:7.2f} ms  {name.strip()}")
+
+
+def time_process(code, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), None
+
+
+def report_window(runs):
+    bare, error = time_process(BARE_TK, runs)
+    if error:
+        print(f"Window time skipped ({error})")
+        return
+    launcher, error = time_process(LAUNCHER, runs)
+    if error:
+        print(f"Launcher failed to start ({error})")
+        return
+    print(f"Process start to first window, median of {runs}:")
+    print(f"  bare Tk     {bare * 1000:8.1f} ms")
+    print(f"  launcher    {launcher * 1000:8.1f} ms   (+{(launcher - bare) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    report_imports()
+    report_window(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
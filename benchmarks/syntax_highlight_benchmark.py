@@ -0,0 +1,133 @@
+"""
+Per-keystroke cost of incremental syntax highlighting.
+
+Run from the repository root:
+
+    python benchmarks/syntax_highlight_benchmark.py [lines]
+
+The engine part runs anywhere. When a display is available the same
+keystrokes are also typed into a real Text widget with the observer and
+SyntaxHighlighter attached, which includes the Tk tagging cost.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.syntax_highlight import LineStates, PythonLanguage  # noqa: E402
+
+SAMPLE = '''@decorator
+def function_{n}(value, other=0x1F):
+    """Docstring for {n}."""
+    # A comment with "quotes"
+    result = [item * 2 for item in range(value) if item % 3]
+    return {{"key": result, "count": len(result), "ratio": 1.5e3}}
+'''
+KEYSTROKES = 2000
+
+
+def make_document(lines):
+    blocks = []
+    while len(blocks) * 6 < lines:
+        blocks.append(SAMPLE.format(n=len(blocks)))
+    return "".join(blocks).split("\n")
+
+
+def report(label, timings):
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    p99 = timings[int(len(timings) * 0.99)]
+    print(f"  {label:<34} mean {mean * 1e6:9.1f} us   p99 {p99 * 1e6:9.1f} us")
+
+
+def bench_engine(lines):
+    language = PythonLanguage()
+    random.seed(0)
+    targets = [random.randrange(len(lines)) for _ in range(KEYSTROKES)]
+
+    # Incremental: record the edit, re-lex until the states converge, lex the line for tagging
+    states = LineStates(language, len(lines))
+    states.relex(lines.__getitem__, len(lines), len(lines))
+    incremental = []
+    for target in targets:
+        started = time.perf_counter()
+        lines[target] += "x"
+        states.edit(target, 0, 0)
+        states.relex(lines.__getitem__, target + 40, 10 ** 9)
+        states.tokens(target, lines[target])
+        incremental.append(time.perf_counter() - started)
+
+    # Starting a triple-quoted string flips the state of every following
+    # line, so re-lexing runs up to the margin below the edit
+    flips = []
+    for target in targets[:200]:
+        started = time.perf_counter()
+        lines[target] += '"""'
+        states.edit(target, 0, 0)
+        states.relex(lines.__getitem__, target + 40, 10 ** 9)
+        flips.append(time.perf_counter() - started)
+        lines[target] = lines[target][:-3]
+        states.edit(target, 0, 0)
+        states.relex(lines.__getitem__, len(lines), 10 ** 9)
+
+    # Baseline: re-lex the whole buffer on every key
+    full = []
+    for target in targets[:20]:
+        started = time.perf_counter()
+        state = None
+        for line in lines:
+            _, state = language.lex_line(line, state)
+        full.append(time.perf_counter() - started)
+
+    print(f"Engine, {len(lines):,} lines:")
+    report("incremental keystroke", incremental)
+    report("keystroke opening a string", flips)
+    report("full re-lex per keystroke", full)
+
+
+def bench_tk(lines):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"Tk benchmark skipped ({e})")
+        return
+
+    from utils.text_observer import TextObserver
+    from utils.syntax_highlight import SyntaxHighlighter
+
+    root.geometry("900x700")
+    text_area = tk.Text(root)
+    text_area.pack(fill=tk.BOTH, expand=True)
+    observer = TextObserver(text_area)
+    highlighter = SyntaxHighlighter(text_area, observer)
+    text_area.insert("1.0", "\n".join(lines))
+    highlighter.set_language(PythonLanguage())
+    root.update()
+    while highlighter._after_id is not None:
+        root.update()
+
+    random.seed(1)
+    text_area.see(f"{len(lines) // 2}.0")
+    root.update()
+    first = int(text_area.index("@0,0").split(".")[0])
+    timings = []
+    for _ in range(KEYSTROKES // 4):
+        line = first + random.randrange(30)
+        started = time.perf_counter()
+        text_area.insert(f"{line}.end", "x")
+        highlighter.update()
+        timings.append(time.perf_counter() - started)
+
+    print(f"Tk, {len(lines):,} lines:")
+    report("insert + highlight visible region", timings)
+    root.destroy()
+
+
+if __name__ == "__main__":
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    document = make_document(line_count)
+    bench_engine(list(document))
+    bench_tk(document)
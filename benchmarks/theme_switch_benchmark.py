@@ -0,0 +1,119 @@
+"""
+Cost of a theme switch on a large widget tree.
+
+Run from the repository root (needs a display):
+
+    python benchmarks/theme_switch_benchmark.py [widgets]
+
+Builds a window with the given number of widgets (5,000 by default) in the
+mix the apps use, then times switching themes with the old recursive walk
+(an isinstance chain and one configure call per widget) against the
+ThemeManager registry, which reconfigures each role in one batched call.
+Both timings include the redraw.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.theme_manager_classes import ThemeManager  # noqa: E402
+
+SWITCHES = 20
+PER_FRAME = 50
+
+
+def build_tree(root, widget_count):
+    import tkinter as tk
+
+    created = 0
+    column = 0
+    while created < widget_count:
+        frame = tk.Frame(root)
+        frame.grid(row=0, column=column, sticky="n")
+        created += 1
+        for i in range(min(PER_FRAME, widget_count - created)):
+            kind = i % 5
+            if kind == 0:
+                widget = tk.Button(frame, text=f"Button {created}")
+            elif kind == 1:
+                widget = tk.Entry(frame, width=8)
+            elif kind == 2:
+                widget = tk.Checkbutton(frame, text="Check")
+            else:
+                widget = tk.Label(frame, text=f"Tile {created}", relief="solid", borderwidth=1)
+            widget.pack(fill="x")
+            created += 1
+        column += 1
+
+
+def legacy_apply(widget, bg_color, fg_color, button_bg, button_fg):
+    """The recursive walk ThemeManager used before the registry."""
+    import tkinter as tk
+    from tkinter import ttk
+
+    for child in widget.winfo_children():
+        if isinstance(child, (ttk.Combobox, ttk.Button, ttk.Entry, ttk.Label, ttk.Frame)):
+            continue
+        if isinstance(child, (tk.Frame, tk.Canvas, tk.PanedWindow, tk.LabelFrame)):
+            child.config(bg=bg_color)
+        if isinstance(child, (tk.Button, tk.Checkbutton, tk.Radiobutton, tk.Message)):
+            child.config(bg=bg_color, fg=fg_color)
+        if isinstance(child, tk.Entry):
+            child.config(bg=button_bg, fg=fg_color, insertbackground=fg_color)
+        elif isinstance(child, tk.Text):
+            child.config(bg=button_bg, fg=fg_color, insertbackground=fg_color)
+        if isinstance(child, tk.Menu):
+            child.config(bg=button_bg, fg=fg_color)
+        if isinstance(child, (tk.Label, tk.Button)):
+            child.config(bg=button_bg, fg=button_fg, activebackground=button_bg, activeforeground=button_fg)
+        legacy_apply(child, bg_color, fg_color, button_bg, button_fg)
+
+
+def report(label, timings):
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    print(f"  {label:<30} mean {mean * 1e3:8.2f} ms   max {timings[-1] * 1e3:8.2f} ms")
+
+
+def main(widget_count):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"Theme benchmark skipped ({e})")
+        return
+
+    build_tree(root, widget_count)
+    manager = ThemeManager()
+    started = time.perf_counter()
+    manager.apply_theme(root, "dark")  # Registers the existing tree once
+    root.update()
+    first_apply = time.perf_counter() - started
+
+    legacy = []
+    theme = "dark"
+    for _ in range(SWITCHES):
+        theme = "light" if theme == "dark" else "dark"
+        started = time.perf_counter()
+        root.config(bg=manager.get_theme_colors(theme)[0])
+        legacy_apply(root, *manager.get_theme_colors(theme))
+        root.update_idletasks()
+        legacy.append(time.perf_counter() - started)
+
+    registry = []
+    for _ in range(SWITCHES):
+        started = time.perf_counter()
+        manager.toggle_theme(root)
+        root.update_idletasks()
+        registry.append(time.perf_counter() - started)
+
+    registered = sum(len(widgets) for widgets in manager.widgets.values())
+    print(f"{registered:,} registered widgets (first apply incl. registration {first_apply * 1e3:.1f} ms):")
+    report("recursive walk per switch", legacy)
+    report("registry per switch", registry)
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,31 @@
+import argparse
+import sys
+from utils import bulk_transfer
+
+
+# Bulk export/import of clipboard history and notes as gzip-compressed NDJSON.
+# Run with the apps closed, e.g.:
+#   python bulk_transfer.py export notes notes.ndjson.gz
+#   python bulk_transfer.py import clips clips.ndjson.gz
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or import clipboard history and notes.")
+    parser.add_argument("action", choices=("export", "import"))
+    parser.add_argument("store", choices=("clips", "notes"))
+    parser.add_argument("path", help="export file (.ndjson.gz)")
+    parser.add_argument("--notes-dir", default="notes")
+    parser.add_argument("--history-file", default="clipboard_history.json")
+    args = parser.parse_args()
+
+    try:
+        if args.store == "clips":
+            if args.action == "export":
+                stats = bulk_transfer.export_clips(args.path, args.history_file)
+            else:
+                stats = bulk_transfer.import_clips(args.path, args.history_file)
+        elif args.action == "export":
+            stats = bulk_transfer.export_notes(args.path, args.notes_dir)
+        else:
+            stats = bulk_transfer.import_notes(args.path, args.notes_dir)
+    except (OSError, ValueError) as e:
+        sys.exit(f"{args.action.capitalize()} failed: {e}")
+    print(stats.summary())
@@ -1,15 +1,12 @@
-import threading
 import tkinter as tk
-from utils.clipboard_classes import ClipboardManager, ClipboardApp
+from utils.clipboard_classes import launch_clipboard_app
+from utils.encryption import UnlockCancelled
 
 
-clipboard_manager = ClipboardManager()
-
-# Run the clipboard monitoring in a separate thread
-monitor_thread = threading.Thread(target=clipboard_manager.monitor_clipboard)
-monitor_thread.daemon = True
-monitor_thread.start()
-
 root = tk.Tk()
-app = ClipboardApp(root, clipboard_manager)
-root.mainloop()
\ No newline at end of file
+try:
+    app = launch_clipboard_app(root)
+except UnlockCancelled:
+    root.destroy()
+else:
+    root.mainloop()
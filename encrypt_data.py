@@ -0,0 +1,91 @@
+import getpass
+import json
+import os
+import shutil
+import sys
+from utils.encryption import get_vault, is_sealed
+from utils.note_history import NoteHistory
+from utils.notes_index import NoteIndex
+from utils.notes_manifest import NoteManifest, content_hash
+
+
+def seal_clips(vault, history_file="clipboard_history.json"):
+    if not os.path.exists(history_file):
+        return 0
+    with open(history_file, "r") as f:
+        stored = json.load(f)
+    sealed = [value if is_sealed(value) else vault.seal(value, "clip") for value in stored]
+    tmp_path = f"{history_file}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(sealed, f)
+    os.replace(tmp_path, history_file)
+    return sum(1 for value in stored if not is_sealed(value))
+
+
+def seal_notes(vault, notes_dir="notes"):
+    """Seals every plaintext note in place."""
+    index = NoteIndex(notes_dir)
+    index.refresh()
+    manifest = NoteManifest(notes_dir)
+    batch = []
+    for title in index.entries:
+        path = index.note_path(title)
+        with open(path, "r") as f:
+            content = f.read()
+        if is_sealed(content):
+            continue
+        stored = vault.seal(content, title)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(stored)
+        os.replace(tmp_path, path)
+        stat = os.stat(path)
+        batch.append((title, content_hash(stored), stat.st_mtime, stat.st_size))
+    manifest.record_batch(batch)
+    return len(batch)
+
+
+def seal_history(vault, notes_dir="notes"):
+    """
+    Rewrites the note history sealed. Every revision is replayed from the
+    plaintext store into a fresh one, so objects are encrypted and their
+    names and revision hashes become keyed digests; the old store is then
+    removed.
+    """
+    plain = NoteHistory(notes_dir)
+    if not os.path.isdir(plain.root):
+        return 0
+    sealed = NoteHistory(notes_dir, ".history.sealing", vault=vault)
+    shutil.rmtree(sealed.root, ignore_errors=True)
+    count = 0
+    for name in os.listdir(plain.root):
+        if not name.endswith(".log"):
+            continue
+        title = name[:-len(".log")]
+        for entry in plain.versions(title):
+            if sealed.record(title, plain.restore(title, entry["rev"]), when=entry["time"]) is not None:
+                count += 1
+    os.makedirs(sealed.root, exist_ok=True)
+    retired = f"{plain.root}.plain"
+    os.replace(plain.root, retired)
+    os.replace(sealed.root, plain.root)
+    shutil.rmtree(retired)
+    return count
+
+
+# Turns on encryption at rest: creates the key file for a new passphrase and
+# seals the existing clipboard history, notes and note history. Run with the
+# apps closed.
+if __name__ == "__main__":
+    vault = get_vault()
+    if vault.enabled:
+        sys.exit(f"Encryption is already enabled ({vault.key_file}).")
+    passphrase = getpass.getpass("New passphrase: ")
+    if not passphrase or passphrase != getpass.getpass("Repeat passphrase: "):
+        sys.exit("Passphrases are empty or do not match.")
+    try:
+        vault.enable(passphrase)
+    except RuntimeError as e:
+        sys.exit(str(e))
+    print(f"Sealed {seal_clips(vault)} clips, {seal_notes(vault)} notes and {seal_history(vault)} note revisions. "
+          f"Keep your passphrase: without it the data cannot be recovered.")
@@ -1,9 +1,14 @@
 import tkinter as tk
 from utils.notes_class import NoteTakerApp
+from utils.encryption import UnlockCancelled
 
 
 # Main application
 if __name__ == "__main__":
     root = tk.Tk()
-    app = NoteTakerApp(root)
-    root.mainloop()
\ No newline at end of file
+    try:
+        app = NoteTakerApp(root)
+    except UnlockCancelled:
+        root.destroy()
+    else:
+        root.mainloop()
\ No newline at end of file
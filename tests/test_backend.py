@@ -0,0 +1,44 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from backend import MethodHandler
+
+
+class ManifestSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.notes_dir = tempfile.mkdtemp()
+        self.handler = MethodHandler(self.notes_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.notes_dir, ignore_errors=True)
+
+    def write_note(self, title, content):
+        with open(os.path.join(self.notes_dir, f"{title}.txt"), "w") as f:
+            f.write(content)
+
+    def test_added_note_is_reported_after_get_notes(self):
+        self.write_note("Todo", "call back")
+        start = self.handler.getManifestHash()
+        self.write_note("Groceries", "milk")
+        # getNotes() consumes the folder change before the manifest sees it
+        self.assertEqual(sorted(self.handler.getNotes()), ["Groceries", "Todo"])
+        changes = json.loads(self.handler.getChangesSince(start))
+        self.assertFalse(changes["reset"])
+        self.assertEqual(changes["added"], ["Groceries"])
+
+    def test_in_place_edit_is_reported(self):
+        self.write_note("Groceries", "milk")
+        start = self.handler.getManifestHash()
+        self.handler.getNotes()
+        path = os.path.join(self.notes_dir, "Groceries.txt")
+        self.write_note("Groceries", "milk and eggs")
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+        changes = json.loads(self.handler.getChangesSince(start))
+        self.assertEqual(changes["changed"], ["Groceries"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,35 @@
+import os
 import tkinter as tk
-from tkinter import filedialog, messagebox, font
-from tkinter.scrolledtext import ScrolledText
-from utils.theme_manager_classes import ThemeManager
+from tkinter import filedialog, messagebox, font, simpledialog, ttk
+from utils.theme_manager_classes import get_theme_manager
 from utils.message_popup import MessagePopup
+from utils.notifications import notify
+from utils.editor_document import EditorDocument
+from utils.file_loader import TEXT_ENCODING, ChunkedFileLoader, TdatFileLoader, file_stat
+from utils import tdat_format
+from utils.background_worker import BackgroundWorker, atomic_write
+from utils.swap_file import SwapFile
+from utils.large_file_viewer import LargeFileViewer
+from utils.find_replace import FindReplaceBar
+from utils import profiling
+from utils.file_follower import FileFollower
+from utils.syntax_highlight import LANGUAGES, language_for_path
+from utils.text_stats import count_text
+
+# Plain text files above this size open in the read-only viewer
+LARGE_FILE_BYTES = 200 * 1024 * 1024
+
+# Tabs beyond this many keep a dormant buffer instead of a Text widget
+MAX_LIVE_DOCUMENTS = 4
+
+# Follow mode keeps at most this many lines (0 keeps everything)
+FOLLOW_MAX_LINES = 100000
+
+# How often the status bar counts are checked against a full recount
+STATS_RECOUNT_INTERVAL_MS = 30000
+
+# How often edits are journaled to the crash-recovery swap file
+AUTOSAVE_INTERVAL_MS = 15000
 
 class TextEditorApp:
     def __init__(self, root):
@@ -11,44 +38,248 @@ class TextEditorApp:
         self.root.title("Text Editor")
         self.root.minsize(845, 600)
 
-        # Initialize Theme Manager
-        self.theme_manager = ThemeManager()
+        # Theme state is shared by every window in the process
+        self.theme_manager = get_theme_manager()
+        self.theme_manager.subscribe(self.on_theme_changed, owner=root)
         bg_color, fg_color, button_bg, button_fg = self.theme_manager.get_theme_colors(self.theme_manager.current_theme)
 
-        # Create a container frame for the text area with fixed size
+        # Status bar: counts are maintained from edit deltas, not rescans
+        self.status_bar = tk.Label(root, text="", anchor=tk.W, bg=bg_color, fg=fg_color)
+        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X, padx=5)
+        self._status_after_id = None
+
+        # Create a container frame for the tabs with fixed size
         self.text_frame = tk.Frame(root, bg=bg_color)
         self.text_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Text area with scrollbars - fixed size (adjust width and height as needed)
-        self.text_area = ScrolledText(
-            self.text_frame, 
-            wrap="word", 
-            undo=True, 
-            bg=bg_color, 
-            fg=fg_color,
-            width=80,  # Characters wide
-            height=30  # Lines tall
-        )
-        self.text_area.pack(fill=tk.BOTH, expand=True)
 
-        # Track the current font for new text
-        self.current_font = ("Arial", 12)
-        self.text_area.configure(font=self.current_font)
+        # One tab per document. Only the most recently shown documents keep a
+        # live Text widget; the rest hold a text buffer or a file reference.
+        self.notebook = ttk.Notebook(self.text_frame)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.documents = []
+        self.recent_documents = []  # live documents, least recently shown first
+        self.document = None
+
+        # Read-only mmap viewer for very large files (None when not shown)
+        self.viewer = None
+
+        # Find/replace bar, created on first use
+        self.find_bar = None
 
-        # Create a tag for the current font
-        self.text_area.tag_configure("current_font", font=self.current_font)
+        # Follow mode trims followed documents to this many lines
+        self.follow_max_lines = FOLLOW_MAX_LINES
 
-        # Bind key press to apply the current font to new text
-        self.text_area.bind("<KeyPress>", lambda event: self.apply_current_font("current_font"))
+        # Saves and the crash-recovery journals are written on a worker thread
+        self.worker = BackgroundWorker(root)
+        self.root.bind("<Destroy>", self.on_destroy, add="+")
+        self.root.after(AUTOSAVE_INTERVAL_MS, self.autosave)
+        self.root.after(500, self.offer_recovery)
+        self.root.after(STATS_RECOUNT_INTERVAL_MS, self.periodic_recount)
 
         # Create menu bar
         self.create_menu()
 
+        self.show_document(self.add_document())
+
         # Apply theme
         self.theme_manager.apply_theme(root, self.theme_manager.current_theme)
 
-    def show_message(self, message, title="Notification", error=False):
-        MessagePopup(self.root, message, title, error)
+        # Ctrl+Alt+P: hidden profiling menu
+        profiling.install(root, on_report=lambda directory: self.show_message(f"Profile written to {directory}", title="Profiling"))
+
+    # The active document's widgets and models
+
+    @property
+    def text_area(self):
+        return self.document.text_area
+
+    @property
+    def observer(self):
+        return self.document.observer
+
+    @property
+    def style_runs(self):
+        return self.document.style_runs
+
+    @property
+    def font_tags(self):
+        return self.document.font_tags
+
+    @property
+    def highlighter(self):
+        return self.document.highlighter
+
+    @property
+    def viewport_listeners(self):
+        return self.document.viewport_listeners
+
+    @property
+    def swap(self):
+        return self.document.swap
+
+    @property
+    def current_font(self):
+        return self.document.current_font
+
+    @current_font.setter
+    def current_font(self, font_spec):
+        self.document.current_font = font_spec
+
+    def show_message(self, message, title="Notification", error=False, **options):
+        notify(self.root, message, title, error, **options)
+
+    def font_tag(self, font_spec):
+        """Return the active document's tag for a (family, size) font."""
+        return self.document.font_tag(font_spec)
+
+    # Tabs
+
+    def add_document(self, path=None):
+        """Add a dormant document tab; it gets a Text widget when first shown."""
+        page = self.theme_manager.register(tk.Frame(self.notebook, bg=self.theme_manager.palette.bg))
+        current_font = self.document.current_font if self.document else ("Arial", 12)
+        document = EditorDocument(page, SwapFile(self.worker), current_font, path)
+        if path:
+            document.language = language_for_path(path)
+        self.documents.append(document)
+        self.notebook.add(page, text=document.title)
+        return document
+
+    def pristine_document(self):
+        """Return the active document if it is an untouched, empty Untitled tab."""
+        document = self.document
+        if document and document.path is None and not document.dirty and not document.pinned \
+                and document.live and self.text_area.compare("end - 1c", "==", "1.0"):
+            return document
+        return None
+
+    def show_document(self, document):
+        """Select a tab, realizing its Text widget and making older tabs dormant past the cap."""
+        self.close_find_bar()
+
+        self.document = document
+        if str(self.notebook.select()) != str(document.page):
+            self.notebook.select(document.page)
+        if not document.live:
+            bg_color, fg_color, _, _ = self.theme_manager.get_theme_colors(self.theme_manager.current_theme)
+            changed = document.buffer is not None and document.buffer[0] == "file" and document.file_changed()
+            pending_path = document.realize(bg_color, fg_color)
+            if pending_path:
+                self.load_document(document, pending_path)
+            if changed:
+                self.show_message(f"{document.title} changed on disk while its tab was in the background; "
+                                  "showing the current file.", title="File Changed")
+
+        if document in self.recent_documents:
+            self.recent_documents.remove(document)
+        self.recent_documents.append(document)
+        live = [doc for doc in self.recent_documents if doc.live]
+        for doc in live[:max(0, len(live) - MAX_LIVE_DOCUMENTS)]:
+            if doc is not document and not doc.pinned:
+                doc.hibernate()
+                self.recent_documents.remove(doc)
+
+        document.stats.on_change = self.schedule_status_update
+        if document.stats.stale:
+            self.recount_stats(document)
+        self.update_status()
+
+        self.syntax_var.set(document.language.name if document.language else "Plain Text")
+        self.follow_var.set(document.follower is not None)
+        self.root.title(f"{document.title} - Text Editor")
+        self.text_area.focus_set()
+
+    def on_theme_changed(self, theme, palette):
+        """Theme subscription: recolor the live Text widgets; dormant ones take the theme when realized."""
+        self.close_find_bar()  # Rebuilt in the new colors on next use
+        for document in self.documents:
+            if document.live:
+                document.text_area.configure(bg=palette.bg, fg=palette.fg, insertbackground=palette.fg)
+
+    def schedule_status_update(self):
+        # Many edits (a streamed load) collapse into one label update per idle
+        if self._status_after_id is None:
+            self._status_after_id = self.root.after_idle(self.update_status)
+
+    def update_status(self):
+        self._status_after_id = None
+        stats = self.document.stats if self.document else None
+        if stats is None:
+            return
+        text = f"Lines: {stats.lines:,}    Words: {stats.words:,}    Characters: {stats.chars:,}"
+        if stats.stale:
+            text += "    (counting...)"
+            self.recount_stats(self.document)
+        self.status_bar.config(text=text)
+
+    def recount_stats(self, document):
+        """Recount a document on the worker; edits made meanwhile are added to the result."""
+        stats = document.stats
+        if stats is None or stats.recounting:
+            return  # Dormant, or a recount is already running
+        recount_id = stats.begin_recount()
+        self.worker.submit(count_text, document.text_area.get("1.0", "end - 1c"),
+                           on_done=lambda counts: stats.finish_recount(recount_id, counts))
+
+    def periodic_recount(self):
+        """Check the active document's counts against a full recount, and reschedule."""
+        if not self.text_frame.winfo_exists():
+            return
+        if self.document is not None:
+            self.recount_stats(self.document)
+        self.root.after(STATS_RECOUNT_INTERVAL_MS, self.periodic_recount)
+
+    def on_tab_changed(self, event):
+        selected = str(self.notebook.select())
+        for document in self.documents:
+            if str(document.page) == selected and document is not self.document:
+                self.show_document(document)
+                return
+
+    def update_tab_title(self, document):
+        self.notebook.tab(document.page, text=document.title)
+        if document is self.document:
+            self.root.title(f"{document.title} - Text Editor")
+
+    def remove_document(self, document):
+        document.swap.discard()
+        self.documents.remove(document)
+        if document in self.recent_documents:
+            self.recent_documents.remove(document)
+        self.notebook.forget(document.page)
+        document.close()
+
+    def close_tab(self, event=None):
+        """Close the active tab; unsaved changes in it are discarded."""
+        document = self.document
+        if document.dirty and not MessagePopup.ask_yes_no(self.root, "Close Tab",
+                                                          f"Discard unsaved changes to {document.title}?"):
+            return "break"
+        self.close_find_bar()
+        self.cancel_loading(document)
+        self.stop_following(document, forget=True)
+        self.document = None
+        self.remove_document(document)
+
+        remaining = [doc for doc in self.recent_documents if doc in self.documents] or self.documents
+        self.show_document(remaining[-1] if remaining else self.add_document())
+        return "break"
+
+    def close_find_bar(self):
+        # The bar is bound to one document's widget, so it does not survive tab changes
+        if self.find_bar is not None:
+            self.find_bar.hide()
+            self.find_bar.frame.destroy()
+            self.find_bar = None
+
+    def show_find_bar(self, event=None):
+        if self.viewer is not None:
+            return "break"
+        if self.find_bar is None:
+            self.find_bar = FindReplaceBar(self)
+        self.find_bar.show()
+        return "break"
 
     def create_menu(self):
         """Create the menu bar with file and edit options."""
@@ -56,25 +287,35 @@ class TextEditorApp:
 
         # File menu
         file_menu = tk.Menu(menu_bar, tearoff=0)
-        file_menu.add_command(label="New", command=self.new_file)
+        file_menu.add_command(label="New Tab", accelerator="Ctrl+N", command=self.new_file)
         file_menu.add_command(label="Open", command=self.open_file)
+        file_menu.add_command(label="Close Tab", accelerator="Ctrl+W", command=self.close_tab)
+        self.root.bind("<Control-n>", self.new_file)
+        self.root.bind("<Control-w>", self.close_tab)
+        file_menu.add_command(label="Open Large File (Read-only)", command=self.open_large_file)
+        self.follow_var = tk.BooleanVar(self.root, value=False)
+        file_menu.add_checkbutton(label="Follow File (Tail)", variable=self.follow_var, command=self.toggle_follow)
+        file_menu.add_command(label="Follow Line Limit...", command=self.ask_follow_limit)
         file_menu.add_command(label="Save", command=self.save_file)
         file_menu.add_command(label="Save As", command=self.save_file_as)
         file_menu.add_separator()
         file_menu.add_command(label="Print", command=self.print_text)  # Add this line
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.root.destroy)
         menu_bar.add_cascade(label="File", menu=file_menu)
 
         # Edit menu
         edit_menu = tk.Menu(menu_bar, tearoff=0)
-        edit_menu.add_command(label="Undo", command=self.text_area.edit_undo)
-        edit_menu.add_command(label="Redo", command=self.text_area.edit_redo)
+        edit_menu.add_command(label="Undo", command=lambda: self.text_area.edit_undo())
+        edit_menu.add_command(label="Redo", command=lambda: self.text_area.edit_redo())
         edit_menu.add_separator()
         edit_menu.add_command(label="Cut", command=lambda: self.text_area.event_generate("<<Cut>>"))
         edit_menu.add_command(label="Copy", command=lambda: self.text_area.event_generate("<<Copy>>"))
         edit_menu.add_command(label="Paste", command=lambda: self.text_area.event_generate("<<Paste>>"))
         edit_menu.add_command(label="Select All", command=lambda: self.text_area.event_generate("<<SelectAll>>"))
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Find/Replace", accelerator="Ctrl+F", command=self.show_find_bar)
+        self.root.bind("<Control-f>", self.show_find_bar)
         menu_bar.add_cascade(label="Edit", menu=edit_menu)
 
         # Text menu
@@ -91,11 +332,28 @@ class TextEditorApp:
 
         # Add "Change Selected Text Font" option
         text_menu.add_command(label="Change Selected Text Font", command=self.change_selected_text_font)
+
+        # Syntax highlighting submenu
+        self.syntax_var = tk.StringVar(self.root, value="Plain Text")
+        syntax_submenu = tk.Menu(text_menu, tearoff=0)
+        syntax_submenu.add_radiobutton(label="Plain Text", variable=self.syntax_var, value="Plain Text",
+                                       command=lambda: self.set_syntax(None))
+        for language in LANGUAGES:
+            syntax_submenu.add_radiobutton(label=language.name, variable=self.syntax_var, value=language.name,
+                                           command=lambda lang=language: self.set_syntax(lang))
+        text_menu.add_cascade(label="Syntax Highlighting", menu=syntax_submenu)
         
         menu_bar.add_cascade(label="Text", menu=text_menu)
 
         self.root.config(menu=menu_bar)
 
+    def set_syntax(self, language):
+        """Switch syntax highlighting of the active document (None for plain text)."""
+        self.document.language = language
+        if self.highlighter is not None:
+            self.highlighter.set_language(language)
+        self.syntax_var.set(language.name if language else "Plain Text")
+
     def print_text(self):
         """Print the content of the text area."""
         import tempfile
@@ -123,64 +381,238 @@ class TextEditorApp:
             # Clean up - delete the temporary file after a short delay
             self.root.after(10000, lambda: os.unlink(tmp_file_path))
 
-    def new_file(self):
-        """Clears the text area to start a new file."""
-        self.text_area.delete(1.0, tk.END)
+    def new_file(self, event=None):
+        """Opens an empty document in a new tab."""
+        self.close_viewer()
+        self.show_document(self.add_document())
+        return "break"
 
     def open_file(self):
-        """Opens a text file and loads it into the text area."""
+        """Opens a text file in a new tab."""
         file_path = filedialog.askopenfilename(
             filetypes=[("Text Data Files", "*.tdat"), ("Text Files", "*.txt"), ("All Files", "*.*")]
         )
         if not file_path:
             return
 
-        self.text_area.delete(1.0, tk.END)
+        self.close_viewer()
+
+        if not file_path.endswith('.tdat') and os.path.getsize(file_path) > LARGE_FILE_BYTES:
+            self.open_large_file(file_path)
+            return
 
+        # An untouched Untitled tab is replaced rather than kept around
+        pristine = self.pristine_document()
+        self.show_document(self.add_document(file_path))
+        if pristine is not None:
+            self.remove_document(pristine)
+
+    def load_document(self, document, file_path):
+        """Fill a freshly realized document from its file."""
         if file_path.endswith('.tdat'):
-            # Load JSON data and apply tags
-            import json
             try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    text_content = data.get('text', '')
-                    tags_data = data.get('tags', [])
-
-                    self.text_area.insert(tk.END, text_content)
-
-                    for tag_info in tags_data:
-                        tag_name = tag_info['name']
-                        font_family = tag_info['font_family']
-                        font_size = tag_info['font_size']
-                        ranges = tag_info['ranges']
-
-                        # Configure the tag
-                        self.text_area.tag_configure(tag_name, font=(font_family, font_size))
-
-                        # Apply ranges
-                        for start, end in ranges:
-                            self.text_area.tag_add(tag_name, start, end)
-
-                    # Update current_font if loaded
-                    if 'current_font' in self.text_area.tag_names():
-                        font_str = self.text_area.tag_cget('current_font', 'font')
-                        parts = font_str.split()
-                        if len(parts) >= 2:
-                            try:
-                                self.current_font = (' '.join(parts[:-1]), int(parts[-1]))
-                            except ValueError:
-                                pass
-
+                if tdat_format.is_binary_tdat(file_path):
+                    # Binary v2: small header first, text streamed, runs rendered at the end
+                    self.start_streaming_load(document, file_path, loader_class=TdatFileLoader)
+                else:
+                    # Legacy JSON .tdat
+                    text_content, runs, current_font = tdat_format.read_legacy(file_path)
+                    if current_font:
+                        document.current_font = current_font
+                    document.swap.paused = True
+                    document.text_area.insert(tk.END, text_content)
+                    document.apply_loaded_runs(runs)
+                    document.swap.paused = False
+                    document.swap.rebase_file(file_path)
+                    document.text_area.edit_reset()
+                    document.dirty = False
+                    document.file_stat = file_stat(file_path)
+                    document.restore_view()
             except Exception as e:
                 self.show_message(f"Error loading file: {str(e)}", title="Error", error=True)
         else:
-            # Load plain text and apply current font
-            with open(file_path, 'r') as f:
-                self.text_area.insert(tk.END, f.read())
-                self.text_area.tag_add("current_font", "1.0", "end")
+            # Stream plain text in chunks; the observer tags it with the
+            # current font as it is inserted
+            self.start_streaming_load(document, file_path)
+
+    def open_large_file(self, file_path=None):
+        """Show a file in the read-only viewer, which pages it from an mmap."""
+        if file_path is None:
+            file_path = filedialog.askopenfilename(filetypes=[("Text Files", "*.txt *.log"), ("All Files", "*.*")])
+            if not file_path:
+                return
+        self.close_viewer()
+
+        bg_color, fg_color, button_bg, button_fg = self.theme_manager.get_theme_colors(self.theme_manager.current_theme)
+        try:
+            self.viewer = LargeFileViewer(self.root, file_path, bg=bg_color, fg=fg_color, button_bg=button_bg,
+                                          button_fg=button_fg, font=self.current_font, on_close=self.viewer_closed)
+        except OSError as e:
+            self.show_message(f"Error opening file: {e}", title="Error", error=True)
+            return
+        if self.find_bar is not None:
+            self.find_bar.hide()
+        self.text_frame.pack_forget()
+        self.viewer.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def close_viewer(self):
+        if self.viewer is not None:
+            self.viewer.close()
+
+    def viewer_closed(self):
+        """Bring the editor back once the viewer is closed."""
+        self.viewer = None
+        self.text_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def start_streaming_load(self, document, file_path, loader_class=ChunkedFileLoader):
+        """Load a file into a document in chunks read off the Tk thread."""
+        bg_color, fg_color, button_bg, button_fg = self.theme_manager.get_theme_colors(self.theme_manager.current_theme)
+
+        # No undo history or journal entries for the load itself
+        text_area = document.text_area
+        text_area.configure(undo=False)
+        document.swap.paused = True
+        document.loading_path = file_path
+
+        # The progress line lives in the tab, so loads in other tabs can run alongside
+        document.progress_frame = tk.Frame(document.page, bg=bg_color)
+        document.progress_frame.pack(side=tk.BOTTOM, fill=tk.X, before=text_area)
+        progress_label = tk.Label(document.progress_frame, text="Loading...", bg=bg_color, fg=fg_color, anchor=tk.W)
+        progress_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        cancel_button = tk.Button(document.progress_frame, text="Cancel", command=lambda: self.cancel_loading(document),
+                                  bg=button_bg, fg=button_fg)
+        cancel_button.pack(side=tk.RIGHT, pady=2)
+
+        try:
+            document.loader = loader_class(
+                self.root,
+                file_path,
+                on_chunk=lambda text: text_area.insert(tk.END, text),
+                on_done=lambda: self.loading_done(document),
+                on_error=lambda error: self.loading_failed(document, error),
+                on_progress=lambda done, total: self.show_loading_progress(progress_label, done, total)
+            )
+        except (OSError, ValueError) as e:
+            self.loading_failed(document, e)
+            return
+
+        header = getattr(document.loader, "header", None)
+        if header:
+            document.current_font = header["current_font"]
+        document.loader.start()
+
+    def show_loading_progress(self, label, bytes_read, total_bytes):
+        """Update the progress line of a streaming load."""
+        percent = 100 if not total_bytes else bytes_read * 100 // total_bytes
+        label.config(text=f"Loading... {percent}% ({bytes_read // 1024} of {total_bytes // 1024} KB)")
+
+    def loading_done(self, document):
+        """A streaming load completed; styled files get their runs rendered now."""
+        header = getattr(document.loader, "header", None)
+        if not header:
+            document.followable = (document.loading_path, document.loader.bytes_read)
+        self.finish_loading(document)
+        if header:
+            document.apply_loaded_runs(header["runs"])
+        # The buffer now matches the file, so the journal can start from it
+        document.swap.rebase_file(document.loading_path)
+        document.dirty = False
+        document.file_stat = file_stat(document.loading_path)
+        document.restore_view()
+
+    def finish_loading(self, document):
+        """Tear down the progress line and re-enable undo after a load."""
+        document.loader = None
+        if document.progress_frame is not None:
+            document.progress_frame.destroy()
+            document.progress_frame = None
+        document.text_area.configure(undo=True)
+        document.text_area.edit_reset()
+        if document.swap.paused:
+            # Partial or failed loads are snapshotted on the next autosave
+            document.swap.paused = False
+            document.swap.needs_checkpoint = True
+            document.dirty = True
+
+    def loading_failed(self, document, error):
+        self.finish_loading(document)
+        self.show_message(f"Error loading file: {error}", title="Error", error=True)
+
+    def cancel_loading(self, document=None):
+        """Stop a streaming load, keeping whatever was already inserted."""
+        document = document or self.document
+        if document.loader is not None:
+            document.loader.cancel()
+            self.finish_loading(document)
+
+    def toggle_follow(self):
+        if self.follow_var.get():
+            self.start_following()
+        else:
+            self.stop_following()
+
+    def start_following(self):
+        """Append whatever is written to the active document's file from now on."""
+        document = self.document
+        if document.followable is None or document.follower is not None:
+            self.follow_var.set(document.follower is not None)
+            if document.followable is None:
+                self.show_message("Follow mode works on plain text files opened in the editor.", title="Follow File")
+            return
+        path, offset = document.followable
+        # Appended text is not undoable or journaled; the file is the record
+        document.text_area.configure(undo=False)
+        document.swap.paused = True
+        document.follower = FileFollower(self.root, path, offset=offset,
+                                         on_data=lambda text: self.append_followed(document, text),
+                                         on_truncate=lambda: self.follow_truncated(document),
+                                         on_error=lambda error: self.follow_failed(document, error)).start()
+        self.follow_var.set(True)
+        document.text_area.see(tk.END)
+
+    def stop_following(self, document=None, forget=False):
+        document = document or self.document
+        if document.follower is not None:
+            document.follower.stop()
+            document.followable = (document.follower.path, document.follower.delivered_offset)
+            document.follower = None
+            document.text_area.configure(undo=True)
+            document.text_area.edit_reset()
+            document.swap.paused = False
+            document.swap.needs_checkpoint = True
+        if forget:
+            document.followable = None
+        if document is self.document:
+            self.follow_var.set(False)
+
+    def append_followed(self, document, text):
+        """Append new bytes from the followed file, trimming the oldest lines past the cap."""
+        text_area = document.text_area
+        at_end = text_area.yview()[1] >= 1.0
+        text_area.insert(tk.END, text)
+        if self.follow_max_lines:
+            line_count = int(text_area.index("end - 1c").split(".")[0])
+            if line_count > self.follow_max_lines:
+                text_area.delete("1.0", f"{line_count - self.follow_max_lines + 1}.0")
+        if at_end:
+            text_area.see(tk.END)
+
+    def follow_truncated(self, document):
+        # The file was truncated or rotated; it is re-read from the start
+        document.text_area.delete("1.0", tk.END)
+
+    def follow_failed(self, document, error):
+        self.stop_following(document, forget=True)
+        self.show_message(f"Stopped following file: {error}", title="Error", error=True)
+
+    def ask_follow_limit(self):
+        limit = simpledialog.askinteger("Follow Line Limit", "Keep at most this many lines while following (0 for no limit):",
+                                        parent=self.root, minvalue=0, initialvalue=self.follow_max_lines)
+        if limit is not None:
+            self.follow_max_lines = limit
 
     def save_file(self):
-        """Saves the current content to a file."""
+        """Saves the active document to a file."""
         file_path = filedialog.asksaveasfilename(
             defaultextension=".tdat",
             filetypes=[("Text Data Files", "*.tdat"), ("Text Files", "*.txt"), ("All Files", "*.*")]
@@ -188,61 +620,102 @@ class TextEditorApp:
         if not file_path:
             return
 
+        # Snapshot on the Tk thread; serialize and write on the worker
+        document = self.document
         text_content = self.text_area.get("1.0", tk.END).rstrip('\n')  # Remove trailing newline added by tk.END
-
+        runs = [tuple(run) for run in self.style_runs.runs]
+        document.saving += 1
+        document.dirty = False
+        document.followable = document.file_stat = None  # Until the new file is written
+        self.worker.submit(self.write_document, file_path, text_content, runs, self.current_font,
+                           on_done=lambda result: self.save_done(document, file_path),
+                           on_error=lambda error: self.save_failed(document, error))
+        # Edits made while the save runs are journaled against the saved file
+        document.swap.rebase_file(file_path)
+        document.path = file_path
+        self.update_tab_title(document)
+
+    @staticmethod
+    def write_document(file_path, text_content, runs, current_font):
+        """Write a document snapshot atomically (runs on the worker thread)."""
         if file_path.endswith('.tdat'):
-            # Save as JSON with font tags
-            tags_data = []
-            for tag_name in self.text_area.tag_names():
-                if tag_name.startswith('font_') or tag_name == 'current_font':
-                    font_family, font_size = None, None
-                    if tag_name == 'current_font':
-                        # Extract font from tag configuration
-                        font_str = self.text_area.tag_cget(tag_name, 'font')
-                        parts = font_str.split()
-                        if len(parts) < 1:
-                            continue
-                        try:
-                            font_size = int(parts[-1])
-                            font_family = ' '.join(parts[:-1])
-                        except ValueError:
-                            continue
-                    else:
-                        # Extract font from tag name
-                        parts = tag_name.split('_')
-                        font_family = ' '.join(parts[1:-1])
-                        try:
-                            font_size = int(parts[-1])
-                        except ValueError:
-                            continue
-
-                    # Collect ranges for the tag
-                    ranges = self.text_area.tag_ranges(tag_name)
-                    range_pairs = []
-                    for i in range(0, len(ranges), 2):
-                        start = str(ranges[i])
-                        end = str(ranges[i+1])
-                        range_pairs.append([start, end])
-
-                    tags_data.append({
-                        'name': tag_name,
-                        'font_family': font_family,
-                        'font_size': font_size,
-                        'ranges': range_pairs
-                    })
-
-            data = {
-                'text': text_content,
-                'tags': tags_data
-            }
-
-            import json
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=4)
+            # Save as binary v2: style runs as (length, font) pairs, compressed text
+            atomic_write(file_path, lambda tmp: tdat_format.write_tdat(tmp, text_content, runs, current_font))
         else:
             # Save as plain text
-            with open(file_path, 'w') as f:
-                f.write(text_content)
+            def write_text(tmp):
+                with open(tmp, 'w', encoding=TEXT_ENCODING) as f:
+                    f.write(text_content)
+            atomic_write(file_path, write_text)
+
+    def save_done(self, document, file_path):
+        document.saving -= 1
+        if document.path == file_path:
+            document.file_stat = file_stat(file_path)
+            # Follow mode picks up from the end of what was written (plain text only)
+            if not file_path.endswith('.tdat') and document.file_stat is not None:
+                document.followable = (file_path, document.file_stat[0])
+
+    def save_failed(self, document, error):
+        document.saving -= 1
+        document.dirty = True
+        document.swap.needs_checkpoint = True
+        self.show_message(f"Error saving file: {error}", title="Error", error=True)
+
+    def document_snapshot(self):
+        """Return (text, runs, current_font) of the active document."""
+        return self.document.snapshot()
+
+    def autosave(self):
+        """Journal recent edits of every document to its swap file and reschedule."""
+        if not self.text_frame.winfo_exists():
+            return
+        for document in self.documents:
+            document.swap.flush(document.snapshot)
+        self.root.after(AUTOSAVE_INTERVAL_MS, self.autosave)
+
+    def on_destroy(self, event):
+        # A clean exit leaves nothing to recover
+        if event.widget is self.root:
+            for document in self.documents:
+                document.swap.discard()
+
+    def offer_recovery(self):
+        """Offer to restore the swap journals left by a crashed session, one tab each."""
+        journals = SwapFile.find_recoverable(self.swap.directory)
+        if not journals:
+            return
+        confirm = MessagePopup.ask_yes_no(self.root, "Recover Documents",
+                                          f"Unsaved changes to {len(journals)} document(s) from a previous session "
+                                          "were found. Recover them?")
+        for journal in journals:
+            if confirm:
+                self.worker.submit(SwapFile.recover, journal, on_done=self.apply_recovered,
+                                   on_error=lambda e: self.show_message(f"Recovery failed: {e}", title="Error", error=True))
+            self.worker.submit(SwapFile.remove_session, journal)
+
+    def apply_recovered(self, recovered):
+        text_content, runs, current_font, source_path, base_changed = recovered
+        pristine = self.pristine_document()
+        document = self.add_document()
+        if current_font:
+            document.current_font = current_font
+        if source_path:
+            document.language = language_for_path(source_path)
+        document.load_runs(len(text_content), runs)
+        document.buffer = ("text", text_content)
+        document.dirty = True
+        document.swap.checkpoint(*document.snapshot())
+        self.show_document(document)
+        if pristine is not None:
+            self.remove_document(pristine)
+        source = f" (based on {os.path.basename(source_path)})" if source_path else ""
+        if base_changed:
+            self.show_message(f"Recovered unsaved changes{source}, but the file changed on disk after they were "
+                              "made, so some edits may be misplaced. Check the text before saving.",
+                              title="Recovered", error=True)
+        else:
+            self.show_message(f"Recovered unsaved changes{source}.", title="Recovered")
 
     def save_file_as(self):
         """Saves the content to a new file."""
@@ -253,18 +726,8 @@ class TextEditorApp:
         current_font_size = font.Font(font=self.text_area['font']).actual()['size']
         self.current_font = (font_name, current_font_size)
 
-        # Generate a unique tag for the new font
-        font_tag = f"font_{font_name}_{current_font_size}"
-        
-        # Define the tag with the selected font
-        self.text_area.tag_configure(font_tag, font=self.current_font)
-
-        # Apply this tag to all new text
-        self.text_area.bind("<Key>", lambda event: self.apply_current_font(font_tag))
-
-    def apply_current_font(self, font_tag):
-        """Apply the selected font tag to new text only."""
-        self.text_area.tag_add(font_tag, "insert-1c", "insert")
+        # Define the tag now so typing only has to reference it
+        self.font_tag(self.current_font)
 
     def change_selected_text_font(self):
         """Change the font of the currently selected text."""
@@ -276,13 +739,18 @@ class TextEditorApp:
             # Ask user to select a font
             selected_font = self.ask_font()
             if selected_font:
-                # Create a unique tag for this font change
-                font_tag = f"font_{selected_font[0]}_{selected_font[1]}"
-                self.text_area.tag_configure(font_tag, font=selected_font)
-                
-                # Apply the tag to the selected text
+                font_tag = self.font_tag(selected_font)
+
+                # Update the style model, then re-render just the selection
+                self.style_runs.set_font(self.observer.offset(sel_start), self.observer.offset(sel_end), selected_font)
+                for tag in self.font_tags.values():
+                    self.text_area.tag_remove(tag, sel_start, sel_end)
                 self.text_area.tag_add(font_tag, sel_start, sel_end)
-                
+                # A restyle is an unsaved change: keep the text when dormant, prompt on close,
+                # and snapshot the runs on the next autosave (the journal only records text)
+                self.document.dirty = True
+                self.document.swap.needs_checkpoint = True
+
         except tk.TclError:
             # No text selected
             self.show_message("Please select some text first", title="Error", error=True)
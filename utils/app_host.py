@@ -0,0 +1,205 @@
+import importlib
+import multiprocessing
+from multiprocessing.connection import wait
+
+POLL_MS = 100
+
+# Fork would copy the launcher's Tk state into the child; always start clean
+_context = multiprocessing.get_context("spawn")
+
+
+def host_main(conn, preload=()):
+    """
+    Entry point of an app process. It starts as a spare: tkinter and the
+    app modules in preload are imported up front, then it waits for
+    ("launch", app_name, "module:callable", theme). The app then runs in
+    its own Tk interpreter, and the process follows theme, focus and
+    shutdown messages until its window is closed.
+    """
+    import tkinter as tk
+    from utils.encryption import UnlockCancelled
+    from utils.theme_manager_classes import get_theme_manager
+
+    for module_name in preload:
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            pass  # Reported when the app is actually launched
+    try:
+        message = conn.recv()
+    except EOFError:
+        return
+    if message[0] != "launch":
+        return
+    _, app_name, target, theme = message
+
+    theme_manager = get_theme_manager()
+    theme_manager.current_theme = theme
+    root = None
+    try:
+        root = tk.Tk()
+        module_name, _, attribute = target.partition(":")
+        getattr(importlib.import_module(module_name), attribute)(root)
+    except UnlockCancelled:
+        root.destroy()  # Passphrase prompt dismissed: nothing to report
+        return
+    except Exception as e:
+        conn.send(("error", f"Cannot start '{app_name}': {e}"))
+        if root is not None:
+            root.destroy()
+        return
+    theme_manager.apply_theme(root, theme)
+
+    # Theme switches made in this app are pushed to the launcher, which
+    # forwards them to every other app; only the switch a forwarded
+    # message causes is not echoed back, local ones are always sent
+    forwarding = {"active": False}
+
+    def on_theme_changed(new_theme, palette):
+        if not forwarding["active"]:
+            conn.send(("theme", new_theme))
+
+    theme_manager.subscribe(on_theme_changed)
+
+    def poll():
+        try:
+            while conn.poll():
+                kind, *args = conn.recv()
+                if kind == "theme":
+                    forwarding["active"] = True
+                    try:
+                        theme_manager.apply_theme(root, args[0])
+                    finally:
+                        forwarding["active"] = False
+                elif kind == "focus":
+                    root.deiconify()
+                    root.lift()
+                    root.focus_force()
+                elif kind == "shutdown":
+                    root.destroy()
+                    return
+        except (EOFError, OSError):
+            root.destroy()  # The launcher is gone
+            return
+        root.after(POLL_MS, poll)
+
+    root.after(POLL_MS, poll)
+    root.mainloop()
+    try:
+        conn.send(("closed",))
+    except (OSError, ValueError):
+        pass
+
+
+class AppHost:
+    """
+    Launcher-side handle of one app process and its end of the pipe.
+    """
+
+    def __init__(self, preload=()):
+        self.conn, child_conn = _context.Pipe()
+        self.process = _context.Process(target=host_main, args=(child_conn, tuple(preload)), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.app_name = None
+
+    @property
+    def alive(self):
+        return self.process.is_alive()
+
+    def send(self, *message):
+        try:
+            self.conn.send(message)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def stop(self, timeout=1.0):
+        self.send("shutdown")
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class AppProcessPool:
+    """
+    Runs apps in their own processes so one app's heavy work cannot stall
+    the launcher or the other apps.
+
+    A spare process is kept pre-warmed (interpreter started, tkinter and
+    the app modules imported), so a launch only hands it the app to run;
+    a new spare is started once it is taken. The Tk thread polls the pipes
+    with `after`: apps report theme switches, launch errors and closing.
+    """
+
+    def __init__(self, root, preload=(), on_theme=None, on_error=None):
+        self.root = root
+        self.preload = tuple(preload)
+        self.on_theme = on_theme
+        self.on_error = on_error
+        self.hosts = []  # running apps
+        self.spare = None
+        self._poll_id = None
+        self._spare_id = None
+
+    def start_spare(self):
+        self._spare_id = None
+        if self.spare is None:
+            self.spare = AppHost(self.preload)
+
+    def launch(self, app_name, target, theme):
+        """
+        Runs target ("module:callable") in the spare process. Returns its AppHost.
+        """
+        host, self.spare = self.spare, None
+        if host is None or not host.alive:
+            host = AppHost(self.preload)
+        host.app_name = app_name
+        host.send("launch", app_name, target, theme)
+        self.hosts.append(host)
+        if self._poll_id is None:
+            self._poll_id = self.root.after(POLL_MS, self.poll)
+        # Warm the next spare once this launch has had the machine to itself
+        if self._spare_id is None:
+            self._spare_id = self.root.after(1000, self.start_spare)
+        return host
+
+    def find(self, app_name):
+        return next((host for host in self.hosts if host.app_name == app_name and host.alive), None)
+
+    def broadcast(self, *message):
+        for host in self.hosts:
+            host.send(*message)
+
+    def poll(self):
+        self._poll_id = None
+        connections = {host.conn: host for host in self.hosts}
+        for conn in wait(list(connections), timeout=0):
+            try:
+                while conn.poll():
+                    kind, *args = conn.recv()
+                    if kind == "theme" and self.on_theme:
+                        self.on_theme(args[0])
+                    elif kind == "error" and self.on_error:
+                        self.on_error(args[0])
+            except (EOFError, OSError):
+                pass  # Closed; reaped below
+        for host in [host for host in self.hosts if not host.alive]:
+            self.hosts.remove(host)
+            host.conn.close()
+        if self.hosts:
+            self._poll_id = self.root.after(POLL_MS, self.poll)
+
+    def shutdown(self):
+        for after_id in (self._poll_id, self._spare_id):
+            if after_id is not None:
+                self.root.after_cancel(after_id)
+        self._poll_id = self._spare_id = None
+        hosts = self.hosts + ([self.spare] if self.spare else [])
+        for host in hosts:
+            host.send("shutdown")
+        for host in hosts:
+            host.stop()
+        self.hosts = []
+        self.spare = None
@@ -1,10 +1,17 @@
+import importlib
 import tkinter as tk
 from tkinter import ttk
-import threading
-from utils.clipboard_classes import ClipboardManager, ClipboardApp
-from utils.theme_manager_classes import ThemeManager
-from utils.message_popup import MessagePopup
-from utils.notes_class import NoteTakerApp
+from utils.theme_manager_classes import get_theme_manager
+from utils.notifications import notify
+from utils import profiling
+
+# App name -> "module:callable". The module is imported on first launch and
+# callable(window) builds the app in a new Toplevel, so the launcher window
+# never waits for an app's dependencies (pyperclip, the note indexes, ...).
+APP_REGISTRY = {
+    "Clipboard Manager": "utils.clipboard_classes:launch_clipboard_app",
+    "Note Taker": "utils.notes_class:NoteTakerApp",
+}
 
 
 class AppLauncher:
@@ -12,13 +19,14 @@ class AppLauncher:
     A launcher interface to manage and open multiple applications.
     """
 
-    def __init__(self, root):
+    def __init__(self, root, isolated=False):
         """
         Initializes the App Launcher with a list of applications.
+        With isolated=True registry apps run in their own processes.
         """
         self.root = root
         self.root.title("Application Launcher")
-        self.theme_manager = ThemeManager()
+        self.theme_manager = get_theme_manager()
         self.root.geometry("300x100")
 
         # List to store open application windows
@@ -44,35 +52,71 @@ class AppLauncher:
         # Apply the default theme (dark)
         self.theme_manager.apply_theme(root, self.theme_manager.current_theme)
 
-        # Dictionary to store available apps and their launch functions
+        # Ctrl+Alt+P: hidden profiling menu (also covers in-process apps)
+        profiling.install(root, on_report=lambda directory: self.show_message(f"Profile written to {directory}", title="Profiling"))
+
+        # Dictionary to store available apps: name -> "module:callable" or a loaded callable
         self.apps = {}
         self.populate_apps()
+
+        # Isolated mode: one process per app, with a spare warmed once the window is up
+        self.process_pool = None
+        if isolated:
+            from utils.app_host import AppProcessPool  # multiprocessing is only paid for in this mode
+
+            preload = [target.partition(":")[0] for target in APP_REGISTRY.values()]
+            self.process_pool = AppProcessPool(root, preload, on_theme=self.on_app_theme,
+                                               on_error=lambda message: self.show_message(message, title="Error", error=True))
+            self.theme_manager.subscribe(self.on_theme_changed)
+            self.root.bind("<Destroy>", self.on_destroy, add="+")
+            self.root.after(500, self.process_pool.start_spare)
     
     def toggle_theme(self):
         """
         Toggles between light and dark themes using ThemeManager.
         """
+        # Open applications share the process-wide theme manager, so their
+        # widgets switch in the same batched pass and they are notified once
         self.theme_manager.toggle_theme(self.root)
 
-        # Apply the theme to all open applications
-        for app_window in self.open_apps:
-            self.theme_manager.apply_theme(app_window, self.theme_manager.current_theme)
+    def on_theme_changed(self, theme, palette):
+        """Theme subscription (isolated mode): forward the switch to every app process."""
+        self.process_pool.broadcast("theme", theme)
+
+    def on_app_theme(self, theme):
+        """An app process switched themes; apply it here, which forwards it to the others."""
+        self.theme_manager.apply_theme(self.root, theme)
+
+    def on_destroy(self, event):
+        if event.widget is self.root:
+            self.process_pool.shutdown()
 
     def populate_apps(self):
         """
-        Populates the list of apps in the launcher.
+        Populates the list of apps in the launcher (nothing is imported yet).
         """
-        
-        self.add_app("Clipboard Manager", self.launch_clipboard_app)
-        self.add_app("Note Taker", self.launch_notetaker_app)
+        for app_name, target in APP_REGISTRY.items():
+            self.add_app(app_name, target)
 
-    def add_app(self, app_name, launch_function):
+    def add_app(self, app_name, target):
         """
-        Adds a new app to the launcher.
+        Adds a new app to the launcher. target is callable(window) or a
+        "module:callable" path imported on first launch.
         """
-        self.apps[app_name] = launch_function
+        self.apps[app_name] = target
         self.app_dropdown["values"] = list(self.apps.keys())  # Update dropdown values
 
+    def resolve_app(self, app_name):
+        """
+        Returns the app's callable, importing its module the first time.
+        """
+        target = self.apps[app_name]
+        if isinstance(target, str):
+            module_name, _, attribute = target.partition(":")
+            target = getattr(importlib.import_module(module_name), attribute)
+            self.apps[app_name] = target
+        return target
+
     def launch_selected_app(self, event=None):
         """
         Launches the selected application from the dropdown.
@@ -80,7 +124,7 @@ class AppLauncher:
         app_name = self.app_dropdown.get()
 
         if app_name in self.apps:
-            self.apps[app_name]()  # Call the launch function
+            self.launch_app(app_name)
         else:
             self.show_message(f"App '{app_name}' not found!", title="Error", error=True)
 
@@ -90,30 +134,48 @@ class AppLauncher:
         """
         self.show_message(f"Feature to add new apps dynamically is coming soon!", title="N/A")
 
-    def launch_clipboard_app(self):
+    def launch_app(self, app_name):
         """
-        Launches the Clipboard Manager application.
+        Launches an application in a new window. In isolated mode registry
+        apps run in their own process instead; one already running is focused.
         """
+        target = self.apps[app_name]
+        if self.process_pool is not None and isinstance(target, str):
+            host = self.process_pool.find(app_name)
+            if host is not None:
+                host.send("focus")
+            else:
+                self.process_pool.launch(app_name, target, self.theme_manager.current_theme)
+            return
+
+        try:
+            launch = self.resolve_app(app_name)
+        except ImportError as e:
+            self.show_message(f"Cannot load '{app_name}': {e}", title="Error", error=True)
+            return
+        from utils.encryption import UnlockCancelled  # Imported with the apps, not at launcher start
+
         new_window = tk.Toplevel(self.root)
-        clipboard_manager = ClipboardManager()
-        # Run the clipboard monitoring in a separate thread
-        monitor_thread = threading.Thread(target=clipboard_manager.monitor_clipboard)
-        monitor_thread.daemon = True
-        monitor_thread.start()
-        ClipboardApp(new_window, clipboard_manager)
+        try:
+            launch(new_window)
+        except UnlockCancelled:
+            new_window.destroy()  # Passphrase prompt dismissed
+            return
 
         # Add the new window to the list of open applications
         self.open_apps.append(new_window)
 
+    def launch_clipboard_app(self):
+        """
+        Launches the Clipboard Manager application.
+        """
+        self.launch_app("Clipboard Manager")
+
     def launch_notetaker_app(self):
         """
         Launches the Note taking application.
         """
-        new_window = tk.Toplevel(self.root)
-        NoteTakerApp(new_window)
-
-        # Add the new window to the list of open applications
-        self.open_apps.append(new_window)
+        self.launch_app("Note Taker")
 
-    def show_message(self, message, title="Notification", error=False):
-        MessagePopup(self.root, message, title, error)
\ No newline at end of file
+    def show_message(self, message, title="Notification", error=False, **options):
+        notify(self.root, message, title, error, **options)
\ No newline at end of file
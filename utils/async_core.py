@@ -0,0 +1,223 @@
+import asyncio
+import concurrent.futures
+import queue
+import sys
+import threading
+import time
+import tkinter
+import weakref
+from utils import profiling
+
+MAX_WORKERS = 6  # Bound on threads running blocking calls, process-wide
+
+_core = None
+_core_lock = threading.Lock()
+
+
+def get_async_core():
+    """
+    Returns the process-wide AsyncCore, starting its loop thread on first use.
+    """
+    global _core
+    with _core_lock:
+        if _core is None:
+            _core = AsyncCore()
+        return _core
+
+
+def _profiled_call(func, args):
+    with profiling.profiled():
+        return func(*args)
+
+
+class TaskHandle:
+    """
+    A task submitted to the core. cancel() may be called from any thread;
+    a cancelled task's callbacks never run.
+    """
+
+    def __init__(self, future):
+        self.future = future
+
+    def cancel(self):
+        self.future.cancel()
+
+    def done(self):
+        return self.future.done()
+
+
+class TkBridge:
+    """
+    Runs callables on the Tk thread for one Tk application.
+
+    Other threads only put calls on a queue; an `after` poll drains it
+    while tasks submitted from this application are still running (or
+    calls are waiting), so an idle app does not poll. The poll backs off
+    while a long-lived task (a monitor) has nothing to deliver, and each
+    tick is bounded in time so a burst of results cannot freeze the window.
+    """
+
+    POLL_MS = 20
+    IDLE_POLL_MS = 250  # backoff limit while nothing arrives
+    TICK_BUDGET = 0.03  # seconds of callbacks per tick
+
+    def __init__(self, root):
+        self.root = root
+        self._calls = queue.Queue()
+        self._active = 0  # running tasks that may still post here; Tk thread only
+        self._after_id = None
+        self._interval = self.POLL_MS
+
+    def post(self, func, *args):
+        """Queues func(*args) for the Tk thread. Safe from any thread."""
+        self._calls.put((func, args))
+
+    def hold(self):
+        """Tk thread: a task that posts here started; keep polling."""
+        self._active += 1
+        self._interval = self.POLL_MS
+        if self._after_id is None:
+            self._after_id = self.root.after(self._interval, self._poll)
+
+    def release(self):
+        """Tk thread: that task is done."""
+        self._active -= 1
+
+    def _poll(self):
+        self._after_id = None
+        deadline = time.perf_counter() + self.TICK_BUDGET
+        ran = False
+        while time.perf_counter() < deadline:
+            try:
+                func, args = self._calls.get_nowait()
+            except queue.Empty:
+                break
+            ran = True
+            try:
+                func(*args)
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
+        self._interval = self.POLL_MS if ran else min(self._interval * 2, self.IDLE_POLL_MS)
+        if self._active > 0 or not self._calls.empty():
+            try:
+                self._after_id = self.root.after(self._interval, self._poll)
+            except (RuntimeError, tkinter.TclError):
+                pass  # Tk is gone
+
+
+class AsyncCore:
+    """
+    One asyncio event loop on a background thread for all background work.
+
+    Coroutines submitted here run on that loop; blocking calls inside them
+    go through run_blocking(), which uses one bounded thread pool instead
+    of a thread per job. Results come back to Tk through a TkBridge:
+
+        handle = core.submit(root, coro, on_done=..., on_error=...)
+        handle = core.submit_blocking(root, func, *args, on_done=..., on_error=...)
+        value = await core.call_tk(bridge, func, *args)  # inside a coroutine
+
+    on_done(result) / on_error(exception) run on the Tk thread; cancelled
+    tasks call neither.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS,
+                                                              thread_name_prefix="async-core")
+        self.loop.set_default_executor(self.executor)
+        self._bridges = weakref.WeakKeyDictionary()  # Tk root -> TkBridge
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-core-loop", daemon=True)
+        self._thread.start()
+
+    def bridge(self, widget):
+        """The TkBridge of the Tk application a widget belongs to (Tk thread)."""
+        root = widget.nametowidget(".")
+        bridge = self._bridges.get(root)
+        if bridge is None:
+            bridge = self._bridges[root] = TkBridge(root)
+        return bridge
+
+    # Running work
+
+    def run(self, coro):
+        """
+        Schedules a coroutine without any Tk involvement; returns a
+        concurrent.futures.Future (e.g. to wait on at shutdown).
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def submit(self, widget, coro, on_done=None, on_error=None):
+        """
+        Runs a coroutine on the loop; call from the Tk thread. Returns a TaskHandle.
+        """
+        return self.track(widget, self.run(coro), on_done, on_error)
+
+    def track(self, widget, future, on_done=None, on_error=None):
+        """
+        Delivers the outcome of a concurrent.futures.Future on the Tk
+        thread; call from the Tk thread. Returns a TaskHandle.
+        """
+        bridge = self.bridge(widget)
+        bridge.hold()
+
+        def finished(future):
+            # Runs on whichever thread completed it; the outcome is handed to Tk
+            bridge.post(self._deliver, bridge, future, on_done, on_error)
+
+        future.add_done_callback(finished)
+        return TaskHandle(future)
+
+    def submit_blocking(self, widget, func, *args, on_done=None, on_error=None):
+        """
+        Runs a blocking func(*args) on the bounded pool; call from the Tk thread.
+        Cancelling only helps before it starts; long jobs should also watch a flag.
+        """
+        return self.submit(widget, self.run_blocking(func, *args), on_done, on_error)
+
+    @staticmethod
+    def _deliver(bridge, future, on_done, on_error):
+        bridge.release()
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            if not on_error:
+                raise error  # Reported by the bridge like any Tk callback error
+            on_error(error)
+        elif on_done:
+            on_done(future.result())
+
+    # Inside coroutines
+
+    async def run_blocking(self, func, *args):
+        """Awaits func(*args) run on the bounded thread pool."""
+        return await self.loop.run_in_executor(self.executor, _profiled_call, func, args)
+
+    def call_tk(self, bridge, func, *args):
+        """
+        Runs func(*args) on the Tk thread and returns an awaitable of its
+        result. Call from the loop with a bridge obtained on the Tk thread
+        (see bridge()); awaiting the results gives natural backpressure.
+        """
+        future = self.loop.create_future()
+
+        def run():
+            try:
+                result = func(*args)
+            except Exception as e:
+                self.loop.call_soon_threadsafe(self._settle, future, None, e)
+            else:
+                self.loop.call_soon_threadsafe(self._settle, future, result, None)
+
+        bridge.post(run)
+        return future
+
+    @staticmethod
+    def _settle(future, result, error):
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
@@ -0,0 +1,98 @@
+import collections
+import concurrent.futures
+import os
+import stat
+import tempfile
+from utils.async_core import get_async_core
+
+
+# Read once at import (on the main thread): os.umask can only be read by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _ignore_error(error):
+    pass  # Jobs without on_error fail quietly, as they always have
+
+
+class BackgroundWorker:
+    """
+    Runs blocking jobs one at a time in the background and delivers their
+    results back on the Tk thread.
+
+    Jobs run in submission order, so a job that depends on an earlier one
+    (write the file, then rebase the journal on it) can simply be submitted
+    after it. The worker is a queue consumed by one task on the shared
+    AsyncCore, which runs each job on the core's bounded thread pool; it
+    has no thread of its own. A cancelled job is skipped if it has not
+    started yet.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.core = get_async_core()
+        self._jobs = collections.deque()  # loop thread only
+        self._consumer = None
+
+    def submit(self, func, *args, on_done=None, on_error=None):
+        """
+        Queues func(*args). on_done(result) or on_error(exception) is called
+        on the Tk thread when it finishes. Returns its TaskHandle.
+        """
+        future = self._enqueue(func, args)
+        return self.core.track(self.root, future, on_done=on_done, on_error=on_error or _ignore_error)
+
+    def run_now(self, func, *args):
+        """
+        Runs func(*args) after the queued jobs and waits for it (used at
+        shutdown, when the Tk loop may no longer be running).
+        """
+        return self._enqueue(func, args).result()
+
+    def _enqueue(self, func, args):
+        future = concurrent.futures.Future()
+        self.core.loop.call_soon_threadsafe(self._put, (func, args, future))
+        return future
+
+    def _put(self, job):
+        # Loop thread: the consumer task only lives while there is work
+        self._jobs.append(job)
+        if self._consumer is None:
+            self._consumer = self.core.loop.create_task(self._consume())
+
+    async def _consume(self):
+        while self._jobs:
+            func, args, future = self._jobs.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = await self.core.run_blocking(func, *args)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        self._consumer = None
+
+
+def atomic_write(path, write):
+    """
+    Calls write(tmp_path) and then renames the temporary file over path, so
+    readers never see a half-written file. Every call gets its own temporary
+    file, so concurrent writers of one path (two workers) cannot interleave.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        # mkstemp creates the file private; give it the mode a plain open() would
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,258 @@
+import gzip
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from utils.notes_index import NoteIndex
+from utils.encryption import is_sealed
+from utils.notes_manifest import NoteManifest, content_hash
+
+EXPORT_FORMAT = "clipboard-list-export"
+EXPORT_VERSION = 1
+BATCH_SIZE = 10000  # notes written per manifest update (each one saves the manifest)
+CLIP_HISTORY_LIMIT = 30  # ClipboardManager.MAX_HISTORY; importing it would need pyperclip
+INVALID_TITLE_CHARS = set('/\\:*?"<>|\0') | {chr(code) for code in range(1, 32)}  # not portable in file names
+
+
+class TransferStats:
+    """
+    Counts of one export or import, and its throughput.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.records = 0  # records read or written
+        self.imported = 0
+        self.duplicates = 0  # content already present (or seen earlier in the stream)
+        self.skipped = 0  # malformed records or unusable titles
+        self.dropped = 0  # older clips pushed out by the history limit
+        self.bytes = 0  # size of the export file
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def finish(self, path):
+        self.seconds = time.perf_counter() - self.started
+        self.bytes = os.path.getsize(path)
+        return self
+
+    def summary(self):
+        seconds = max(self.seconds, 1e-9)
+        text = f"{self.records:,} {self.kind} records in {self.seconds:.2f} s " \
+               f"({self.records / seconds:,.0f} records/s, {self.bytes / seconds / 1e6:.1f} MB/s compressed)"
+        if self.imported or self.duplicates or self.skipped:
+            text += f": {self.imported:,} imported, {self.duplicates:,} duplicates, {self.skipped:,} skipped"
+        if self.dropped:
+            text += f", {self.dropped:,} older clips dropped by the history limit"
+        return text
+
+
+def write_records(path, kind, records, stats):
+    """
+    Streams records (dicts) to a gzip-compressed NDJSON file: a header line,
+    then one JSON object per line. Only one record is in memory at a time.
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+            f.write(json.dumps({"format": EXPORT_FORMAT, "version": EXPORT_VERSION, "kind": kind}) + "\n")
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+                stats.records += 1
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return stats.finish(path)
+
+
+def read_records(path, kind, stats):
+    """
+    Yields the records of an export file one at a time. Lines that are not
+    JSON objects are counted as skipped.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != EXPORT_FORMAT or header.get("kind") != kind:
+            raise ValueError(f"{path} is not a {kind} export")
+        if header.get("version", 0) > EXPORT_VERSION:
+            raise ValueError(f"{path} was written by a newer version (format {header['version']})")
+        for line in f:
+            stats.records += 1
+            try:
+                record = json.loads(line)
+            except ValueError:
+                stats.skipped += 1
+                continue
+            if isinstance(record, dict):
+                yield record
+            else:
+                stats.skipped += 1
+
+
+# Clipboard history
+
+def export_clips(path, history_file="clipboard_history.json"):
+    """
+    Exports the clipboard history, oldest first. Returns TransferStats.
+    """
+    stats = TransferStats("clip")
+    history = []
+    if os.path.exists(history_file):
+        with open(history_file, "r") as f:
+            history = json.load(f)
+    records = ({"text": text, "hash": content_hash(text)} for text in history)
+    return write_records(path, "clips", records, stats)
+
+
+def import_clips(path, history_file="clipboard_history.json", limit=CLIP_HISTORY_LIMIT):
+    """
+    Appends the clips of an export to the history, skipping ones whose
+    content is already there. The history keeps only its newest `limit`
+    clips, so memory stays bounded however long the export is; older
+    clips are counted as dropped. Run it while the clipboard app is closed,
+    which rewrites the history file on every copy.
+    """
+    stats = TransferStats("clip")
+    history = []
+    if os.path.exists(history_file):
+        with open(history_file, "r") as f:
+            history = json.load(f)
+    seen = {content_hash(text) for text in history}
+    kept = deque(history, maxlen=limit)
+
+    for record in read_records(path, "clips", stats):
+        text = record.get("text")
+        if not isinstance(text, str):
+            stats.skipped += 1
+            continue
+        digest = content_hash(text)
+        if digest in seen:
+            stats.duplicates += 1
+            continue
+        if len(kept) == limit:
+            # Pushed out by this one; like the app, only the kept history counts as "seen"
+            seen.discard(content_hash(kept[0]))
+            stats.dropped += 1
+        seen.add(digest)
+        kept.append(text)
+        stats.imported += 1
+
+    tmp_path = f"{history_file}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(list(kept), f)
+    os.replace(tmp_path, history_file)
+    return stats.finish(path)
+
+
+# Notes
+
+def iter_note_records(notes_dir="notes"):
+    """
+    Yields one record per note, reading one file at a time.
+    """
+    index = NoteIndex(notes_dir)
+    index.refresh()
+    for title in sorted(index.entries):
+        try:
+            with open(index.note_path(title), "r", encoding="utf-8") as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError):
+            continue  # Deleted meanwhile or not text
+        yield {"title": title, "content": content, "mtime": index.entries[title][0],
+               "hash": content_hash(content)}
+
+
+def export_notes(path, notes_dir="notes"):
+    """
+    Exports every note. Returns TransferStats.
+    """
+    return write_records(path, "notes", iter_note_records(notes_dir), TransferStats("note"))
+
+
+def _usable_title(title):
+    return isinstance(title, str) and title.strip() == title and title not in ("", ".", "..") and \
+        not INVALID_TITLE_CHARS.intersection(title)
+
+
+def _case_insensitive(directory):
+    """
+    True if the filesystem holding directory ignores the case of file
+    names (Windows, and macOS by default).
+    """
+    with tempfile.NamedTemporaryFile(prefix=".CaseProbe", dir=directory) as probe:
+        return os.path.exists(os.path.join(directory, os.path.basename(probe.name).lower()))
+
+
+def import_notes(path, notes_dir="notes", batch_size=BATCH_SIZE):
+    """
+    Writes the notes of an export into notes_dir. A note whose content is
+    already stored (under any title) is a duplicate and skipped; a title
+    that is taken by different content gets a " (2)", " (3)", ... suffix.
+
+    Titles are compared the way the filesystem compares file names, so on
+    a case-insensitive one "Todo" and "TODO" are the same title. A note
+    that cannot be written is skipped, so the import carries on.
+
+    Files are written as records stream in; the manifest is updated once
+    per batch, so each batch rehashes only the buckets it touched. History
+    and similarity signatures are not built here: the first edit starts a
+    note's history, and the Duplicates view signs unsigned notes itself.
+    Encrypted notes are exported and imported as stored.
+    """
+    stats = TransferStats("note")
+    os.makedirs(notes_dir, exist_ok=True)
+    index = NoteIndex(notes_dir)
+    index.refresh()
+    manifest = NoteManifest(notes_dir)
+    manifest.reconcile(index.entries)  # Hashes only notes changed since it was last written
+    hashes = {entry[0] for entry in manifest.notes.values()}
+    fold = str.casefold if _case_insensitive(notes_dir) else str
+    titles = {fold(title) for title in manifest.notes}
+
+    batch = []
+    for record in read_records(path, "notes", stats):
+        title, content = record.get("title"), record.get("content")
+        if not _usable_title(title) or not isinstance(content, str):
+            stats.skipped += 1
+            continue
+        digest = content_hash(content)
+        if digest in hashes:
+            stats.duplicates += 1
+            continue
+        free_title = _free_title(title, titles, fold)
+        if free_title != title and is_sealed(content):
+            stats.skipped += 1  # Sealed with its title; it cannot be renamed without the key
+            continue
+        title = free_title
+        note_path = os.path.join(notes_dir, f"{title}.txt")
+        try:
+            with open(note_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            mtime = record.get("mtime")
+            if isinstance(mtime, (int, float)):
+                os.utime(note_path, (mtime, mtime))  # Keep "Modified" sorting meaningful
+            stat = os.stat(note_path)
+        except OSError:
+            stats.skipped += 1  # A name this filesystem rejects, or out of space
+            continue
+        batch.append((title, digest, stat.st_mtime, stat.st_size))
+        hashes.add(digest)
+        titles.add(fold(title))
+        stats.imported += 1
+        if len(batch) >= batch_size:
+            manifest.record_batch(batch)
+            batch = []
+    if batch:
+        manifest.record_batch(batch)
+    return stats.finish(path)
+
+
+def _free_title(title, titles, fold=str):
+    if fold(title) not in titles:
+        return title
+    n = 2
+    while fold(f"{title} ({n})") in titles:
+        n += 1
+    return f"{title} ({n})"
@@ -1,10 +1,17 @@
+import asyncio
+import collections
 import pyperclip
-import time
-import threading
 import tkinter as tk
 from tkinter import messagebox, Toplevel, Text, ttk
-from utils.theme_manager_classes import ThemeManager  # Import the ThemeManager class
+from utils.theme_manager_classes import get_theme_manager
 from utils.message_popup import MessagePopup
+from utils.notifications import notify
+from utils.similarity_index import SimilarityIndex
+from utils import profiling
+from utils.async_core import get_async_core
+from utils.background_worker import BackgroundWorker, atomic_write
+from utils.encryption import UnlockCancelled, get_vault, unlock_vault
+from utils.preview_cache import PreviewCache
 import json
 import os
 
@@ -13,6 +20,8 @@ class ClipboardManager:
     Manages clipboard history and interacts with clipboard.
     """
 
+    MAX_HISTORY = 30
+
     def __init__(self, clipboard_app=None):
         """
         Initializes the ClipboardManager with optional reference to ClipboardApp.
@@ -20,31 +29,101 @@ class ClipboardManager:
         self.clipboard_history = []
         self.history_file = "clipboard_history.json"
         self.clipboard_app = clipboard_app  # Reference to the ClipboardApp instance
+        self.similarity = SimilarityIndex()  # MinHash/LSH index for near-duplicate clips
+        self.copies = collections.Counter()  # text -> copies in history; identical clips share one index key
+        self.vault = get_vault()  # Seals each clip on its own when encryption is enabled
+        self.unreadable = []  # Stored clips that failed authentication, written back unchanged
+        self.worker = None  # The app's BackgroundWorker; saves run on it once set
         self.load_history()  # Load existing history from file
 
-    def monitor_clipboard(self):
+    async def monitor_clipboard(self, core, bridge):
         """
         Continuously monitors the clipboard for new text and updates history.
-        Runs in a separate thread.
+        Runs as a task on the AsyncCore: the clipboard is read on its thread
+        pool, history and grid are updated on the Tk thread through bridge.
         """
         previous_text = ""
         while True:
-            current_text = pyperclip.paste()  # Get current text from clipboard
-            if current_text != previous_text and current_text not in self.clipboard_history:
-                self.add_to_history(current_text)  # Add new text to history
-                self.save_history()  # Save updated history to file
+            current_text = await core.run_blocking(pyperclip.paste)  # Get current text from clipboard
+            if current_text != previous_text and await core.call_tk(bridge, self.record_clip, current_text):
                 previous_text = current_text
-                if self.clipboard_app:
-                    self.clipboard_app.refresh_grid()  # Refresh the grid in the app
-            time.sleep(1)  # Check clipboard every second
+            await asyncio.sleep(1)  # Check clipboard every second
+
+    def record_clip(self, text):
+        """
+        Adds newly copied text to history and the grid, unless it is already
+        there. Returns True if it was added. Runs on the Tk thread.
+        """
+        if text in self.clipboard_history:
+            return False
+        self.add_to_history(text)  # Add new text to history
+        self.save_history()  # Save updated history to file
+        if self.clipboard_app:
+            self.clipboard_app.refresh_grid()  # Refresh the grid in the app
+        return True
 
     def add_to_history(self, text):
         """
-        Adds new text to clipboard history and removes oldest item if history exceeds 30 items.
+        Adds new text to clipboard history and removes oldest item if history exceeds MAX_HISTORY items.
         """
-        if len(self.clipboard_history) >= 30:
-            self.clipboard_history.pop(0)  # Remove the oldest item
+        if len(self.clipboard_history) >= self.MAX_HISTORY:
+            removed = self.clipboard_history.pop(0)  # Remove the oldest item
+            self._unindex(removed)
         self.clipboard_history.append(text)
+        self._index(text)
+
+    def remove_from_history(self, text):
+        """
+        Removes an item from clipboard history.
+        """
+        if text in self.clipboard_history:
+            self.clipboard_history.remove(text)
+            self._unindex(text)
+
+    def replace_in_history(self, old_text, new_text):
+        """
+        Replaces an item in clipboard history, keeping its position.
+        """
+        self.clipboard_history[self.clipboard_history.index(old_text)] = new_text
+        self._unindex(old_text)
+        self._index(new_text)
+
+    def _index(self, text):
+        self.copies[text] += 1
+        if self.copies[text] == 1:
+            self.similarity.add(text, text)
+
+    def _unindex(self, text):
+        # The key stays indexed while another copy of the text is in history
+        self.copies[text] -= 1
+        if self.copies[text] <= 0:
+            del self.copies[text]
+            self.similarity.remove(text)
+
+    def has_near_duplicate(self, text):
+        """
+        Returns True if another item in history is nearly identical to text.
+        """
+        return self.copies[text] > 1 or bool(self.similarity.similar(key=text, text=text))
+
+    def merge_near_duplicates(self):
+        """
+        Keeps only the newest item of each group of near-identical clips.
+        Returns the number of items removed.
+        """
+        removed = 0
+        for text, copies in list(self.copies.items()):
+            for _ in range(copies - 1):
+                self.remove_from_history(text)  # Exact copies: the oldest go first
+                removed += 1
+        positions = {text: i for i, text in enumerate(self.clipboard_history)}
+        for group in self.similarity.groups():
+            newest = max(group, key=lambda text: positions.get(text, -1))
+            for text in group:
+                if text != newest:
+                    self.remove_from_history(text)
+                    removed += 1
+        return removed
 
     def get_history(self):
         """
@@ -54,10 +133,28 @@ class ClipboardManager:
 
     def save_history(self):
         """
-        Saves the clipboard history to a JSON file.
+        Saves the clipboard history to a JSON file. The history is copied
+        here and sealed and written on the worker, if there is one, so the
+        Tk thread never waits on the disk; saves land in order.
+        """
+        if self.worker is None:
+            self.write_history(list(self.unreadable), list(self.clipboard_history))
+        else:
+            self.worker.submit(self.write_history, list(self.unreadable), list(self.clipboard_history))
+
+    def write_history(self, unreadable, history):
+        """
+        Writes a copy of the history. Clips are sealed one by one; unchanged
+        clips reuse their cached tokens. Clips that could not be decrypted
+        are kept ahead of them as they were stored.
         """
-        with open(self.history_file, 'w') as f:
-            json.dump(self.clipboard_history, f)
+        stored = unreadable + [self.vault.seal(text, "clip") for text in history]
+
+        def write(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(stored, f)
+
+        atomic_write(self.history_file, write)
 
     def load_history(self):
         """
@@ -65,23 +162,39 @@ class ClipboardManager:
         """
         if os.path.exists(self.history_file):
             with open(self.history_file, 'r') as f:
-                self.clipboard_history = json.load(f)
+                stored = json.load(f)
+            self.clipboard_history = []
+            self.unreadable = []
+            for value in stored:
+                try:
+                    self.clipboard_history.append(self.vault.open(value, "clip"))
+                except ValueError:
+                    # Failed authentication (tampered with, or another key): not shown, not lost
+                    self.unreadable.append(value)
+            for text in self.clipboard_history:
+                self._index(text)
 
 class ClipboardApp:
     """
     The GUI application for managing and displaying clipboard history.
     """
 
-    def __init__(self, root, clipboard_manager):
+    TILE_WIDTH = 30  # Tile width in text units
+    PREVIEW_LINES = 4  # Most lines of a clip shown on its tile
+
+    def __init__(self, root, clipboard_manager, theme_manager=None):
         """
         Initializes the ClipboardApp with the main application window and clipboard manager.
+        Theme state is shared process-wide unless a theme_manager is passed.
         """
         self.root = root
         self.root.title("Clipboard Manager")
         self.clipboard_manager = clipboard_manager
         self.clipboard_manager.clipboard_app = self  # Pass reference to ClipboardManager
+        self.clipboard_manager.worker = BackgroundWorker(root)  # History saves run off the Tk thread
 
-        self.theme_manager = ThemeManager()  # Initialize the theme manager
+        self.theme_manager = theme_manager or get_theme_manager()
+        self.theme_manager.subscribe(self.on_theme_changed, owner=self.root)
         bg_color, fg_color, button_bg, button_fg = self.theme_manager.get_theme_colors(self.theme_manager.current_theme)
 
         # Set minimum window size
@@ -104,60 +217,69 @@ class ClipboardApp:
         self.delete_button = tk.Button(self.button_frame, text="Delete", command=self.delete_selected, bg=button_bg, fg=button_fg)
         self.delete_button.pack(side=tk.LEFT, padx=5)
     
+        self.merge_button = tk.Button(self.button_frame, text="Merge Duplicates", command=self.merge_duplicates, bg=button_bg, fg=button_fg)
+        self.merge_button.pack(side=tk.LEFT, padx=5)
+
         self.theme_toggle_button = tk.Button(self.button_frame, text="Switch Theme", command=self.toggle_theme, bg=button_bg, fg=button_fg)
         self.theme_toggle_button.pack(side=tk.LEFT, padx=5)
 
         # Apply the default system theme
         self.apply_theme()
 
+        # Wrapped tile texts, measured with the tile font once per clip (not per refresh)
+        self.previews = PreviewCache(root, width_chars=self.TILE_WIDTH, max_lines=self.PREVIEW_LINES,
+                                     on_ready=self.update_previews)
+
         self.refresh_grid()  # Initial refresh to display the current clipboard history
+        if self.clipboard_manager.unreadable:
+            self.show_message(f"{len(self.clipboard_manager.unreadable)} clip(s) could not be decrypted and are "
+                              "hidden. They are kept in the history file unchanged.", title="Clipboard Manager",
+                              error=True)
+
+        # Ctrl+Alt+P: hidden profiling menu
+        profiling.install(root, on_report=lambda directory: self.show_message(f"Profile written to {directory}", title="Profiling"))
 
     def toggle_theme(self):
         """
         Toggles between light and dark themes.
         """
-        # Toggle the theme using ThemeManager
+        # Toggle the theme using ThemeManager (one batched pass over registered widgets)
         self.theme_manager.toggle_theme(self.root)
 
-        # Reapply the theme to all widgets
-        self.apply_theme()
+    def on_theme_changed(self, theme, palette):
+        """
+        Theme subscription: the switch resets every tile, so restore the selection highlight.
+        """
+        for label in getattr(self, 'selected_labels', []):
+            if label.winfo_exists():
+                label.config(bg="lightblue")
 
     def apply_theme(self):
         """
         Applies the current theme to all widgets in the app.
         """
-        # Get the current theme colors
-        bg_color, fg_color, button_bg, button_fg = self.theme_manager.get_theme_colors(self.theme_manager.current_theme)
-        
-        # Apply theme to the root window
-        self.root.config(bg=bg_color)
-
-        # Apply theme to all frames
-        self.grid_frame.config(bg=bg_color)
-        self.button_frame.config(bg=bg_color)
-
-        # Apply theme to all buttons
-        for widget in self.button_frame.winfo_children():
-            if isinstance(widget, tk.Button):
-                widget.config(bg=button_bg, fg=button_fg)
+        self.theme_manager.apply_theme(self.root, self.theme_manager.current_theme)
 
-        # Apply theme to all labels in the grid
-        for widget in self.grid_frame.winfo_children():
-            if isinstance(widget, tk.Label):
-                widget.config(bg=button_bg, fg=button_fg)
-
-    def truncate_text(self, text, max_length=20):
+    def show_preview(self, label):
         """
-        Truncates the text to a specified maximum length, adding ellipsis if truncated.
+        Shows the cached preview of a tile's text, sized to its wrapped lines.
+        Until the preview is computed the tile shows the start of the first line.
+        Returns True if the preview was ready.
         """
-        return (text[:max_length] + '...') if len(text) > max_length else text
+        preview = self.previews.get(label.preview_text)
+        if preview is None:
+            label.config(text=label.preview_text.split("\n", 1)[0][:self.TILE_WIDTH], height=1)
+            return False
+        label.config(text=preview.text, height=len(preview.lines))
+        return True
 
-    def calculate_label_height(self, text, max_length=20):
+    def update_previews(self):
         """
-        Calculates the height of the label based on the length of the truncated text.
+        Preview cache callback: fills in the tiles whose previews just became ready.
         """
-        lines = (len(text) // max_length) + 1
-        return lines * 2  # Adjust multiplier as needed to fit text properly
+        for label in self.grid_frame.winfo_children():
+            if getattr(label, "preview_text", None) is not None:
+                self.show_preview(label)
 
     def refresh_grid(self):
         """
@@ -172,8 +294,6 @@ class ClipboardApp:
         # Get the current clipboard history
         clipboard_history = self.clipboard_manager.get_history()
         num_columns = 3  # Number of columns in the grid
-        fixed_width = 30  # Fixed width for labels
-        max_length = 20  # Maximum length for truncation
 
         # Clear the selected_labels list
         if hasattr(self, 'selected_labels'):
@@ -182,24 +302,23 @@ class ClipboardApp:
         for index, item in enumerate(clipboard_history):
             row = index // num_columns
             column = index % num_columns
-            truncated_text = self.truncate_text(item, max_length)  # Truncate text for label
-            label_height = self.calculate_label_height(truncated_text, max_length)  # Calculate label height
 
             # Create a label for each item in the history
             label = tk.Label(
                 self.grid_frame,
-                text=truncated_text,
                 borderwidth=1,
                 relief="solid",
-                width=fixed_width,
-                height=label_height,
-                wraplength=250,
+                width=self.TILE_WIDTH,
                 anchor=tk.W,
                 justify=tk.LEFT,
                 bg=button_bg,
                 fg=button_fg
             )
+            # Preview text comes pre-wrapped from the cache; flag near-duplicate clips
+            label.preview_text = ("\u2248 " + item) if self.clipboard_manager.has_near_duplicate(item) else item
+            self.show_preview(label)
             label.grid(row=row, column=column, padx=5, pady=5)
+            self.theme_manager.register(label, "button")
             label.full_text = item  # Store the full text in the label
 
             # Bind double-click to copy text and single-click to select label
@@ -212,8 +331,8 @@ class ClipboardApp:
         for row in range((len(clipboard_history) + num_columns - 1) // num_columns):
             self.grid_frame.rowconfigure(row, weight=1)
 
-    def show_message(self, message, title="Notification", error=False):
-        MessagePopup(self.root, message, title, error)
+    def show_message(self, message, title="Notification", error=False, **options):
+        notify(self.root, message, title, error, **options)
 
 
     def select_label(self, label):
@@ -251,8 +370,7 @@ class ClipboardApp:
                 if confirm:
                     # Remove all selected items from history
                     for item in items_to_delete:
-                        if item in self.clipboard_manager.clipboard_history:
-                            self.clipboard_manager.clipboard_history.remove(item)
+                        self.clipboard_manager.remove_from_history(item)
 
                     # Save the updated history to file
                     self.clipboard_manager.save_history()
@@ -264,7 +382,8 @@ class ClipboardApp:
                     self.selected_labels = []
 
                     # Show a success message
-                    self.show_message("Item(s) deleted successfully!", title="Success")
+                    self.show_message("Item deleted successfully!", title="Success", key="clip-deleted",
+                                      count=len(items_to_delete), summary="{count} items deleted successfully!")
                     self.switch_to_grid_mode()
             else:
                 # Show a cancellation message
@@ -273,6 +392,23 @@ class ClipboardApp:
             # Show an error message if no items are selected
             self.show_message("No items selected!", title="Error", error=True)
 
+    def merge_duplicates(self):
+        """
+        Merges near-identical clips, keeping the newest of each group.
+        """
+        confirm = MessagePopup.ask_yes_no(self.root, "Merge Duplicates", "Keep only the newest of each group of near-identical items?")
+        if not confirm:
+            return
+
+        removed = self.clipboard_manager.merge_near_duplicates()
+        if removed:
+            self.clipboard_manager.save_history()
+            self.selected_labels = []
+            self.refresh_grid()
+            self.show_message(f"{removed} near-duplicate item(s) merged.", title="Success")
+        else:
+            self.show_message("No near-duplicates found.", title="Info")
+
     def toggle_editor_mode(self):
         """
         Toggles between grid mode and editor mode.
@@ -339,6 +475,7 @@ class ClipboardApp:
         cancel_button = tk.Button(editor_button_frame, text="Cancel", command=self.switch_to_grid_mode)
         cancel_button.pack(side=tk.LEFT, padx=5)
         cancel_button.config(bg=button_bg)
+        self.theme_manager.register_tree(self.editor_frame)
 
         # Update the mode flag
         self.is_editor_mode = True
@@ -377,7 +514,7 @@ class ClipboardApp:
         if new_text:
             # Update the clipboard history with the new text
             old_text = selected_label.full_text
-            self.clipboard_manager.clipboard_history[self.clipboard_manager.clipboard_history.index(old_text)] = new_text
+            self.clipboard_manager.replace_in_history(old_text, new_text)
             self.clipboard_manager.save_history()
 
             # Refresh the grid to reflect changes
@@ -404,3 +541,25 @@ class ClipboardApp:
             self.show_message("Text copied to clipboard!", title="Success")
         else:
             self.show_message("No text selected!", title="Error", error=True)
+
+
+def launch_clipboard_app(root):
+    """
+    Starts monitoring the clipboard and opens the Clipboard Manager in root.
+    Raises UnlockCancelled if encrypted clips stay locked; the caller closes root.
+    """
+    if not unlock_vault(root, "Clipboard Manager"):
+        raise UnlockCancelled("Clipboard Manager")
+    clipboard_manager = ClipboardManager()
+    app = ClipboardApp(root, clipboard_manager)
+    # Monitor the clipboard on the shared background loop until the window closes
+    core = get_async_core()
+    monitor = core.submit(root, clipboard_manager.monitor_clipboard(core, core.bridge(root)))
+
+    def on_destroy(event):
+        if event.widget is root:
+            monitor.cancel()
+            clipboard_manager.worker.run_now(lambda: None)  # Let the last save land before exit
+
+    root.bind("<Destroy>", on_destroy, add="+")
+    return app
@@ -0,0 +1,249 @@
+import os
+import tkinter as tk
+from tkinter.scrolledtext import ScrolledText
+from utils.style_runs import StyleRuns
+from utils.text_observer import TextObserver
+from utils.syntax_highlight import SyntaxHighlighter
+from utils.text_stats import TextStats
+from utils import tdat_format
+from utils.file_loader import TEXT_ENCODING, file_stat
+
+
+class EditorDocument:
+    """
+    One tab of the text editor.
+
+    A document is either live (it owns a ScrolledText, its observer and its
+    highlighter) or dormant, holding only a lightweight buffer:
+
+        ("text", text)   the text; styling stays in style_runs
+        ("file", path)   an unmodified file, reloaded when shown again (see
+                         file_changed() for edits made to it meanwhile)
+        None             an empty document
+
+    The tab page itself is an empty Frame, so dormant documents cost no
+    widgets beyond that. realize() builds the Text widget from the buffer;
+    hibernate() snapshots it back and destroys the widget.
+    """
+
+    _untitled = 0
+
+    def __init__(self, page, swap, current_font, path=None):
+        self.page = page
+        self.swap = swap
+        self.path = path
+        if path is None:
+            EditorDocument._untitled += 1
+            self.untitled_number = EditorDocument._untitled
+        self.current_font = current_font
+        self.style_runs = StyleRuns(current_font)
+        self.language = None
+        self.buffer = None if path is None else ("file", path)
+        self.view = None  # (first visible fraction, insert index) while dormant
+
+        # Edits that did not come from loading the file make the buffer dirty
+        self.dirty = False
+        self.saving = 0  # saves still being written by the worker
+        self.loader = None
+        self.progress_frame = None
+        self.loading_path = None
+        self.follower = None
+        self.followable = None
+        self.file_stat = None  # file_stat() of path when the buffer last matched the file
+
+        self.text_area = None
+        self.observer = None
+        self.highlighter = None
+        self.stats = None
+        self.font_tags = {}  # (family, size) -> tag name, per widget
+        self.viewport_listeners = []
+        self._viewport_after_id = None
+
+    @property
+    def title(self):
+        if self.path:
+            return os.path.basename(self.path)
+        return f"Untitled {self.untitled_number}"
+
+    @property
+    def live(self):
+        return self.text_area is not None
+
+    @property
+    def pinned(self):
+        """Documents being loaded, saved or followed cannot be made dormant."""
+        return self.loader is not None or self.follower is not None or self.saving > 0
+
+    # Lifecycle
+
+    def realize(self, bg, fg):
+        """
+        Creates the Text widget and fills it from the dormant buffer. Returns
+        the path still to be streamed in for ("file", path) buffers, else None.
+        """
+        self.text_area = ScrolledText(self.page, wrap="word", undo=True, bg=bg, fg=fg, width=80, height=30)
+        self.text_area.configure(font=self.current_font, yscrollcommand=self.on_yscroll)
+        self.text_area.pack(fill=tk.BOTH, expand=True)
+        self.font_tags = {}
+
+        pending_path = None
+        if self.buffer and self.buffer[0] == "text":
+            # Filled before the observer exists, so the style model and the
+            # journal (which already describe this text) see no edits
+            self.text_area.insert("1.0", self.buffer[1])
+            self.render_style_runs()
+        elif self.buffer and self.buffer[0] == "file":
+            pending_path = self.buffer[1]
+            self.style_runs.reset()
+        self.buffer = None
+
+        # Styling lives in a run-length model; Tk tags are only its rendering.
+        # Every insert goes through the observer, which tags new text with the
+        # current font in the same call and reports the edit to the model.
+        self.observer = TextObserver(self.text_area)
+        self.observer.insert_tags = lambda: self.font_tag(self.current_font)
+        self.observer.add_listener(self)
+        self.observer.add_listener(self.swap)
+        self.stats = TextStats(self.observer)
+        self.stats.stale = pending_path is None and self.text_area.compare("end - 1c", "!=", "1.0")
+        self.observer.add_listener(self.stats)
+        self.highlighter = SyntaxHighlighter(self.text_area, self.observer)
+        self.viewport_listeners = [self.highlighter.schedule]
+        self.highlighter.set_language(self.language)
+
+        if pending_path is None:
+            self.restore_view()
+        return pending_path
+
+    def hibernate(self):
+        """
+        Replaces the Text widget with a dormant buffer. Undo history and
+        find results of the tab are dropped.
+        """
+        if not self.live or self.pinned:
+            return
+        first = self.text_area.yview()[0]
+        self.view = (first, self.text_area.index(tk.INSERT))
+        if self.path and not self.dirty and self.file_stat is not None and not self.file_changed():
+            self.buffer = ("file", self.path)
+        else:
+            self.buffer = ("text", self.text_area.get("1.0", "end - 1c"))
+        self.highlighter.set_language(None)  # Drops its pending idle work
+        self.observer.close()
+        self.text_area.destroy()
+        self.text_area = self.observer = self.highlighter = self.stats = None
+        self.viewport_listeners = []
+        self.font_tags = {}
+
+    def file_changed(self):
+        """True if path was modified since the buffer last matched it."""
+        return self.file_stat is not None and file_stat(self.path) != self.file_stat
+
+    def restore_view(self):
+        if self.view is not None and self.live:
+            first, insert = self.view
+            self.text_area.mark_set(tk.INSERT, insert)
+            self.text_area.yview_moveto(first)
+            self.view = None
+
+    def close(self):
+        if self.live:
+            self.highlighter.set_language(None)
+            self.observer.close()
+        self.page.destroy()
+        self.text_area = self.observer = self.highlighter = None
+
+    def snapshot(self):
+        """
+        Returns (text, runs, current_font), live or dormant.
+        """
+        if self.live:
+            text = self.text_area.get("1.0", "end - 1c")
+        elif self.buffer and self.buffer[0] == "text":
+            text = self.buffer[1]
+        elif self.buffer:
+            path = self.buffer[1]
+            if path.endswith(".tdat"):
+                return tdat_format.read_tdat(path)
+            with open(path, "r", encoding=TEXT_ENCODING, errors="replace") as f:
+                text = f.read()
+        else:
+            text = ""
+        return text, [tuple(run) for run in self.style_runs.runs], self.current_font
+
+    # Style model
+
+    def font_tag(self, font_spec):
+        """Return the tag rendering a (family, size) font, configuring it once."""
+        font_spec = (font_spec[0], int(font_spec[1]))
+        tag = self.font_tags.get(font_spec)
+        if tag is None:
+            tag = f"font_{font_spec[0]}_{font_spec[1]}"
+            self.text_area.tag_configure(tag, font=font_spec)
+            self.font_tags[font_spec] = tag
+        return tag
+
+    def on_insert(self, offset, text):
+        """Observer callback: new text takes the current font."""
+        self.style_runs.insert(offset, len(text), self.current_font)
+        if self.loader is None:
+            self.dirty = True
+
+    def on_delete(self, offset, text):
+        """Observer callback: drop the deleted characters from the style model."""
+        self.style_runs.delete(offset, len(text))
+        if self.loader is None:
+            self.dirty = True
+
+    def on_reset(self):
+        """Observer callback: rebuild the style model after undo/redo."""
+        self.resync_style_runs()
+        self.dirty = True
+
+    def resync_style_runs(self):
+        """Rebuild the style model from the font tags currently in the widget."""
+        length = self.observer.offset("end - 1c")
+        self.style_runs.reset(length, self.current_font)
+        for font_spec, tag in self.font_tags.items():
+            ranges = self.text_area.tag_ranges(tag)
+            for i in range(0, len(ranges), 2):
+                start = self.observer.offset(ranges[i])
+                end = self.observer.offset(ranges[i + 1])
+                self.style_runs.set_font(start, end, font_spec)
+
+    def render_style_runs(self):
+        """Replace the widget's font tags with one tag range per style run."""
+        for tag in self.font_tags.values():
+            self.text_area.tag_remove(tag, "1.0", "end")
+        # Walk the runs with relative indices so Tk only counts each run once
+        index = "1.0"
+        for start, end, font_spec in self.style_runs.spans():
+            end_index = self.text_area.index(f"{index} + {end - start} chars")
+            self.text_area.tag_add(self.font_tag(font_spec), index, end_index)
+            index = end_index
+
+    def load_runs(self, text_length, runs):
+        """Fill the style model from file runs; characters they leave unstyled keep the current font."""
+        self.style_runs.reset()
+        for length, font_spec in runs:
+            length = min(length, text_length - self.style_runs.length)
+            self.style_runs.insert(self.style_runs.length, length, font_spec or self.current_font)
+        self.style_runs.insert(self.style_runs.length, text_length - self.style_runs.length, self.current_font)
+
+    def apply_loaded_runs(self, runs):
+        """Replace the style model with runs read from a file and render it."""
+        self.load_runs(self.observer.offset("end - 1c"), runs)
+        self.render_style_runs()
+
+    # Viewport
+
+    def on_yscroll(self, first, last):
+        """Keep the scrollbar in sync and notify viewport listeners once per idle."""
+        self.text_area.vbar.set(first, last)
+        if self.viewport_listeners and self._viewport_after_id is None:
+            self._viewport_after_id = self.text_area.after_idle(self.viewport_changed)
+
+    def viewport_changed(self):
+        self._viewport_after_id = None
+        for listener in list(self.viewport_listeners):
+            listener()
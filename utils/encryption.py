@@ -0,0 +1,247 @@
+import base64
+import collections
+import hashlib
+import hmac
+import json
+import os
+import threading
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+    HAS_CRYPTOGRAPHY = True
+except ImportError:
+    # Encryption is optional; the package is only needed once it is enabled
+    HAS_CRYPTOGRAPHY = False
+
+    class InvalidTag(Exception):
+        pass
+
+KEY_FILE = ".clipboard_list_key.json"
+TOKEN_PREFIX = "enc1:"  # sealed text entries
+BLOB_MAGIC = b"ENC1"  # sealed binary objects
+NONCE_SIZE = 12
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+CACHE_SIZE = 512  # decrypted entries kept in memory
+
+_vault = None
+_vault_lock = threading.Lock()
+
+
+class VaultLocked(Exception):
+    """Raised when encrypted data is accessed before the vault is unlocked."""
+
+
+class UnlockCancelled(Exception):
+    """Raised by an app that cannot open because its vault stayed locked."""
+
+
+def get_vault():
+    """
+    Returns the process-wide Vault; it is unlocked once per session.
+    """
+    global _vault
+    with _vault_lock:
+        if _vault is None:
+            _vault = Vault()
+        return _vault
+
+
+def is_sealed(value):
+    return isinstance(value, str) and value.startswith(TOKEN_PREFIX)
+
+
+class Vault:
+    """
+    Optional per-entry authenticated encryption for clips, notes and note history.
+
+    Each entry is sealed on its own with AES-GCM under a key derived from a
+    passphrase (scrypt), with the entry's context (e.g. the note title) as
+    associated data, so entries cannot be swapped between notes unnoticed.
+    Stores stay in their usual format; a sealed text entry is just a string
+    starting with TOKEN_PREFIX, and plaintext entries are still read as-is,
+    so existing data is encrypted as it is next saved.
+
+    Nothing is decrypted until it is read (a note is opened, a clip loaded),
+    and both directions are cached: reading an entry twice, or saving an
+    unchanged one, costs a dict lookup instead of a cipher call.
+
+    Encryption is enabled by creating the key file (see enable()); without
+    it seal() returns its input. The cryptography package is only needed
+    once a key file exists.
+    """
+
+    def __init__(self, key_file=KEY_FILE):
+        self.key_file = key_file
+        self._aead = None
+        self._mac_key = None
+        self._lock = threading.Lock()
+        self._opened = collections.OrderedDict()  # (context, token) -> text
+        self._sealed = collections.OrderedDict()  # (context, text) -> token
+
+    @property
+    def enabled(self):
+        return os.path.exists(self.key_file)
+
+    @property
+    def unlocked(self):
+        return self._aead is not None
+
+    # Keys
+
+    @staticmethod
+    def _derive(passphrase, salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+        if not HAS_CRYPTOGRAPHY:
+            raise RuntimeError("Encryption needs the 'cryptography' package")
+        material = Scrypt(salt=salt, length=64, n=n, r=r, p=p).derive(passphrase.encode("utf-8"))
+        return AESGCM(material[:32]), material[32:]  # cipher, MAC key for object names
+
+    def enable(self, passphrase):
+        """
+        Creates the key file for a new passphrase and unlocks the vault.
+        """
+        if os.path.exists(self.key_file):
+            raise FileExistsError(f"{self.key_file} already exists")
+        salt = os.urandom(16)
+        aead, mac_key = self._derive(passphrase, salt)
+        nonce = os.urandom(NONCE_SIZE)
+        check = aead.encrypt(nonce, b"clipboard-list", b"verify")
+        with open(self.key_file, "w") as f:
+            json.dump({"version": 1, "kdf": "scrypt", "n": SCRYPT_N, "r": SCRYPT_R, "p": SCRYPT_P,
+                       "salt": base64.b64encode(salt).decode("ascii"),
+                       "check": base64.b64encode(nonce + check).decode("ascii")}, f)
+        self._aead, self._mac_key = aead, mac_key
+
+    def unlock(self, passphrase):
+        """
+        Derives the key from the passphrase. Returns False if it is wrong.
+        """
+        with open(self.key_file, "r") as f:
+            params = json.load(f)
+        aead, mac_key = self._derive(passphrase, base64.b64decode(params["salt"]),
+                                     params["n"], params["r"], params["p"])
+        check = base64.b64decode(params["check"])
+        try:
+            aead.decrypt(check[:NONCE_SIZE], check[NONCE_SIZE:], b"verify")
+        except InvalidTag:
+            return False
+        self._aead, self._mac_key = aead, mac_key
+        return True
+
+    def lock(self):
+        with self._lock:
+            self._aead = self._mac_key = None
+            self._opened.clear()
+            self._sealed.clear()
+
+    # Text entries
+
+    def seal(self, text, context=""):
+        """
+        Returns the stored form of a text entry: a token while encryption is
+        enabled, else the text itself.
+        """
+        if not self.enabled:
+            return text
+        if not self.unlocked:
+            raise VaultLocked("Unlock the vault to save encrypted data")
+        key = (context, text)
+        with self._lock:
+            token = self._sealed.get(key)
+            if token is not None:
+                self._sealed.move_to_end(key)
+                return token
+        nonce = os.urandom(NONCE_SIZE)
+        data = self._aead.encrypt(nonce, text.encode("utf-8"), context.encode("utf-8"))
+        token = TOKEN_PREFIX + base64.b64encode(nonce + data).decode("ascii")
+        self._remember(text, token, context)
+        return token
+
+    def open(self, value, context=""):
+        """
+        Returns the text of a stored entry; plaintext entries pass through.
+        Raises VaultLocked, or ValueError if the entry was tampered with.
+        """
+        if not is_sealed(value):
+            return value
+        key = (context, value)
+        with self._lock:
+            text = self._opened.get(key)
+            if text is not None:
+                self._opened.move_to_end(key)
+                return text
+        if not self.unlocked:
+            raise VaultLocked("Unlock the vault to read encrypted data")
+        blob = base64.b64decode(value[len(TOKEN_PREFIX):])
+        try:
+            text = self._aead.decrypt(blob[:NONCE_SIZE], blob[NONCE_SIZE:], context.encode("utf-8")).decode("utf-8")
+        except InvalidTag:
+            raise ValueError("Encrypted entry failed authentication") from None
+        self._remember(text, value, context)
+        return text
+
+    def _remember(self, text, token, context):
+        with self._lock:
+            for cache, key, value in ((self._opened, (context, token), text), (self._sealed, (context, text), token)):
+                cache[key] = value
+                cache.move_to_end(key)
+                if len(cache) > CACHE_SIZE:
+                    cache.popitem(last=False)
+
+    # Binary objects (note history)
+
+    def seal_bytes(self, data, context=""):
+        if not self.enabled:
+            return data
+        if not self.unlocked:
+            raise VaultLocked("Unlock the vault to save encrypted data")
+        nonce = os.urandom(NONCE_SIZE)
+        return BLOB_MAGIC + nonce + self._aead.encrypt(nonce, data, context.encode("utf-8"))
+
+    def open_bytes(self, data, context=""):
+        if not data.startswith(BLOB_MAGIC):
+            return data
+        if not self.unlocked:
+            raise VaultLocked("Unlock the vault to read encrypted data")
+        body = data[len(BLOB_MAGIC):]
+        try:
+            return self._aead.decrypt(body[:NONCE_SIZE], body[NONCE_SIZE:], context.encode("utf-8"))
+        except InvalidTag:
+            raise ValueError("Encrypted object failed authentication") from None
+
+    def digest(self, data):
+        """
+        Content address for data: plain SHA-256, or a keyed HMAC while
+        unlocked, so object names do not reveal their content.
+        """
+        if self.unlocked:
+            return hmac.new(self._mac_key, data, hashlib.sha256).hexdigest()
+        return hashlib.sha256(data).hexdigest()
+
+
+def unlock_vault(root, title="Unlock"):
+    """
+    Asks for the passphrase once per session if encryption is enabled and
+    the vault is still locked. Returns False if the user gave up.
+    """
+    from tkinter import messagebox, simpledialog
+
+    vault = get_vault()
+    if not vault.enabled or vault.unlocked:
+        return True
+    if not HAS_CRYPTOGRAPHY:
+        messagebox.showerror(title, "Your data is encrypted, but the 'cryptography' package is not installed.",
+                             parent=root)
+        return False
+    prompt = "Passphrase for your encrypted clips and notes:"
+    for _ in range(3):
+        passphrase = simpledialog.askstring(title, prompt, show="*", parent=root)
+        if passphrase is None:
+            return False
+        if vault.unlock(passphrase):
+            return True
+        prompt = "Wrong passphrase, try again:"
+    return False
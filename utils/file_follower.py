@@ -0,0 +1,94 @@
+import asyncio
+import os
+import threading
+from utils.async_core import get_async_core
+from utils.file_loader import TEXT_ENCODING, text_decoder
+
+
+class FileFollower:
+    """
+    Follows a growing file (tail -f) from a known byte offset.
+
+    A task on the shared AsyncCore stats the file every interval and, when
+    it grew, reads and decodes only the new bytes on the core's thread
+    pool; each piece is handed to on_data on the Tk thread before the next
+    is read. A file that shrank was truncated or rotated: on_truncate is
+    called and following restarts from the beginning of the (new) file.
+    stop() ends both sides.
+    """
+
+    INTERVAL_MS = 500
+    READ_SIZE = 1024 * 1024
+
+    def __init__(self, root, path, on_data, offset=0, on_truncate=None, on_error=None, encoding=TEXT_ENCODING):
+        self.root = root
+        self.path = path
+        self.on_data = on_data
+        self.on_truncate = on_truncate
+        self.on_error = on_error
+        self.encoding = encoding
+        self.offset = offset  # read so far
+        self.delivered_offset = offset  # handed to on_data
+        self.stopped = threading.Event()
+        self.core = get_async_core()
+        self._decoder = text_decoder(encoding)
+        self._handle = None
+
+    def start(self):
+        bridge = self.core.bridge(self.root)
+        self._handle = self.core.submit(self.root, self._watch(bridge), on_error=self._failed)
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self._handle is not None:
+            self._handle.cancel()  # Also cuts the current sleep short
+
+    async def _watch(self, bridge):
+        last_stat = None
+        while not self.stopped.is_set():
+            await asyncio.sleep(self.INTERVAL_MS / 1000)
+            stat = await self.core.run_blocking(os.stat, self.path)
+            if (stat.st_size, stat.st_mtime_ns) == last_stat:
+                continue  # Nothing changed: one stat per interval
+            last_stat = (stat.st_size, stat.st_mtime_ns)
+
+            if stat.st_size < self.offset:
+                self._decoder.reset()
+                self.offset = 0
+                await self.core.call_tk(bridge, self._deliver, "truncate", None, 0)
+            while stat.st_size > self.offset and not self.stopped.is_set():
+                text, decoded_offset = await self.core.run_blocking(self._read)
+                if decoded_offset is None:
+                    break  # Shrank again since the stat; the next one sees it
+                await self.core.call_tk(bridge, self._deliver, "data", text, decoded_offset)
+
+    def _read(self):
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(self.READ_SIZE)
+        if not data:
+            return "", None
+        self.offset += len(data)
+        text = self._decoder.decode(data)
+        # Bytes of a split character, and a CR held back, are re-read if following restarts here
+        pending, flag = self._decoder.getstate()
+        return text, self.offset - len(pending) - (flag & 1)
+
+    def _deliver(self, kind, text, offset):
+        if self.stopped.is_set():
+            return
+        self.delivered_offset = offset
+        if kind == "data":
+            if text:
+                self.on_data(text)
+        elif self.on_truncate:
+            self.on_truncate()
+
+    def _failed(self, error):
+        if self.stopped.is_set():
+            return
+        self.stopped.set()
+        self.delivered_offset = self.offset
+        if self.on_error:
+            self.on_error(error)
@@ -0,0 +1,150 @@
+import codecs
+import collections
+import io
+import os
+import threading
+from utils import tdat_format
+from utils.async_core import get_async_core
+
+# Plain text files are read and written in this encoding, whatever the locale
+TEXT_ENCODING = "utf-8"
+
+
+def file_stat(path):
+    """
+    Returns [size, mtime_ns] of a file, to tell later whether it changed,
+    or None if it cannot be read.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def text_decoder(encoding=TEXT_ENCODING):
+    """
+    Returns an incremental decoder that also turns CRLF and CR line endings
+    into "\n", like open() in text mode. A CR at the end of one chunk is held
+    back until the next shows whether an LF follows.
+    """
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(errors="replace"), translate=True)
+
+
+class ChunkedFileLoader:
+    """
+    Streams a text file into the Tk thread in chunks.
+
+    A task on the shared AsyncCore reads and decodes the file on the
+    core's thread pool and hands each chunk to on_chunk on the Tk thread.
+    At most MAX_IN_FLIGHT chunks are read ahead of the Tk side, so memory
+    stays bounded, and the first chunk is small so the first screenful
+    shows up right away. cancel() stops both sides.
+    """
+
+    FIRST_CHUNK_SIZE = 64 * 1024
+    CHUNK_SIZE = 512 * 1024
+    MAX_IN_FLIGHT = 4
+
+    def __init__(self, root, path, on_chunk, on_done=None, on_error=None, on_progress=None, encoding=TEXT_ENCODING):
+        self.root = root
+        self.path = path
+        self.on_chunk = on_chunk
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.encoding = encoding
+
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+        self.cancelled = threading.Event()
+        self.core = get_async_core()
+        self._handle = None
+
+    def start(self):
+        bridge = self.core.bridge(self.root)
+        self._handle = self.core.submit(self.root, self._load(bridge), on_done=self._finished,
+                                        on_error=self._failed)
+        return self
+
+    def cancel(self):
+        """
+        Stops reading; chunks already inserted stay in place.
+        """
+        self.cancelled.set()
+
+    def iter_chunks(self):
+        """
+        Yields (text, bytes_consumed) pieces of the file. Runs on the pool.
+        """
+        decoder = text_decoder(self.encoding)
+        with open(self.path, "rb") as f:
+            size = self.FIRST_CHUNK_SIZE
+            while not self.cancelled.is_set():
+                data = f.read(size)
+                size = self.CHUNK_SIZE
+                if not data:
+                    yield decoder.decode(b"", final=True), 0
+                    return
+                yield decoder.decode(data), len(data)
+
+    async def _load(self, bridge):
+        # The generator is only ever advanced by one pool thread at a time;
+        # cancellation is seen between chunks, so it is never abandoned mid-read
+        chunks = self.iter_chunks()
+        in_flight = collections.deque()
+        try:
+            while not self.cancelled.is_set():
+                piece = await self.core.run_blocking(next, chunks, None)
+                if piece is None:
+                    break
+                in_flight.append(self.core.call_tk(bridge, self._deliver, *piece))
+                if len(in_flight) >= self.MAX_IN_FLIGHT:
+                    await in_flight.popleft()
+            while in_flight:
+                await in_flight.popleft()
+        finally:
+            chunks.close()
+
+    def _deliver(self, text, size):
+        if self.cancelled.is_set():
+            return
+        self.bytes_read += size
+        if text:
+            self.on_chunk(text)
+        if self.on_progress:
+            self.on_progress(self.bytes_read, self.total_bytes)
+
+    def _finished(self, result):
+        if not self.cancelled.is_set() and self.on_done:
+            self.on_done()
+
+    def _failed(self, error):
+        if not self.cancelled.is_set() and self.on_error:
+            self.on_error(error)
+
+
+class TdatFileLoader(ChunkedFileLoader):
+    """
+    Streams the text payload of a binary (v2) .tdat file.
+
+    The header (fonts and style runs) is read up front on the Tk thread since
+    it is small; the payload is decompressed and decoded on the pool.
+    """
+
+    def __init__(self, root, path, on_chunk, **kwargs):
+        super().__init__(root, path, on_chunk, **kwargs)
+        with open(path, "rb") as f:
+            self.header = tdat_format.read_header(f)
+            self.payload_offset = f.tell()
+
+    def iter_chunks(self):
+        decoder = text_decoder("utf-8")
+        with open(self.path, "rb") as f:
+            f.seek(self.payload_offset)
+            yield "", self.payload_offset
+            for size, data in tdat_format.iter_payload(f, self.header, self.CHUNK_SIZE):
+                if self.cancelled.is_set():
+                    return
+                yield decoder.decode(data), size
+            yield decoder.decode(b"", final=True), 0
@@ -0,0 +1,361 @@
+import bisect
+import re
+import threading
+import tkinter as tk
+from utils.async_core import get_async_core
+
+
+class RegexSearch:
+    """
+    Runs a regex over a text snapshot on the AsyncCore thread pool and
+    streams the match offsets back to the Tk thread in batches.
+    """
+
+    BATCH_SIZE = 2000
+
+    def __init__(self, root, text, regex, on_batch, on_done, replacement=None):
+        self.root = root
+        self.text = text
+        self.regex = regex
+        self.replacement = replacement
+        self.on_batch = on_batch
+        self.on_done = on_done
+        self.cancelled = threading.Event()
+        self.core = get_async_core()
+
+    def start(self):
+        self.core.submit_blocking(self.root, self._run, self.core.bridge(self.root),
+                                  on_done=self._finished, on_error=self._finished)
+        return self
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _run(self, bridge):
+        batch = []
+        for match in self.regex.finditer(self.text):
+            if self.cancelled.is_set():
+                return
+            if match.end() == match.start():
+                continue  # Empty matches cannot be highlighted or replaced usefully
+            if self.replacement is None:
+                batch.append((match.start(), match.end()))
+            else:
+                batch.append((match.start(), match.end(), match.expand(self.replacement)))
+            if len(batch) >= self.BATCH_SIZE:
+                bridge.post(self._deliver, batch)
+                batch = []
+        bridge.post(self._deliver, batch)
+
+    def _deliver(self, batch):
+        if batch and not self.cancelled.is_set():
+            self.on_batch(batch)
+
+    def _finished(self, error):
+        # Batches were posted before the outcome, so they have all been delivered
+        if not self.cancelled.is_set():
+            self.on_done(error)
+
+
+class FindReplaceBar:
+    """
+    Find/replace bar for the text editor.
+
+    Searches run on a snapshot of the buffer off the Tk thread and are
+    redone (debounced) after edits. Match offsets are kept sorted; only the
+    matches inside the visible region are tagged, and the tags follow the
+    viewport as it scrolls. Replace All applies every replacement as one
+    undoable edit.
+    """
+
+    HIGHLIGHT_TAG = "find_match"
+    CURRENT_TAG = "find_current"
+    RESEARCH_DELAY_MS = 400
+
+    def __init__(self, editor):
+        self.editor = editor
+        self.root = editor.root
+        self.text_area = editor.text_area
+        self.observer = editor.observer
+
+        self.matches = []  # sorted (start, end) offsets
+        self.search = None
+        self.stale = False
+        self.current = None
+        self._research_id = None
+
+        bg_color, fg_color, button_bg, button_fg = editor.theme_manager.get_theme_colors(editor.theme_manager.current_theme)
+        self.frame = tk.Frame(self.root, bg=bg_color)
+
+        tk.Label(self.frame, text="Find:", bg=bg_color, fg=fg_color).pack(side=tk.LEFT, padx=(5, 2))
+        self.find_var = tk.StringVar(self.frame)
+        self.find_entry = tk.Entry(self.frame, textvariable=self.find_var, width=25, bg=button_bg, fg=fg_color)
+        self.find_entry.pack(side=tk.LEFT, pady=3)
+        self.find_entry.bind("<Return>", lambda event: self.find_next())
+        self.find_entry.bind("<Escape>", lambda event: self.hide())
+
+        tk.Label(self.frame, text="Replace:", bg=bg_color, fg=fg_color).pack(side=tk.LEFT, padx=(8, 2))
+        self.replace_var = tk.StringVar(self.frame)
+        tk.Entry(self.frame, textvariable=self.replace_var, width=20, bg=button_bg, fg=fg_color).pack(side=tk.LEFT)
+
+        self.case_var = tk.BooleanVar(self.frame, value=False)
+        tk.Checkbutton(self.frame, text="Match case", variable=self.case_var, command=self.start_search,
+                       bg=bg_color, fg=fg_color, selectcolor=button_bg).pack(side=tk.LEFT, padx=5)
+
+        for label, command in (("Prev", self.find_previous), ("Next", self.find_next),
+                               ("Replace", self.replace_current), ("Replace All", self.replace_all),
+                               ("Close", self.hide)):
+            tk.Button(self.frame, text=label, command=command, bg=button_bg, fg=button_fg).pack(side=tk.LEFT, padx=2)
+
+        self.status = tk.Label(self.frame, text="", bg=bg_color, fg=fg_color, anchor=tk.W)
+        self.status.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        self.text_area.tag_configure(self.HIGHLIGHT_TAG, background="yellow", foreground="black")
+        self.text_area.tag_configure(self.CURRENT_TAG, background="orange", foreground="black")
+        self.find_var.trace_add("write", lambda *args: self.schedule_search(150))
+
+    # Showing and hiding
+
+    def show(self):
+        if not self.frame.winfo_ismapped():
+            self.frame.pack(side=tk.TOP, fill=tk.X, before=self.editor.text_frame)
+            self.observer.add_listener(self)
+            self.editor.viewport_listeners.append(self.highlight_visible)
+        self.find_entry.focus_set()
+        self.find_entry.select_range(0, tk.END)
+        self.start_search()
+
+    def hide(self):
+        self.cancel_search()
+        self.frame.pack_forget()
+        self.observer.remove_listener(self)
+        if self.highlight_visible in self.editor.viewport_listeners:
+            self.editor.viewport_listeners.remove(self.highlight_visible)
+        self.matches = []
+        self._clear_tags()
+        self.text_area.focus_set()
+
+    # Observer callbacks: edits make the match list stale
+
+    def on_insert(self, offset, text):
+        self._edited()
+
+    def on_delete(self, offset, text):
+        self._edited()
+
+    def on_reset(self):
+        self._edited()
+
+    def _edited(self):
+        self.stale = True
+        self.schedule_search(self.RESEARCH_DELAY_MS)
+
+    # Searching
+
+    def compile(self):
+        pattern = self.find_var.get()
+        if not pattern:
+            return None
+        flags = 0 if self.case_var.get() else re.IGNORECASE
+        try:
+            return re.compile(pattern, flags | re.MULTILINE)
+        except re.error as e:
+            self.status.config(text=f"Invalid pattern: {e}")
+            return None
+
+    def schedule_search(self, delay):
+        if self._research_id is not None:
+            self.root.after_cancel(self._research_id)
+        self._research_id = self.root.after(delay, self.start_search)
+
+    def cancel_search(self):
+        if self._research_id is not None:
+            self.root.after_cancel(self._research_id)
+            self._research_id = None
+        if self.search is not None:
+            self.search.cancel()
+            self.search = None
+
+    def start_search(self):
+        """Search a fresh snapshot of the buffer on a worker thread."""
+        self.cancel_search()
+        self.matches = []
+        self.current = None
+        self._clear_tags()
+        regex = self.compile()
+        if regex is None:
+            if not self.find_var.get():
+                self.status.config(text="")
+            return
+        self.stale = False
+        self.status.config(text="Searching...")
+        snapshot = self.text_area.get("1.0", "end - 1c")
+        self.search = RegexSearch(self.root, snapshot, regex, self._add_matches, self._search_done).start()
+
+    def _add_matches(self, batch):
+        self.matches.extend(batch)
+        self.status.config(text=f"{len(self.matches):,} matches so far...")
+        self.highlight_visible()
+
+    def _search_done(self, error):
+        self.search = None
+        if error is not None:
+            self.status.config(text=f"Search failed: {error}")
+        else:
+            self.status.config(text=f"{len(self.matches):,} matches")
+
+    # Lazy highlighting
+
+    def _clear_tags(self):
+        self.text_area.tag_remove(self.HIGHLIGHT_TAG, "1.0", "end")
+        self.text_area.tag_remove(self.CURRENT_TAG, "1.0", "end")
+
+    def highlight_visible(self):
+        """Tag only the matches inside the visible region."""
+        self._clear_tags()
+        if not self.matches or self.stale:
+            return
+        top_index = self.text_area.index("@0,0")
+        bottom_index = self.text_area.index(f"@0,{self.text_area.winfo_height()} lineend")
+        top = self.observer.offset(top_index, remember=False)
+        bottom = top + self.observer.count(top_index, bottom_index)
+
+        first = bisect.bisect_left(self.matches, (top, -1))
+        # Include a match that starts above the view but reaches into it
+        if first > 0 and self.matches[first - 1][1] > top:
+            first -= 1
+        for position in range(first, len(self.matches)):
+            start, end = self.matches[position][:2]
+            if start > bottom:
+                break
+            tag = self.CURRENT_TAG if position == self.current else self.HIGHLIGHT_TAG
+            self.text_area.tag_add(tag, f"{top_index} + {start - top} chars", f"{top_index} + {end - top} chars")
+
+    # Navigation
+
+    def _select(self, position):
+        self.current = position
+        start, end = self.matches[position][:2]
+        start_index = self.text_area.index(f"1.0 + {start} chars")
+        end_index = self.text_area.index(f"{start_index} + {end - start} chars")
+        self.text_area.tag_remove(tk.SEL, "1.0", "end")
+        self.text_area.tag_add(tk.SEL, start_index, end_index)
+        self.text_area.mark_set(tk.INSERT, end_index)
+        self.text_area.see(start_index)
+        self.status.config(text=f"Match {position + 1:,} of {len(self.matches):,}")
+        self.highlight_visible()
+
+    def find_next(self):
+        if self.stale or not self.matches:
+            self.start_search()
+            return
+        cursor = self.observer.offset(tk.INSERT)
+        position = bisect.bisect_left(self.matches, (cursor, -1))
+        if self.current is not None and position < len(self.matches) and self.matches[position][0] == cursor \
+                and position == self.current:
+            position += 1
+        self._select(position % len(self.matches))
+
+    def find_previous(self):
+        if self.stale or not self.matches:
+            self.start_search()
+            return
+        cursor = self.observer.offset(tk.INSERT)
+        position = bisect.bisect_left(self.matches, (cursor, -1)) - 1
+        if self.current is not None and position == self.current:
+            position -= 1
+        self._select(position % len(self.matches))
+
+    # Replacing
+
+    def replace_current(self):
+        if self.current is None or self.stale:
+            self.find_next()
+            return
+        regex = self.compile()
+        if regex is None:
+            return
+        start, end = self.matches[self.current][:2]
+        # Match in place so anchors, lookbehind and lookahead see the same context as the search
+        match = regex.match(self.text_area.get("1.0", "end - 1c"), start)
+        if match is None or match.end() != end:
+            self.start_search()
+            return
+        start_index = self.text_area.index(f"1.0 + {start} chars")
+        end_index = self.text_area.index(f"{start_index} + {end - start} chars")
+        self.text_area.replace(start_index, end_index, match.expand(self.replace_var.get()))
+        # The edit schedules a fresh search; move on from here afterwards
+        self.current = None
+
+    def replace_all(self):
+        """Compute every replacement off-thread, then apply them as one undo step."""
+        regex = self.compile()
+        if regex is None:
+            return
+        self.cancel_search()
+        self.status.config(text="Preparing replacements...")
+        snapshot = self.text_area.get("1.0", "end - 1c")
+        replacements = []
+
+        def done(error):
+            self.search = None
+            if error is not None:
+                self.status.config(text=f"Replace failed: {error}")
+                return
+            if self.text_area.get("1.0", "end - 1c") != snapshot:
+                self.status.config(text="Text changed while preparing; try again.")
+                return
+            self.apply_replacements(snapshot, replacements)
+
+        self.search = RegexSearch(self.root, snapshot, regex, replacements.extend, done,
+                                  replacement=self.replace_var.get()).start()
+
+    def apply_replacements(self, snapshot, replacements):
+        # Positions come from the snapshot, and replacing from the end keeps
+        # earlier positions valid, so no Tk index arithmetic is needed
+        line_starts = [0]
+        position = snapshot.find("\n")
+        while position != -1:
+            line_starts.append(position + 1)
+            position = snapshot.find("\n", position + 1)
+
+        def to_index(offset):
+            line = bisect.bisect_right(line_starts, offset) - 1
+            return f"{line + 1}.{offset - line_starts[line]}"
+
+        autoseparators = self.text_area.cget("autoseparators")
+        self.text_area.configure(autoseparators=False)
+        self.text_area.edit_separator()
+        try:
+            for start, end, replacement in reversed(self._merge_regions(snapshot, replacements)):
+                self.text_area.replace(to_index(start), to_index(end), replacement)
+        finally:
+            self.text_area.edit_separator()
+            self.text_area.configure(autoseparators=autoseparators)
+        self.status.config(text=f"Replaced {len(replacements):,} matches")
+
+    def _merge_regions(self, snapshot, replacements):
+        """
+        Folds neighbouring replacements into (start, end, text) regions, so
+        Tk applies a few large edits instead of one per match. The text
+        between two matches is carried into a region only if it already has
+        the font inserted text gets, so styling ends up as with per-match
+        replaces; in a single-font document everything is one edit.
+        """
+        current_font = tuple(self.editor.current_font)
+        foreign = [(start, end) for start, end, font in self.editor.style_runs.spans()
+                   if tuple(font or ()) != current_font]
+        foreign_ends = [end for _, end in foreign]
+        regions = []
+        for start, end, replacement in replacements:
+            if regions:
+                region = regions[-1]
+                gap_start = region[1]
+                # First run in another font that ends inside or after the gap
+                i = bisect.bisect_right(foreign_ends, gap_start)
+                if start == gap_start or i == len(foreign) or foreign[i][0] >= start:
+                    region[2] += [snapshot[gap_start:start], replacement]
+                    region[1] = end
+                    continue
+            regions.append([start, end, [replacement]])
+        return [(start, end, "".join(parts)) for start, end, parts in regions]
@@ -0,0 +1,382 @@
+import mmap
+import os
+import re
+import threading
+import tkinter as tk
+from array import array
+from itertools import accumulate
+from tkinter import simpledialog
+from utils.async_core import get_async_core
+
+
+class LineIndex:
+    """
+    Sparse line-offset index over a memory-mapped file.
+
+    Only the byte offset of every STRIDE-th line is kept, so the index for a
+    multi-gigabyte file stays in the kilobytes. It is built on the AsyncCore
+    thread pool; lines that are not indexed yet are simply not reachable until
+    the scan gets there. Any line is found by jumping to the nearest indexed
+    line and skipping at most STRIDE-1 newlines in the mapping. grow() picks
+    up bytes appended later by scanning only those.
+    """
+
+    STRIDE = 256
+    BLOCK_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.size = os.path.getsize(path)
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.offsets = array("Q", [0])  # offset of line 0, STRIDE, 2*STRIDE, ...
+        self.line_count = 0 if not self.size else 1  # lines known so far
+        self.scanned_bytes = 0
+        self._newlines = 0  # newlines in the scanned bytes
+        self.complete = not self.size
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        if not self.complete:
+            core = get_async_core()
+            core.run(core.run_blocking(self._build))
+        return self
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            if isinstance(self.mm, mmap.mmap):
+                self.mm.close()
+            self.file.close()
+
+    def grow(self):
+        """
+        Re-maps the file if it changed size and indexes the new bytes in the
+        background. A file that shrank (truncated or rotated) is reopened and
+        indexed from the start. Returns True if the size changed.
+        """
+        if not self.complete or self._stop.is_set():
+            return False  # Let the running scan finish first
+        size = os.path.getsize(self.path)
+        if size == self.size:
+            return False
+        with self._lock:
+            if isinstance(self.mm, mmap.mmap):
+                self.mm.close()
+            if size < self.size:
+                self.file.close()
+                self.file = open(self.path, "rb")
+                size = os.fstat(self.file.fileno()).st_size
+                self.offsets = array("Q", [0])
+                self.line_count = 1 if size else 0
+                self.scanned_bytes = self._newlines = 0
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            self.size = size
+            self.complete = not size
+        self.start()
+        return True
+
+    def _build(self):
+        stride = self.STRIDE
+        position = self.scanned_bytes
+        lines = self._newlines  # newlines seen so far
+        try:
+            while position < self.size and not self._stop.is_set():
+                with self._lock:
+                    if self._stop.is_set():
+                        return
+                    block = self.mm[position:position + self.BLOCK_SIZE]
+                # Line starts inside the block (after each newline), in C loops
+                lengths = map(len, block.split(b"\n")[:-1])
+                starts = list(accumulate((n + 1 for n in lengths), initial=position))[1:]
+                first = (stride - (lines + 1) % stride) % stride
+                new_offsets = starts[first::stride]
+                lines += len(starts)
+                position += len(block)
+                with self._lock:
+                    self.offsets.extend(new_offsets)
+                    # A final line without a trailing newline still counts
+                    ends_with_newline = self.size and self.mm[self.size - 1:self.size] == b"\n"
+                    self.line_count = lines + (0 if position >= self.size and ends_with_newline else 1)
+                    self.scanned_bytes = position
+                    self._newlines = lines
+        except (ValueError, OSError):
+            return  # Mapping closed underneath us
+        self.complete = True
+
+    def line_offset(self, line):
+        """
+        Returns the byte offset where a line starts, or None if unknown.
+        """
+        with self._lock:
+            return self._line_offset(line)
+
+    def _line_offset(self, line):
+        # Caller holds the lock: the scan reads the mapping, which grow() may replace
+        if line < 0 or line >= self.line_count:
+            return None
+        offset = self.offsets[line // self.STRIDE]
+        for _ in range(line % self.STRIDE):
+            offset = self.mm.find(b"\n", offset) + 1
+        return offset
+
+    def get_lines(self, first, count, max_chars=10000):
+        """
+        Returns up to count decoded lines starting at line first.
+        """
+        with self._lock:
+            offset = self._line_offset(first)
+            if offset is None:
+                return []
+            lines = []
+            while len(lines) < count and offset < self.size:
+                end = self.mm.find(b"\n", offset)
+                if end == -1:
+                    end = self.size
+                raw = self.mm[offset:min(end, offset + max_chars * 4)]
+                lines.append(raw.decode("utf-8", errors="replace")[:max_chars].rstrip("\r"))
+                offset = end + 1
+            return lines
+
+    def line_of(self, byte_offset):
+        """
+        Returns the line number containing byte_offset (must be indexed).
+        """
+        with self._lock:
+            low, high = 0, len(self.offsets) - 1
+            while low < high:
+                middle = (low + high + 1) // 2
+                if self.offsets[middle] <= byte_offset:
+                    low = middle
+                else:
+                    high = middle - 1
+            return low * self.STRIDE + self.mm[self.offsets[low]:byte_offset].count(b"\n")
+
+    def search(self, pattern, start_offset, cancelled):
+        """
+        Returns the byte offset of the next regex match at or after
+        start_offset, or -1. Runs against the mapping in blocks; each block
+        is copied under the lock and scanned outside it, so a slow pattern
+        never holds up scrolling or indexing.
+        """
+        regex = re.compile(pattern.encode("utf-8"), re.IGNORECASE)
+        position = start_offset
+        overlap = 4096
+        lead = 256  # bytes before the block, so ^, \b and lookbehinds see their context
+        while position < self.size and not cancelled.is_set():
+            with self._lock:
+                if self._stop.is_set():
+                    return -1
+                end = min(self.size, position + self.BLOCK_SIZE)
+                block_start = max(0, position - lead)
+                block = self.mm[block_start:end]
+            match = regex.search(block, position - block_start)
+            if match:
+                return block_start + match.start()
+            if end >= self.size:
+                break
+            position = end - overlap
+        return -1
+
+
+class LargeFileViewer:
+    """
+    Read-only viewer that renders only the lines around the viewport.
+
+    The Text widget never holds more than one screenful; scrolling, jumping
+    and searching move a top-line pointer and re-read that window from the
+    memory-mapped file. In follow mode the file size is polled and only
+    appended bytes are indexed; a viewport at the end stays at the end.
+    """
+
+    FOLLOW_INTERVAL_MS = 500
+
+    def __init__(self, parent, path, bg=None, fg=None, button_bg=None, button_fg=None, font=None, on_close=None):
+        self.path = path
+        self.on_close = on_close
+        self.index = LineIndex(path).start()
+        self.top_line = 0
+        self.highlight_line = None
+        self._follow_to_end = False
+        self._follow_id = None
+        self._search_cancel = threading.Event()
+
+        self.frame = tk.Frame(parent, bg=bg)
+
+        toolbar = tk.Frame(self.frame, bg=bg)
+        toolbar.pack(side=tk.TOP, fill=tk.X)
+        tk.Button(toolbar, text="Go to Line", command=self.ask_jump, bg=button_bg, fg=button_fg).pack(side=tk.LEFT, padx=2, pady=2)
+        self.search_entry = tk.Entry(toolbar, bg=button_bg, fg=fg)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=2)
+        self.search_entry.bind("<Return>", lambda event: self.find_next())
+        tk.Button(toolbar, text="Find Next", command=self.find_next, bg=button_bg, fg=button_fg).pack(side=tk.LEFT, padx=2)
+        self.follow_var = tk.BooleanVar(self.frame, value=False)
+        tk.Checkbutton(toolbar, text="Follow", variable=self.follow_var, command=self.toggle_follow,
+                       bg=bg, fg=fg, selectcolor=button_bg).pack(side=tk.LEFT, padx=2)
+        tk.Button(toolbar, text="Close", command=self.close, bg=button_bg, fg=button_fg).pack(side=tk.LEFT, padx=2)
+
+        self.status = tk.Label(self.frame, text="", anchor=tk.W, bg=bg, fg=fg)
+        self.status.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text = tk.Text(self.frame, wrap="none", bg=bg, fg=fg, font=font, state=tk.DISABLED)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.tag_configure("match", background="yellow", foreground="black")
+
+        self.text.bind("<Configure>", lambda event: self.render())
+        self.text.bind("<MouseWheel>", lambda event: self.scroll(-3 if event.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda event: self.scroll(3))
+        self.text.bind("<Prior>", lambda event: self.scroll(-self.visible_lines()))
+        self.text.bind("<Next>", lambda event: self.scroll(self.visible_lines()))
+        self.text.bind("<Up>", lambda event: self.scroll(-1))
+        self.text.bind("<Down>", lambda event: self.scroll(1))
+
+        self._poll_index()
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def close(self):
+        self._search_cancel.set()
+        self.index.close()
+        self.frame.destroy()
+        if self.on_close:
+            self.on_close()
+
+    def visible_lines(self):
+        line_height = max(1, self.text.tk.call("font", "metrics", self.text.cget("font"), "-linespace"))
+        return max(1, self.text.winfo_height() // int(line_height))
+
+    def scroll(self, amount):
+        self.jump(self.top_line + amount)
+        return "break"
+
+    def jump(self, line, highlight=False):
+        """
+        Moves the viewport so that line is at the top.
+        """
+        last_top = max(0, self.index.line_count - self.visible_lines())
+        self.top_line = max(0, min(line, last_top))
+        self.highlight_line = line if highlight else None
+        self.render()
+
+    def render(self):
+        """
+        Re-reads the window of lines for the current viewport.
+        """
+        if not self.frame.winfo_exists():
+            return
+        count = self.visible_lines()
+        lines = self.index.get_lines(self.top_line, count)
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        if self.highlight_line is not None and 0 <= self.highlight_line - self.top_line < len(lines):
+            row = self.highlight_line - self.top_line + 1
+            self.text.tag_add("match", f"{row}.0", f"{row}.end")
+        self.text.config(state=tk.DISABLED)
+
+        total = max(1, self.index.line_count)
+        self.scrollbar.set(self.top_line / total, min(1.0, (self.top_line + count) / total))
+        self._update_status()
+
+    def _update_status(self):
+        if self.index.complete:
+            state = f"{self.index.line_count:,} lines"
+        else:
+            percent = self.index.scanned_bytes * 100 // max(1, self.index.size)
+            state = f"indexing {percent}% ({self.index.line_count:,} lines so far)"
+        self.status.config(text=f"{os.path.basename(self.path)} (read-only) - line {self.top_line + 1:,} - {state}")
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.jump(int(float(args[1]) * self.index.line_count))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.scroll(amount * self.visible_lines() if args[2] == "pages" else amount)
+
+    def _poll_index(self):
+        # Keep the scrollbar and status current while the index grows
+        if not self.frame.winfo_exists():
+            return
+        self.render()
+        if not self.index.complete:
+            self.frame.after(250, self._poll_index)
+        elif self._follow_to_end:
+            self._follow_to_end = False
+            self.jump(self.index.line_count)
+
+    def toggle_follow(self):
+        if self._follow_id is not None:
+            self.frame.after_cancel(self._follow_id)
+            self._follow_id = None
+        if self.follow_var.get():
+            self._follow_to_end = True
+            self._poll_index()
+            self._follow_id = self.frame.after(self.FOLLOW_INTERVAL_MS, self._follow_tick)
+
+    def _follow_tick(self):
+        # One stat per tick; only bytes appended since the last tick are scanned
+        self._follow_id = None
+        if not self.frame.winfo_exists() or not self.follow_var.get():
+            return
+        at_end = self.top_line >= max(0, self.index.line_count - self.visible_lines())
+        try:
+            grew = self.index.grow()
+        except OSError as e:
+            self.follow_var.set(False)
+            self.status.config(text=f"Stopped following: {e}")
+            return
+        if grew:
+            self._follow_to_end = at_end
+            self._poll_index()
+        self._follow_id = self.frame.after(self.FOLLOW_INTERVAL_MS, self._follow_tick)
+
+    def ask_jump(self):
+        line = simpledialog.askinteger("Go to Line", f"Line number (1-{self.index.line_count:,}):",
+                                       parent=self.frame, minvalue=1)
+        if line:
+            self.jump(line - 1, highlight=True)
+
+    def find_next(self):
+        """
+        Searches the mapping for the entry's regex below the current match,
+        on the AsyncCore thread pool.
+        """
+        pattern = self.search_entry.get()
+        if not pattern:
+            return
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            self.status.config(text=f"Invalid pattern: {e}")
+            return
+
+        self._search_cancel.set()
+        self._search_cancel = cancelled = threading.Event()
+        start_line = self.top_line if self.highlight_line is None else self.highlight_line + 1
+        start_offset = self.index.line_offset(start_line) or 0
+        self.status.config(text=f"Searching for '{pattern}'...")
+
+        get_async_core().submit_blocking(self.frame, self.index.search, pattern, start_offset, cancelled,
+                                         on_done=lambda offset: self._search_done(cancelled, offset),
+                                         on_error=lambda error: self._search_failed(cancelled, error))
+
+    def _search_failed(self, cancelled, error):
+        if cancelled.is_set() or not self.frame.winfo_exists():
+            return
+        self.status.config(text=f"Search failed: {error}")
+
+    def _search_done(self, cancelled, offset):
+        if cancelled.is_set() or not self.frame.winfo_exists():
+            return
+        if offset == -1:
+            self.status.config(text="No more matches.")
+            return
+        line = self.index.line_of(offset)
+        self.jump(line - min(3, line), highlight=False)
+        self.highlight_line = line
+        self.render()
@@ -1,33 +1,12 @@
 import tkinter as tk
 from tkinter import Toplevel, Label, Button
-from utils.theme_manager_classes import ThemeManager
+from utils.theme_manager_classes import get_theme_manager
+from utils.notifications import notify
 
 class MessagePopup:
-    def __init__(self, parent, message, title="Notification", error=False):
-        self.theme_manager = ThemeManager()
-        bg_color, fg_color, button_bg, button_fg = self.theme_manager.get_theme_colors(self.theme_manager.current_theme)
-
-        # Create the popup window
-        self.popup = Toplevel(parent)
-        self.popup.title(title)
-        self.popup.config(bg=bg_color)
-        self.popup.geometry("300x150")
-        self.popup.resizable(False, False)
-
-        # Create and place the message label
-        label = Label(self.popup, text=message, bg=bg_color, fg=fg_color, font=("Helvetica", 12), wraplength=280)
-        label.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
-
-        # Create the close button
-        close_button = Button(self.popup, text="OK", command=self.popup.destroy, bg=button_bg, fg=button_fg)
-        close_button.pack(pady=10)
-
-        # Center the window
-        MessagePopup.center_window(self.popup, 300, 150)
-
-        # Auto-close for non-error messages after 2 seconds
-        if not error:
-            parent.after(2000, self.popup.destroy)
+    def __init__(self, parent, message, title="Notification", error=False, **options):
+        # Messages go through the application's pooled toast window
+        notify(parent, message, title, error, **options)
 
     @staticmethod
     def center_window(window, width, height):
@@ -41,8 +20,7 @@ class MessagePopup:
     def ask_yes_no(parent, title, message):
         result = None
         popup = Toplevel(parent)
-        theme_manager = ThemeManager()
-        bg_color, fg_color, button_bg, button_fg = theme_manager.get_theme_colors(theme_manager.current_theme)
+        bg_color, fg_color, button_bg, button_fg = get_theme_manager().palette
 
         popup.title(title)
         popup.config(bg=bg_color)
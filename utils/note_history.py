@@ -0,0 +1,208 @@
+import difflib
+import hashlib
+import json
+import os
+import time
+import zlib
+
+
+class NoteHistory:
+    """
+    Per-note version history stored as deltas in a content-addressed store.
+
+    Every saved revision is written either as a full keyframe or as a
+    line-level delta against the previous revision. Objects are zlib
+    compressed and named by their SHA-256, so identical keyframes or deltas
+    are stored once. A keyframe is forced every KEYFRAME_INTERVAL revisions,
+    which bounds how many deltas a restore has to replay.
+
+    Layout under <notes_dir>/.history:
+        objects/ab/abcdef...   compressed keyframe or delta
+        <title>.log            one JSON line per revision
+
+    With a vault (see utils.encryption) objects are sealed after
+    compression, and object names and revision hashes are keyed digests.
+    """
+
+    KEYFRAME_INTERVAL = 16
+
+    def __init__(self, notes_dir="notes", history_dir=".history", vault=None):
+        self.root = os.path.join(notes_dir, history_dir)
+        self.vault = vault
+        self.objects_dir = os.path.join(self.root, "objects")
+        self._versions = {}  # title -> list of revision dicts (cached log)
+        self._latest = {}  # title -> content of the newest revision
+
+    def _log_path(self, title):
+        return os.path.join(self.root, f"{title}.log")
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _put_object(self, payload):
+        """
+        Stores a payload and returns its digest; existing objects are reused.
+        """
+        data = payload.encode("utf-8")
+        digest = self._digest(data)
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            stored = zlib.compress(data)
+            if self.vault is not None:
+                stored = self.vault.seal_bytes(stored, digest)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(stored)
+            os.replace(tmp_path, path)
+        return digest
+
+    def _get_object(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            stored = f.read()
+        if self.vault is not None:
+            stored = self.vault.open_bytes(stored, digest)
+        return zlib.decompress(stored).decode("utf-8")
+
+    def _digest(self, data):
+        if self.vault is not None:
+            return self.vault.digest(data)
+        return hashlib.sha256(data).hexdigest()
+
+    def versions(self, title):
+        """
+        Returns the revisions of a note, oldest first. Each entry has
+        rev, time, size, hash and kind ("key" or "delta").
+        """
+        if title not in self._versions:
+            versions = []
+            try:
+                with open(self._log_path(title), "r") as f:
+                    for line in f:
+                        if line.strip():
+                            versions.append(json.loads(line))
+            except FileNotFoundError:
+                pass
+            self._versions[title] = versions
+        return self._versions[title]
+
+    def record(self, title, content, when=None):
+        """
+        Records a new revision of a note, saved at `when` (default: now).
+        Returns the revision number, or None if the content is identical to
+        the latest revision.
+        """
+        versions = self.versions(title)
+        content_hash = self._digest(content.encode("utf-8"))
+        if versions and versions[-1]["hash"] == content_hash:
+            return None
+
+        rev = versions[-1]["rev"] + 1 if versions else 1
+        kind, payload = "key", content
+        since_key = self._revisions_since_keyframe(versions)
+        if versions and since_key < self.KEYFRAME_INTERVAL - 1:
+            previous = self._latest.get(title)
+            if previous is None:
+                previous = self.restore(title, versions[-1]["rev"])
+            delta = self._make_delta(previous, content)
+            if len(delta) < len(content):
+                kind, payload = "delta", delta
+
+        entry = {
+            "rev": rev,
+            "time": time.time() if when is None else when,
+            "size": len(content),
+            "hash": content_hash,
+            "kind": kind,
+            "object": self._put_object(payload),
+        }
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._log_path(title), "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        versions.append(entry)
+        self._latest[title] = content
+        return rev
+
+    def seed(self, title, path, opener=None):
+        """
+        Records the note file at path as the first revision if the note has
+        no history yet. Call it before overwriting the file, so the first
+        save of a note written elsewhere (before history existed, imported,
+        synced in) keeps the text it replaces. opener turns the stored text
+        into content, e.g. a vault's open.
+        """
+        if self.versions(title):
+            return None
+        try:
+            with open(path, "r") as f:
+                stored = f.read()
+            content = opener(stored) if opener else stored
+            mtime = os.path.getmtime(path)
+        except (OSError, ValueError):
+            return None  # Missing, unreadable or failing authentication: nothing to keep
+        return self.record(title, content, when=mtime)
+
+    def restore(self, title, rev):
+        """
+        Rebuilds the content of a revision from its keyframe and deltas.
+        """
+        versions = self.versions(title)
+        position = next((i for i, v in enumerate(versions) if v["rev"] == rev), None)
+        if position is None:
+            raise KeyError(f"Note '{title}' has no revision {rev}")
+
+        start = position
+        while versions[start]["kind"] != "key":
+            start -= 1
+
+        content = self._get_object(versions[start]["object"])
+        for entry in versions[start + 1:position + 1]:
+            content = self._apply_delta(content, self._get_object(entry["object"]))
+        return content
+
+    def forget(self, title):
+        """
+        Drops the revision log of a note. Shared objects are left in place.
+        """
+        self._versions.pop(title, None)
+        self._latest.pop(title, None)
+        try:
+            os.remove(self._log_path(title))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _revisions_since_keyframe(versions):
+        count = 0
+        for entry in reversed(versions):
+            if entry["kind"] == "key":
+                return count
+            count += 1
+        return count
+
+    @staticmethod
+    def _make_delta(old, new):
+        """
+        Encodes new as line ranges copied from old plus inserted lines.
+        """
+        old_lines = old.splitlines(keepends=True)
+        new_lines = new.splitlines(keepends=True)
+        ops = []
+        matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                ops.append([i1, i2])
+            elif j2 > j1:
+                ops.append("".join(new_lines[j1:j2]))
+        return json.dumps(ops, separators=(",", ":"))
+
+    @staticmethod
+    def _apply_delta(old, delta):
+        old_lines = old.splitlines(keepends=True)
+        parts = []
+        for op in json.loads(delta):
+            if isinstance(op, str):
+                parts.append(op)
+            else:
+                parts.extend(old_lines[op[0]:op[1]])
+        return "".join(parts)
@@ -1,23 +1,57 @@
 import os
+import time
 import tkinter as tk
 from tkinter import messagebox, ttk
-import requests
-from dotenv import load_dotenv
 from utils.message_popup import MessagePopup
-from utils.theme_manager_classes import ThemeManager  # Import the ThemeManager class
+from utils.notifications import notify
+from utils.theme_manager_classes import get_theme_manager
+from utils.notes_index import NoteIndex
+from utils.notes_manifest import NoteManifest
+from utils.note_history import NoteHistory
+from utils.similarity_index import SimilarityIndex
+from utils.virtual_grid import VirtualGrid
+from utils.background_worker import BackgroundWorker
+from utils.encryption import UnlockCancelled, get_vault, unlock_vault
+from utils.preview_cache import PreviewCache
+from utils import profiling
 
 class NoteTakerApp:
-    def __init__(self, root):
+    TILE_WIDTH = 20  # Grid tile size in text units
+    TILE_HEIGHT = 6
+
+    def __init__(self, root, theme_manager=None):
         self.root = root
         self.selected_label = None  # Track the currently selected note
         self.selected_note = None  # Track selected note title
         self.root.title("Note Taker")
 
+        # Encrypted notes need the passphrase once per session; the caller closes root
+        if not unlock_vault(root, "Note Taker"):
+            raise UnlockCancelled("Note Taker")
+        self.vault = get_vault()
+
+        # Cached index of the notes folder; the grid queries this, never the disk
+        self.note_index = NoteIndex()
+        self.manifest = NoteManifest()  # Content hashes the mobile side syncs against
+        self.history = NoteHistory(vault=self.vault)  # Delta-compressed revisions of every save
+        self.similarity = SimilarityIndex(os.path.join(self.note_index.notes_dir, ".similarity.json"))
+        # Note files, manifest, history and similarity index are only touched
+        # by this worker, in order, so the window never waits on the disk
+        self.worker = BackgroundWorker(root)
+        # Content previews for the tiles, wrapped once per note version in the background
+        self.previews = PreviewCache(root, width_chars=self.TILE_WIDTH, max_lines=self.TILE_HEIGHT - 2,
+                                     on_ready=self.refresh_previews)
+        self.filter_var = tk.StringVar(root)
+        self.sort_var = tk.StringVar(root, value="Title")
+        self.filter_var.trace_add("write", lambda *args: self.apply_filter())
+        self.notes_grid = None
+
         # Set minimum window size
         self.root.minsize(800, 600)
 
-        # Initialize ThemeManager
-        self.theme_manager = ThemeManager()
+        # Theme state is shared by every window in the process
+        self.theme_manager = theme_manager or get_theme_manager()
+        self.theme_manager.subscribe(self.on_theme_changed, owner=self.root)
         bg_color, fg_color, button_bg, button_fg = self.theme_manager.get_theme_colors(self.theme_manager.current_theme)
 
         # Apply dark blue background
@@ -40,6 +74,9 @@ class NoteTakerApp:
         self.open_button = tk.Button(self.button_frame, text="Open", command=self.open_note, bg=button_bg, fg=button_fg)
         self.open_button.pack(side=tk.LEFT, padx=5, pady=5)
 
+        self.duplicates_button = tk.Button(self.button_frame, text="Duplicates", command=self.show_duplicates, bg=button_bg, fg=button_fg)
+        self.duplicates_button.pack(side=tk.LEFT, padx=5, pady=5)
+
         self.theme_button = tk.Button(self.button_frame, text="Switch Theme", command=self.toggle_theme, bg=button_bg, fg=button_fg)
         self.theme_button.pack(side=tk.LEFT, padx=5, pady=5)
 
@@ -49,6 +86,9 @@ class NoteTakerApp:
         # Initialize grid view
         self.show_grid_view()
 
+        # Ctrl+Alt+P: hidden profiling menu
+        profiling.install(root, on_report=lambda directory: self.show_message(f"Profile written to {directory}", title="Profiling"))
+
     def show_grid_view(self):
         """
         Display the grid view with note titles.
@@ -63,38 +103,73 @@ class NoteTakerApp:
         for widget in self.main_frame.winfo_children():
             widget.destroy()
 
-        # Create a center frame to hold the labels
-        center_frame = tk.Frame(self.main_frame, bg=bg_color)
-        center_frame.pack(anchor=tk.N, expand=True)  # Center the frame within the main_frame
-
-        # Fetch notes
-        notes = self.get_notes()
-
-        # Display notes in a grid (3 columns)
-        for i, note_title in enumerate(notes):
-            row = i // 3
-            col = i % 3
-
-            note_label = tk.Label(
-                center_frame,
-                text=note_title,
-                width=20,
-                height=6,
-                relief="solid",
-                borderwidth=1,
-                cursor="hand2",
-                wraplength=250,
-                bg=button_bg,
-                fg=button_fg
-            )
-            note_label.grid(row=row, column=col, padx=5, pady=5)
-
-            # Bind click event to selection
-            note_label.bind("<Button-1>", lambda event, lbl=note_label, title=note_title: self.select_note(lbl, title))
-
-        # Apply theme to existing selected label if any
-        if self.selected_label and self.selected_label.winfo_exists():
-            self.selected_label.config(bg="lightblue")  # Keep highlight effect
+        # Search and sort bar; both run against the cached note index
+        search_frame = tk.Frame(self.main_frame, bg=bg_color)
+        search_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+
+        search_entry = tk.Entry(search_frame, textvariable=self.filter_var, bg=button_bg, fg=fg_color)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+
+        sort_box = ttk.Combobox(search_frame, textvariable=self.sort_var, values=NoteIndex.SORT_KEYS,
+                                state="readonly", width=10)
+        sort_box.pack(side=tk.LEFT)
+        sort_box.bind("<<ComboboxSelected>>", lambda event: self.apply_filter())
+
+        # Virtualized grid: only the visible tiles exist as widgets (3 columns)
+        self.notes_grid = VirtualGrid(
+            self.main_frame,
+            render_tile=self.render_note_tile,
+            columns=3,
+            tile_width=self.TILE_WIDTH,
+            tile_height=self.TILE_HEIGHT,
+            bg=bg_color,
+            on_click=self.select_note,
+            on_double_click=lambda label, title: self.open_note(title),
+            theme_manager=self.theme_manager
+        )
+        self.notes_grid.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.theme_manager.register_tree(search_frame)
+
+        # Show the cached index now; refresh it in the background if the folder changed
+        self.apply_filter()
+        self.get_notes()
+
+    def apply_filter(self):
+        """
+        Re-queries the note index with the current search text and sort order.
+        """
+        if self.notes_grid is None or not self.notes_grid.frame.winfo_exists():
+            return
+        notes = self.note_index.query(self.filter_var.get(), self.sort_var.get())
+        self.notes_grid.set_items(notes)
+
+    def render_note_tile(self, label, note_title):
+        """
+        Configures a recycled grid tile for the given note: its title and,
+        once cached, a preview of its content.
+        """
+        bg_color, fg_color, button_bg, button_fg = self.theme_manager.get_theme_colors(self.theme_manager.current_theme)
+        text = note_title
+        entry = self.note_index.entries.get(note_title)
+        if entry is not None:
+            # Keyed by version so an edited note gets a fresh preview
+            preview = self.previews.get((note_title, *entry), self.load_preview)
+            if preview is not None and preview.text:
+                text = f"{note_title}\n{preview.text}"
+        if note_title == self.selected_note:
+            label.config(text=text, bg="lightblue", fg=button_fg)
+            self.selected_label = label
+        else:
+            label.config(text=text, bg=button_bg, fg=button_fg)
+
+    def load_preview(self, item):
+        """Preview cache loader, on a pool thread: the content of a (title, mtime, size) version."""
+        return self.read_note(item[0])
+
+    def refresh_previews(self):
+        """Preview cache callback: re-render the visible tiles with the new previews."""
+        if self.notes_grid is not None and self.notes_grid.frame.winfo_exists():
+            self.notes_grid.refresh_visible()
 
     def show_detail_view(self, title, is_new_note=False):
         """Display the detail view for a specific note."""
@@ -113,12 +188,11 @@ class NoteTakerApp:
         self.title_entry.pack(pady=10, fill=tk.X, padx=10)
         self.title_entry.insert(0, title if not is_new_note else "")
 
-        # Display content
+        # Display content (read in the background; read-only until it arrives)
         self.note_text = tk.Text(self.main_frame, width=50, height=20, bg=button_bg, fg=fg_color)
         self.note_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         if not is_new_note:
-            content = self.get_note_content(title)
-            self.note_text.insert("1.0", content)
+            self.get_note_content(title, self.note_text)
 
         button_frame = tk.Frame(self.main_frame, bg=bg_color)
         button_frame.pack(side=tk.BOTTOM)
@@ -131,33 +205,92 @@ class NoteTakerApp:
         back_button = tk.Button(button_frame, text="Back", command=self.show_grid_view, bg=button_bg, fg=button_fg)
         back_button.pack(side=tk.LEFT, padx=5, pady=5)
 
+        # Add history button for existing notes
+        if not is_new_note:
+            history_button = tk.Button(button_frame, text="History", command=lambda: self.show_history(title), bg=button_bg, fg=button_fg)
+            history_button.pack(side=tk.LEFT, padx=5, pady=5)
+
+        self.theme_manager.register_tree(self.main_frame)
+
+    def show_history(self, title):
+        """
+        Lists the saved revisions of a note and loads the chosen one into the editor.
+        """
+        self.worker.submit(self.history.versions, title,
+                           on_done=lambda versions: self.show_versions(title, list(reversed(versions))),
+                           on_error=lambda e: self.show_message(f"Failed to load history: {e}", title="Error", error=True))
+
+    def show_versions(self, title, versions):
+        """
+        History popup for the given revisions, newest first.
+        """
+        bg_color, fg_color, button_bg, button_fg = self.theme_manager.get_theme_colors(self.theme_manager.current_theme)
+        if not versions:
+            self.show_message(f"No history for '{title}' yet.", title="History")
+            return
+
+        popup = tk.Toplevel(self.root)
+        popup.title(f"History - {title}")
+        popup.config(bg=bg_color)
+
+        version_list = tk.Listbox(popup, width=45, height=12, bg=button_bg, fg=fg_color, exportselection=0)
+        version_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        for version in versions:
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(version["time"]))
+            version_list.insert(tk.END, f"#{version['rev']}  {stamp}  ({version['size']} chars)")
+        version_list.selection_set(0)
+
+        def on_restore():
+            selection = version_list.curselection()
+            if not selection:
+                return
+            rev = versions[selection[0]]["rev"]
+            self.worker.submit(self.history.restore, title, rev, on_done=restored,
+                               on_error=lambda e: self.show_message(f"Failed to restore revision: {e}", title="Error", error=True))
+
+        def restored(content):
+            # Load into the editor; the user saves it as a new revision
+            if self.note_text.winfo_exists():
+                self.note_text.delete("1.0", tk.END)
+                self.note_text.insert("1.0", content)
+            if popup.winfo_exists():
+                popup.destroy()
+
+        restore_button = tk.Button(popup, text="Restore", command=on_restore, bg=button_bg, fg=button_fg)
+        restore_button.pack(pady=(0, 10))
+
     def add_note(self):
         """Switch to the new note-editing interface."""
         self.show_detail_view("New Note", is_new_note=True)
 
     def get_notes(self):
-        """Fetch notes locally from device storage."""
-        # Load local notes from device storage
-        try:
-            notes_dir = "notes"
-            if not os.path.exists(notes_dir):
-                os.makedirs(notes_dir)
-            return [f[:-4] for f in os.listdir(notes_dir) if f.endswith(".txt")]
-        except Exception as e:
-            self.show_message(f"Failed to load notes: {e}", title="Error", error=True)
-            return []
-
-    def get_note_content(self, title):
-        """Fetch note content from local storage."""
-        try:
-            with open(f"notes/{title}.txt", "r") as file:
-                return file.read()
-        except FileNotFoundError:
-            self.show_message(f"Note '{title}' not found locally.", title="Error", error=True)
-            return ""
-        except Exception as e:
-            self.show_message(f"Failed to load note content: {e}", title="Error", error=True)
-            return ""
+        """Refresh the note index from device storage in the background; the grid follows."""
+        self.worker.submit(self.note_index.refresh,
+                           on_done=lambda changed: changed and self.apply_filter(),
+                           on_error=lambda e: self.show_message(f"Failed to load notes: {e}", title="Error", error=True))
+
+    def get_note_content(self, title, text_widget):
+        """Fetch note content from local storage into text_widget, in the background."""
+        text_widget.config(state=tk.DISABLED)
+
+        def loaded(content):
+            if text_widget.winfo_exists():
+                text_widget.config(state=tk.NORMAL)
+                text_widget.insert("1.0", content)
+
+        def failed(e):
+            if text_widget.winfo_exists():
+                text_widget.config(state=tk.NORMAL)
+            if isinstance(e, FileNotFoundError):
+                self.show_message(f"Note '{title}' not found locally.", title="Error", error=True)
+            else:
+                self.show_message(f"Failed to load note content: {e}", title="Error", error=True)
+
+        self.worker.submit(self.read_note, title, on_done=loaded, on_error=failed)
+
+    def read_note(self, title):
+        with open(f"notes/{title}.txt", "r") as file:
+            return self.vault.open(file.read(), title)
 
     def open_note(self, title=None):
         """Open a note in detail view."""
@@ -177,7 +310,9 @@ class NoteTakerApp:
         bg_color, fg_color, button_bg, button_fg = self.theme_manager.get_theme_colors(self.theme_manager.current_theme)
 
         # Reset the background color of the previously selected label
-        if self.selected_label and self.selected_label.winfo_exists():
+        # (tiles are recycled, so only reset it if it still shows the old note)
+        if self.selected_label and self.selected_label.winfo_exists() and \
+                getattr(self.selected_label, "item", None) == self.selected_note:
             self.selected_label.config(bg=button_bg, fg=button_fg)
 
         # Set new selected label and apply highlight
@@ -193,6 +328,8 @@ class NoteTakerApp:
 
     def save_note(self, is_new_note):
         """Save the current note."""
+        if str(self.note_text.cget("state")) == tk.DISABLED:
+            return  # Content is still loading
         title = self.title_entry.get().strip()
         content = self.note_text.get("1.0", tk.END).strip()
 
@@ -200,13 +337,35 @@ class NoteTakerApp:
             self.show_message(f"Please enter a title for the note.", title="Error", error=True)
             return
 
-        try:
-            with open(f"notes/{title}.txt", "w") as file:
-                file.write(content)
-            self.show_message(f"Note saved successfully!", title="Success", error=False)
+        def saved(similar):
+            # The files are written: sync the index (a single stat) on the Tk thread
+            self.note_index.update(title)
+            if similar:
+                self.show_message(f"Note saved. It is nearly identical to: {', '.join(similar[:3])}", title="Success", error=False)
+            else:
+                self.show_message(f"Note saved successfully!", title="Success", error=False)
             self.show_grid_view()
-        except Exception as e:
-            self.show_message(f"Failed to save note: {e}", title="Error", error=True)
+
+        self.worker.submit(self.write_note, title, content, on_done=saved,
+                           on_error=lambda e: self.show_message(f"Failed to save note: {e}", title="Error", error=True))
+
+    def write_note(self, title, content):
+        """
+        Writes a note and its bookkeeping; runs on the worker. Returns the
+        titles of near-identical notes.
+        """
+        stored = self.vault.seal(content, title)  # The title is authenticated with the content
+        self.history.seed(title, f"notes/{title}.txt", lambda previous: self.vault.open(previous, title))
+        with open(f"notes/{title}.txt", "w") as file:
+            file.write(stored)
+        # Manifest first: its write touches the folder, the index sync must come after
+        # (it tracks the file as stored, like reconcile() does)
+        self.manifest.record_save(title, stored)
+        self.history.record(title, content)
+        stat = os.stat(f"notes/{title}.txt")
+        self.similarity.add(title, content, stamp=[stat.st_mtime, stat.st_size])
+        self.similarity.save()  # Appends this signature; the file is compacted only now and then
+        return [other for other, _ in self.similarity.similar(title)]
 
     def delete_note(self):
         """Delete the selected note locally."""
@@ -217,28 +376,75 @@ class NoteTakerApp:
 
         # Confirmation dialog using MessagePopup
         confirm = MessagePopup.ask_yes_no(self.root, "Confirm Delete", f"Are you sure you want to delete '{selected_note}'?")
-        if confirm:
-            try:
-                os.remove(f"notes/{selected_note}.txt")
-                self.show_message(f"Note '{selected_note}' deleted locally!", title="Success")
-                self.show_grid_view()
-            except FileNotFoundError:
+        if not confirm:
+            return
+
+        def deleted(result):
+            self.note_index.remove(selected_note)
+            if self.selected_note == selected_note:
+                self.selected_note = None
+                self.selected_label = None
+            self.show_message(f"Note '{selected_note}' deleted locally!", title="Success",
+                              key="note-deleted", summary="{count} notes deleted locally!")
+            self.show_grid_view()
+
+        def failed(e):
+            if isinstance(e, FileNotFoundError):
                 self.show_message(f"Note '{selected_note}' not found locally.", title="Error", error=True)
-            except Exception as e:
+            else:
                 self.show_message(f"Failed to delete note: {e}", title="Error", error=True)
 
+        self.worker.submit(self.remove_note, selected_note, on_done=deleted, on_error=failed)
+
+    def remove_note(self, title):
+        """Deletes a note file and its bookkeeping; runs on the worker."""
+        os.remove(f"notes/{title}.txt")
+        self.manifest.record_delete(title)
+        self.similarity.remove(title)
+        self.similarity.save()
+
+    def show_duplicates(self):
+        """
+        Lists groups of near-identical notes using the similarity index.
+        """
+        def found(groups):
+            if not groups:
+                self.show_message("No near-duplicate notes found.", title="Duplicates")
+                return
+            lines = [", ".join(sorted(group)) for group in groups[:10]]
+            self.show_message("Near-duplicates:\n" + "\n".join(lines), title="Duplicates")
+
+        self.worker.submit(self.find_duplicates, on_done=found,
+                           on_error=lambda e: self.show_message(f"Failed to load notes: {e}", title="Error", error=True))
+
+    def find_duplicates(self):
+        """Returns groups of near-identical note titles; runs on the worker."""
+        # (Re-)sign notes saved before the index existed or edited elsewhere since:
+        # each signature carries the (mtime, size) of the file it was made from
+        self.note_index.refresh(force=True)
+        stale = [title for title, (mtime, size) in self.note_index.entries.items()
+                 if self.similarity.stamps.get(title) != [mtime, size]]
+        for title in stale:
+            mtime, size = self.note_index.entries[title]
+            try:
+                with open(self.note_index.note_path(title), "r") as file:
+                    self.similarity.add(title, self.vault.open(file.read(), title), stamp=[mtime, size])
+            except (OSError, ValueError):
+                continue
+        for title in list(self.similarity.signatures):
+            if title not in self.note_index.entries:
+                self.similarity.remove(title)
+        self.similarity.save()
+        return self.similarity.groups()
+
     def toggle_theme(self):
         """Toggles between light and dark themes and updates the UI."""
         self.theme_manager.toggle_theme(self.root)  # Apply the new theme globally
 
-        # Get new theme colors
-        bg_color, fg_color, button_bg, button_fg = self.theme_manager.get_theme_colors(self.theme_manager.current_theme)
-
-        # Apply background color to main_frame
-        self.main_frame.config(bg=bg_color)
-
-        # Also update the button_frame (if needed)
-        self.button_frame.config(bg=bg_color)
+    def on_theme_changed(self, theme, palette):
+        """Theme subscription: re-render the visible tiles so the selected note stays highlighted."""
+        if self.notes_grid is not None and self.notes_grid.frame.winfo_exists():
+            self.notes_grid.refresh_visible()
 
-    def show_message(self, message, title="Notification", error=False):
-        MessagePopup(self.root, message, title, error)
\ No newline at end of file
+    def show_message(self, message, title="Notification", error=False, **options):
+        notify(self.root, message, title, error, **options)
\ No newline at end of file
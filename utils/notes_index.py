@@ -0,0 +1,96 @@
+import os
+
+
+class NoteIndex:
+    """
+    Cached index of the notes folder.
+
+    The folder is scanned once and kept as a dict of title -> (mtime, size).
+    Sorting and filtering run against this cache, so the grid never has to
+    touch the filesystem or the widgets to answer a query.
+    """
+
+    SORT_KEYS = ("Title", "Modified", "Size")
+
+    def __init__(self, notes_dir="notes"):
+        self.notes_dir = notes_dir
+        self.entries = {}  # title -> (mtime, size)
+        self._dir_mtime = None
+
+    def note_path(self, title):
+        """
+        Returns the path of the file backing the given note title.
+        """
+        return os.path.join(self.notes_dir, f"{title}.txt")
+
+    def refresh(self, force=False):
+        """
+        Rescans the notes folder if it changed since the last scan.
+        Returns True if a rescan happened.
+        """
+        if not os.path.exists(self.notes_dir):
+            os.makedirs(self.notes_dir)
+
+        dir_mtime = os.stat(self.notes_dir).st_mtime_ns
+        if not force and dir_mtime == self._dir_mtime:
+            return False
+
+        entries = {}
+        with os.scandir(self.notes_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".txt"):
+                    stat = entry.stat()
+                    entries[entry.name[:-4]] = (stat.st_mtime, stat.st_size)
+        self.entries = entries
+        self._dir_mtime = dir_mtime
+        return True
+
+    def update(self, title):
+        """
+        Refreshes a single entry after the note was written.
+        """
+        try:
+            stat = os.stat(self.note_path(title))
+        except FileNotFoundError:
+            self.entries.pop(title, None)
+        else:
+            self.entries[title] = (stat.st_mtime, stat.st_size)
+        self._sync_dir_mtime()
+
+    def remove(self, title):
+        """
+        Drops a single entry after the note was deleted.
+        """
+        self.entries.pop(title, None)
+        self._sync_dir_mtime()
+
+    def _sync_dir_mtime(self):
+        # Our own write already updated the cache, so a rescan is not needed
+        try:
+            self._dir_mtime = os.stat(self.notes_dir).st_mtime_ns
+        except FileNotFoundError:
+            self._dir_mtime = None
+
+    def titles(self):
+        """
+        Returns all cached note titles in folder order.
+        """
+        return list(self.entries)
+
+    def query(self, filter_text="", sort_key="Title", reverse=False):
+        """
+        Returns note titles matching filter_text, ordered by sort_key.
+        """
+        needle = filter_text.strip().lower()
+        if needle:
+            titles = [t for t in self.entries if needle in t.lower()]
+        else:
+            titles = list(self.entries)
+
+        if sort_key == "Modified":
+            titles.sort(key=lambda t: self.entries[t][0], reverse=not reverse)
+        elif sort_key == "Size":
+            titles.sort(key=lambda t: self.entries[t][1], reverse=not reverse)
+        else:
+            titles.sort(key=str.lower, reverse=reverse)
+        return titles
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+
+
+def content_hash(content):
+    """
+    Returns the hex SHA-256 digest of a note's content.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+class NoteManifest:
+    """
+    Merkle-style manifest of note content hashes.
+
+    Notes are spread over a fixed number of buckets by title. Each bucket
+    hash covers the (title, content hash) pairs in that bucket and the root
+    hash covers the bucket hashes, so an edit only rehashes one bucket and
+    the root. Every change is also appended to a bounded change log keyed by
+    the root hash it was applied to, which lets a client that knows an older
+    root ask for just the titles that changed since.
+    """
+
+    BUCKETS = 64
+    MAX_LOG_ENTRIES = 2000
+
+    def __init__(self, notes_dir="notes", manifest_file=".manifest.json"):
+        self.notes_dir = notes_dir
+        self.manifest_path = os.path.join(notes_dir, manifest_file)
+        self.notes = {}  # title -> [hash, mtime, size]
+        self.log = []  # [root_before, title, old_hash, new_hash]
+        self.bucket_members = [set() for _ in range(self.BUCKETS)]
+        self.bucket_hashes = [""] * self.BUCKETS
+        self.root_hash = ""
+        self.load()
+
+    def load(self):
+        """
+        Loads the manifest from disk and rebuilds the hash tree.
+        """
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r") as f:
+                    data = json.load(f)
+                self.notes = data.get("notes", {})
+                self.log = data.get("log", [])
+            except (OSError, ValueError):
+                self.notes, self.log = {}, []
+        self.bucket_members = [set() for _ in range(self.BUCKETS)]
+        for title in self.notes:
+            self.bucket_members[self._bucket_of(title)].add(title)
+        self.bucket_hashes = [self._hash_bucket(i) for i in range(self.BUCKETS)]
+        self._update_root()
+
+    def save(self):
+        """
+        Writes the manifest next to the notes.
+        """
+        os.makedirs(self.notes_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            # dumps() encodes in C; dump() to a file takes the pure-Python path
+            f.write(json.dumps({"notes": self.notes, "log": self.log}))
+        os.replace(tmp_path, self.manifest_path)
+
+    def _bucket_of(self, title):
+        return hashlib.md5(title.encode("utf-8")).digest()[0] % self.BUCKETS
+
+    def _hash_bucket(self, bucket):
+        digest = hashlib.sha256()
+        for title in sorted(self.bucket_members[bucket]):
+            digest.update(title.encode("utf-8") + b"\0" + self.notes[title][0].encode("ascii") + b"\n")
+        return digest.hexdigest()
+
+    def _update_root(self):
+        self.root_hash = hashlib.sha256("".join(self.bucket_hashes).encode("ascii")).hexdigest()
+
+    def _apply(self, title, new_entry):
+        """
+        Replaces one note's entry, rehashes its bucket and logs the change.
+        """
+        old_entry = self.notes.get(title)
+        old_hash = old_entry[0] if old_entry else None
+        new_hash = new_entry[0] if new_entry else None
+
+        bucket = self._bucket_of(title)
+        if new_entry is None:
+            self.notes.pop(title, None)
+            self.bucket_members[bucket].discard(title)
+        else:
+            self.notes[title] = new_entry
+            self.bucket_members[bucket].add(title)
+        if old_hash == new_hash:
+            return False
+
+        root_before = self.root_hash
+        self.bucket_hashes[bucket] = self._hash_bucket(bucket)
+        self._update_root()
+
+        self.log.append([root_before, title, old_hash, new_hash])
+        if len(self.log) > self.MAX_LOG_ENTRIES:
+            del self.log[:len(self.log) - self.MAX_LOG_ENTRIES]
+        return True
+
+    def record_save(self, title, content):
+        """
+        Updates the manifest after a note was written.
+        """
+        try:
+            stat = os.stat(os.path.join(self.notes_dir, f"{title}.txt"))
+            mtime, size = stat.st_mtime, stat.st_size
+        except FileNotFoundError:
+            mtime, size = 0, len(content)
+        if self._apply(title, [content_hash(content), mtime, size]):
+            self.save()
+
+    def record_batch(self, entries):
+        """
+        Updates the manifest after many notes were written at once (an
+        import). entries are (title, content_hash, mtime, size); each touched
+        bucket is rehashed once, all changes are logged against the root hash
+        before the batch, and the manifest is saved once.
+        """
+        root_before = self.root_hash
+        touched, changes = set(), []
+        for title, digest, mtime, size in entries:
+            old_entry = self.notes.get(title)
+            old_hash = old_entry[0] if old_entry else None
+            bucket = self._bucket_of(title)
+            self.notes[title] = [digest, mtime, size]
+            self.bucket_members[bucket].add(title)
+            if old_hash != digest:
+                touched.add(bucket)
+                changes.append([root_before, title, old_hash, digest])
+        if not changes:
+            return False
+
+        for bucket in touched:
+            self.bucket_hashes[bucket] = self._hash_bucket(bucket)
+        self._update_root()
+        self.log.extend(changes)
+        if len(self.log) > self.MAX_LOG_ENTRIES:
+            del self.log[:len(self.log) - self.MAX_LOG_ENTRIES]
+        self.save()
+        return True
+
+    def record_delete(self, title):
+        """
+        Updates the manifest after a note was deleted.
+        """
+        if self._apply(title, None):
+            self.save()
+
+    def reconcile(self, entries):
+        """
+        Brings the manifest in line with a NoteIndex-style {title: (mtime, size)}
+        map, rehashing only notes whose mtime or size changed on disk.
+        """
+        changed = False
+        for title in list(self.notes):
+            if title not in entries:
+                changed |= self._apply(title, None)
+
+        for title, (mtime, size) in entries.items():
+            known = self.notes.get(title)
+            if known and known[1] == mtime and known[2] == size:
+                continue
+            try:
+                with open(os.path.join(self.notes_dir, f"{title}.txt"), "rb") as f:
+                    digest = content_hash(f.read())
+            except OSError:
+                continue
+            # Stores the fresh mtime even when the content did not change
+            self._apply(title, [digest, mtime, size])
+            changed = True
+
+        if changed:
+            self.save()
+
+    def changes_since(self, manifest_hash):
+        """
+        Returns the titles added, changed and removed since manifest_hash.
+
+        If the hash is unknown (never seen, or older than the change log),
+        the result has "reset" set and lists every title as added.
+        """
+        result = {"manifest": self.root_hash, "reset": False, "added": [], "changed": [], "removed": []}
+        if manifest_hash == self.root_hash:
+            return result
+
+        start = None
+        for i in range(len(self.log) - 1, -1, -1):
+            if self.log[i][0] == manifest_hash:
+                start = i
+                break
+
+        if start is None:
+            result["reset"] = True
+            result["added"] = sorted(self.notes)
+            return result
+
+        # Collapse the log to the first old hash and last new hash per title
+        first_old, last_new = {}, {}
+        for _, title, old_hash, new_hash in self.log[start:]:
+            first_old.setdefault(title, old_hash)
+            last_new[title] = new_hash
+
+        for title, old_hash in first_old.items():
+            new_hash = last_new[title]
+            if old_hash == new_hash:
+                continue
+            if old_hash is None:
+                result["added"].append(title)
+            elif new_hash is None:
+                result["removed"].append(title)
+            else:
+                result["changed"].append(title)
+        return result
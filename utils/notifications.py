@@ -0,0 +1,137 @@
+import weakref
+import tkinter as tk
+from utils.theme_manager_classes import get_theme_manager
+
+_managers = weakref.WeakKeyDictionary()  # Tk root -> NotificationManager
+
+
+def get_notification_manager(widget):
+    """
+    Returns the NotificationManager of the Tk application a widget belongs to.
+    """
+    root = widget.nametowidget(".")
+    manager = _managers.get(root)
+    if manager is None:
+        manager = _managers[root] = NotificationManager(root)
+    return manager
+
+
+def notify(widget, message, title="Notification", error=False, **options):
+    """
+    Shows a message in the application's toast window; see NotificationManager.notify.
+    """
+    get_notification_manager(widget).notify(message, title, error, **options)
+
+
+class NotificationManager:
+    """
+    Shows transient messages in one reusable toast window per Tk application.
+
+    The window is created on first use and then only withdrawn and shown
+    again. Messages are queued rather than stacked as separate windows, and
+    messages with the same key (by default the same title, text and kind)
+    are merged while they wait or are on screen: five copies in a row show
+    one toast with a count, or the caller's summary ("5 items deleted").
+    Errors stay until dismissed; nothing here ever blocks the event loop.
+    """
+
+    WIDTH = 300
+    HEIGHT = 150
+    DISPLAY_MS = 2000
+    BUSY_DISPLAY_MS = 800  # Shorter while more messages are waiting
+    COALESCE_MS = 150  # A burst arriving within this window is merged before showing
+
+    def __init__(self, root):
+        self.root = root
+        self.window = None
+        self.pending = []  # Entries waiting to be shown, oldest first
+        self.current = None  # Entry on screen
+        self._show_id = None
+        self._hide_id = None
+
+    def notify(self, message, title="Notification", error=False, key=None, summary=None, count=1):
+        """
+        Queues a message. Messages sharing a key are merged; once merged,
+        summary.format(count=n) replaces the text if given, else " (xN)" is
+        appended. count lets one call stand for several events.
+        """
+        key = key or (title, message, error)
+        entry = self.current if self.current and self.current["key"] == key else None
+        if entry is None:
+            entry = next((queued for queued in self.pending if queued["key"] == key), None)
+        if entry is None:
+            self.pending.append({"key": key, "title": title, "message": message, "error": error,
+                                 "summary": summary, "count": count})
+            if self.current is not None and len(self.pending) == 1:
+                self._schedule_hide()  # Shorten the current toast so the backlog drains
+        else:
+            entry["count"] += count
+            entry["message"] = message
+            entry["error"] = entry["error"] or error
+            if entry is self.current:
+                self._render(entry)
+                self._schedule_hide()
+
+        if self.current is None and self._show_id is None:
+            self._show_id = self.root.after(self.COALESCE_MS, self._show_next)
+
+    @staticmethod
+    def text(entry):
+        if entry["count"] == 1:
+            return entry["message"]
+        if entry["summary"]:
+            return entry["summary"].format(count=entry["count"])
+        return f"{entry['message']} (x{entry['count']})"
+
+    def _ensure_window(self):
+        """Builds the toast window once; later messages only reconfigure it."""
+        if self.window is not None and self.window.winfo_exists():
+            return
+        self.window = tk.Toplevel(self.root)
+        self.window.withdraw()
+        self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.dismiss)
+        self.label = tk.Label(self.window, font=("Helvetica", 12), wraplength=self.WIDTH - 20)
+        self.label.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        self.button = tk.Button(self.window, text="OK", command=self.dismiss)
+        self.button.pack(pady=10)
+        x = (self.window.winfo_screenwidth() - self.WIDTH) // 2
+        y = (self.window.winfo_screenheight() - self.HEIGHT) // 2
+        self.window.geometry(f"{self.WIDTH}x{self.HEIGHT}+{x}+{y}")
+
+    def _render(self, entry):
+        bg_color, fg_color, button_bg, button_fg = get_theme_manager().palette
+        self.window.title(entry["title"])
+        self.window.config(bg=bg_color)
+        self.label.config(text=self.text(entry), bg=bg_color, fg=fg_color)
+        self.button.config(bg=button_bg, fg=button_fg)
+
+    def _show_next(self):
+        self._show_id = None
+        if not self.pending:
+            return
+        self.current = self.pending.pop(0)
+        self._ensure_window()
+        self._render(self.current)
+        self.window.deiconify()
+        self.window.lift()
+        self._schedule_hide()
+
+    def _schedule_hide(self):
+        if self._hide_id is not None:
+            self.root.after_cancel(self._hide_id)
+            self._hide_id = None
+        if self.current is not None and not self.current["error"]:
+            delay = self.BUSY_DISPLAY_MS if self.pending else self.DISPLAY_MS
+            self._hide_id = self.root.after(delay, self.dismiss)
+
+    def dismiss(self):
+        """Closes the message on screen and moves on to the next one."""
+        if self._hide_id is not None:
+            self.root.after_cancel(self._hide_id)
+            self._hide_id = None
+        self.current = None
+        if self.pending:
+            self._show_next()
+        elif self.window is not None and self.window.winfo_exists():
+            self.window.withdraw()
@@ -0,0 +1,181 @@
+import collections
+import hashlib
+import tkinter.font as tkfont
+from utils.async_core import get_async_core
+
+ELLIPSIS = "…"
+
+Preview = collections.namedtuple("Preview", "lines text height")  # height in pixels
+
+
+def text_digest(text):
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def wrap_lines(text, widths, width, max_lines):
+    """
+    Word-wraps text to `width` pixels using per-character widths, like a
+    wrapping Tk label would, and keeps at most max_lines lines; a cut-off
+    last line ends in an ellipsis. Pure Python, safe off the Tk thread.
+    """
+    space = widths.get(" ", 0)
+    lines = []
+    truncated = False
+    for paragraph in text.rstrip().replace("\r\n", "\n").replace("\t", "    ").split("\n"):
+        if len(lines) == max_lines:
+            truncated = True
+            break
+        line, line_width = "", 0
+        for word in paragraph.split(" "):
+            word_width = sum(widths.get(ch, 0) for ch in word)
+            gap = space if line else 0
+            if line_width + gap + word_width <= width:
+                line += (" " if line else "") + word
+                line_width += gap + word_width
+                continue
+            if line:
+                lines.append(line)
+                if len(lines) == max_lines:
+                    truncated = True
+                    break
+            # A word wider than the tile is broken between characters
+            line, line_width = "", 0
+            for ch in word:
+                ch_width = widths.get(ch, 0)
+                if line and line_width + ch_width > width:
+                    lines.append(line)
+                    if len(lines) == max_lines:
+                        truncated = True
+                        break
+                    line, line_width = "", 0
+                line += ch
+                line_width += ch_width
+            if truncated:
+                break
+        if truncated:
+            break
+        lines.append(line)
+
+    if len(lines) > max_lines:
+        lines, truncated = lines[:max_lines], True
+    if truncated and lines:
+        last = lines[-1]
+        limit = width - widths.get(ELLIPSIS, 0)
+        while last and sum(widths.get(ch, 0) for ch in last) > limit:
+            last = last[:-1]
+        lines[-1] = last.rstrip() + ELLIPSIS
+    return lines
+
+
+class PreviewCache:
+    """
+    Wrapped, pixel-measured previews of tile texts, computed once per entry.
+
+    An entry is keyed by the digest of its text together with the font and
+    the wrap width, so it survives grid refreshes and theme switches and is
+    only recomputed when the text, font or tile size changes. get() answers
+    from the cache on the Tk thread; misses are collected and computed
+    together in the background on the AsyncCore, and on_ready() is called
+    on the Tk thread once they are in.
+
+    Tk fonts can only be measured on the Tk thread, so character widths are
+    measured there once per distinct character and shared with the
+    background layout. Items can be the texts themselves, or keys whose text
+    is loaded in the background (a note file) by get()'s load argument.
+    """
+
+    MAX_ENTRIES = 2000
+
+    def __init__(self, widget, font="TkDefaultFont", width=None, width_chars=20, max_lines=4, padding=4,
+                 on_ready=None):
+        """
+        width is the wrap width in pixels; if omitted it is width_chars text
+        units of the font, matching a tk.Label of that width.
+        """
+        self.widget = widget
+        self.font = tkfont.nametofont(font) if isinstance(font, str) else font
+        if width is None:
+            width = width_chars * self.font.measure("0")
+        self.width = width
+        self.max_lines = max_lines
+        self.padding = padding
+        self.on_ready = on_ready
+        self.core = get_async_core()
+        self.line_height = self.font.metrics("linespace")
+        self.layout_key = (tuple(sorted(self.font.actual().items())), width, max_lines)
+
+        self._widths = {}  # character -> pixels; written on the Tk thread only
+        self._previews = collections.OrderedDict()  # (digest, layout key) -> Preview
+        self._digests = collections.OrderedDict()  # item -> digest of its text
+        self._wanted = {}  # item -> load, waiting for the next batch
+        self._pending = set()  # items being computed
+        self._flush_id = None
+        self._measure(ELLIPSIS + " ")
+
+    def get(self, item, load=None):
+        """
+        Returns the Preview of an item, or None if it is not computed yet;
+        in that case it is computed in the background. load(item) returns
+        the item's text on a pool thread; by default the item is the text.
+        """
+        digest = self._digests.get(item)
+        if digest is not None:
+            preview = self._previews.get((digest, self.layout_key))
+            if preview is not None:
+                self._digests.move_to_end(item)
+                self._previews.move_to_end((digest, self.layout_key))
+                return preview
+        if item not in self._pending:
+            self._wanted[item] = load
+            if self._flush_id is None:
+                self._flush_id = self.widget.after_idle(self._flush)
+        return None
+
+    def _flush(self):
+        self._flush_id = None
+        wanted, self._wanted = self._wanted, {}
+        self._pending.update(wanted)
+        bridge = self.core.bridge(self.widget)
+        self.core.submit(self.widget, self._compute(wanted, bridge, self.layout_key),
+                         on_done=self._store, on_error=lambda error: self._pending.difference_update(wanted))
+
+    async def _compute(self, wanted, bridge, layout_key):
+        texts, missing = await self.core.run_blocking(self._load, wanted, self._widths)
+        if missing:
+            await self.core.call_tk(bridge, self._measure, missing)
+        return await self.core.run_blocking(self._layout, texts, layout_key)
+
+    @staticmethod
+    def _load(wanted, widths):
+        texts, missing = {}, set()
+        for item, load in wanted.items():
+            try:
+                texts[item] = item if load is None else load(item)
+            except Exception:
+                texts[item] = ""  # Unreadable (deleted, locked): an empty preview
+            missing.update(ch for ch in set(texts[item]) if ch not in widths)
+        return texts, missing
+
+    def _measure(self, chars):
+        for ch in chars:
+            if ch not in self._widths:
+                self._widths[ch] = self.font.measure(ch)
+
+    def _layout(self, texts, layout_key):
+        results = {}
+        for item, text in texts.items():
+            lines = wrap_lines(text, self._widths, self.width, self.max_lines)
+            height = max(1, len(lines)) * self.line_height + 2 * self.padding
+            results[item] = (text_digest(text), layout_key, Preview(lines, "\n".join(lines), height))
+        return results
+
+    def _store(self, results):
+        for item, (digest, layout_key, preview) in results.items():
+            self._pending.discard(item)
+            self._digests[item] = digest
+            self._previews[(digest, layout_key)] = preview
+        for cache in (self._digests, self._previews):
+            while len(cache) > self.MAX_ENTRIES:
+                cache.popitem(last=False)
+        if results and self.on_ready:
+            self.on_ready()
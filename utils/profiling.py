@@ -0,0 +1,215 @@
+import atexit
+import contextlib
+import io
+import os
+import threading
+import time
+import tkinter as tk
+
+PROFILE_ENV = "CLIPBOARD_LIST_PROFILE"  # set to 1 to profile from startup
+PROFILE_DIR_ENV = "CLIPBOARD_LIST_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = "profiles"
+TRACE_FRAMES = 10
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 25
+
+_session = None
+_local = threading.local()
+
+
+class ProfileSession:
+    """
+    One profiling session of this process: cProfile on the Tk thread,
+    cProfile around the work of background threads, and a tracemalloc
+    baseline. stop() writes the reports to a session directory:
+
+        main.prof      pstats dump of the Tk event loop
+        threads.prof   pstats dump of all background work (if any ran)
+        report.txt     top functions and allocation sites, human readable
+
+    Profiles are per thread (that is how cProfile works). The Tk thread is
+    profiled from start() to stop(); background threads only inside
+    profiled() sections, which the workers wrap around each unit of work.
+    """
+
+    def __init__(self, directory):
+        # Imported on first use: the profiling modules would double launcher import time
+        import cProfile
+        import tracemalloc
+
+        self.directory = directory
+        self.started = time.time()
+        self.main_profile = cProfile.Profile()
+        self.thread_profiles = []  # (thread name, Profile)
+        self._lock = threading.Lock()
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        self._baseline = None
+
+    def start(self):
+        import tracemalloc
+
+        if self._owns_tracemalloc:
+            tracemalloc.start(TRACE_FRAMES)
+        self._baseline = tracemalloc.take_snapshot()
+        self.main_profile.enable()
+
+    def thread_profile(self):
+        """The calling thread's Profile for this session, created on first use."""
+        profile = getattr(_local, "profiles", {}).get(id(self))
+        if profile is None:
+            profile = type(self.main_profile)()
+            _local.profiles = {id(self): profile}
+            with self._lock:
+                self.thread_profiles.append((threading.current_thread().name, profile))
+        return profile
+
+    def stop(self):
+        """Stops profiling and writes the reports; returns the session directory."""
+        import pstats
+        import tracemalloc
+
+        self.main_profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+        os.makedirs(self.directory, exist_ok=True)
+        report = io.StringIO()
+        report.write(f"Profile session {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started))}, "
+                     f"{time.time() - self.started:.1f} s, pid {os.getpid()}\n")
+
+        self.main_profile.dump_stats(os.path.join(self.directory, "main.prof"))
+        self._write_functions(report, "Tk event loop", pstats.Stats(self.main_profile, stream=report))
+
+        with self._lock:
+            thread_profiles = list(self.thread_profiles)
+        if thread_profiles:
+            stats = None
+            for name, profile in thread_profiles:
+                stats = pstats.Stats(profile, stream=report) if stats is None else stats.add(profile)
+            stats.dump_stats(os.path.join(self.directory, "threads.prof"))
+            names = ", ".join(sorted({name for name, _ in thread_profiles}))
+            self._write_functions(report, f"Background threads ({names})", stats)
+
+        self._write_allocations(report, snapshot)
+        with open(os.path.join(self.directory, "report.txt"), "w") as f:
+            f.write(report.getvalue())
+        return self.directory
+
+    @staticmethod
+    def _write_functions(report, title, stats):
+        for sort_key in ("cumulative", "tottime"):
+            report.write(f"\n=== {title}: top {TOP_FUNCTIONS} by {sort_key} ===\n")
+            stats.sort_stats(sort_key).print_stats(TOP_FUNCTIONS)
+
+    def _write_allocations(self, report, snapshot):
+        import tracemalloc
+
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__),
+                  tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                  tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"))
+        snapshot = snapshot.filter_traces(ignore)
+        baseline = self._baseline.filter_traces(ignore)
+
+        report.write(f"\n=== Allocation growth during the session: top {TOP_ALLOCATIONS} sites ===\n")
+        for stat in snapshot.compare_to(baseline, "lineno")[:TOP_ALLOCATIONS]:
+            report.write(f"{stat}\n")
+        report.write(f"\n=== Live allocations at the end: top {TOP_ALLOCATIONS // 5} tracebacks ===\n")
+        for stat in snapshot.statistics("traceback")[:TOP_ALLOCATIONS // 5]:
+            report.write(f"{stat.count} blocks, {stat.size / 1024:.1f} KiB\n")
+            for line in stat.traceback.format():
+                report.write(f"  {line}\n")
+
+
+def active():
+    return _session is not None
+
+
+def start():
+    """Starts a session; call on the Tk thread, whose event loop it profiles."""
+    global _session
+    if _session is None:
+        base = os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR)
+        name = f"session-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        session = ProfileSession(os.path.join(base, name))
+        session.start()
+        _session = session
+    return _session
+
+
+def stop():
+    """Stops the session and writes its reports. Returns the report directory, or None."""
+    global _session
+    session, _session = _session, None
+    if session is None:
+        return None
+    return session.stop()
+
+
+@contextlib.contextmanager
+def profiled():
+    """
+    Profiles the enclosed work on the calling background thread while a
+    session is active; costs one global lookup otherwise.
+    """
+    session = _session
+    if session is None or getattr(_local, "depth", 0) or threading.current_thread() is threading.main_thread():
+        yield  # The Tk thread is covered by the session's main profile
+        return
+    profile = session.thread_profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Python 3.12+ profiles every thread with the one active profiler,
+        # so this work already lands in the Tk thread's profile
+        yield
+        return
+    _local.depth = 1
+    try:
+        yield
+    finally:
+        profile.disable()
+        _local.depth = 0
+
+
+def install(root, on_report=None):
+    """
+    Hooks profiling into an app window: starts a session if PROFILE_ENV is
+    set, and Ctrl+Alt+P opens a hidden menu to start or stop one.
+    on_report(directory) is called after a report is written.
+    """
+    def report_written(directory):
+        if directory and on_report:
+            on_report(directory)
+
+    def toggle():
+        if active():
+            report_written(stop())
+        else:
+            start()
+
+    def restart():
+        report_written(stop())
+        start()
+
+    menu = tk.Menu(root, tearoff=0)
+
+    def post_menu(event):
+        menu.delete(0, tk.END)
+        menu.add_command(label="Stop Profiling and Write Report" if active() else "Start Profiling",
+                         command=toggle)
+        if active():
+            menu.add_command(label="Write Report and Continue", command=restart)
+        menu.tk_popup(event.x_root, event.y_root)
+
+    root.bind("<Control-Alt-p>", post_menu, add="+")
+    root.bind("<Control-Alt-P>", post_menu, add="+")
+
+    if os.environ.get(PROFILE_ENV) and not active():
+        start()
+    if isinstance(root, tk.Tk):
+        # The main window owns the event loop: its end ends the session
+        root.bind("<Destroy>", lambda event: event.widget is root and stop(), add="+")
+
+
+atexit.register(stop)
@@ -0,0 +1,209 @@
+import json
+import os
+import re
+import zlib
+
+
+class SimilarityIndex:
+    """
+    MinHash signatures with an LSH band index for near-duplicate detection.
+
+    Each text is reduced to a fixed-size MinHash signature over its character
+    shingles. Signatures are split into bands and every band is hashed into a
+    bucket, so texts that share any bucket become candidates. Only candidates
+    are compared, which keeps lookups sub-linear in the number of entries.
+
+    With a path, signatures are persisted as a journal: one JSON line per
+    add (["+", key, signature, stamp]) or remove (["-", key]). save()
+    appends the changes made since the last save, and rewrites the file
+    compacted only once it holds more than COMPACT_RATIO lines per entry,
+    so saving after one edit does not cost a write of every signature.
+    """
+
+    NUM_PERM = 64
+    BANDS = 16  # 16 bands x 4 rows each
+    SHINGLE_SIZE = 5
+    THRESHOLD = 0.8
+    COMPACT_RATIO = 2
+
+    _PRIME = (1 << 61) - 1
+    _MAX_HASH = (1 << 32) - 1
+
+    def __init__(self, path=None, threshold=None):
+        self.path = path
+        self.threshold = self.THRESHOLD if threshold is None else threshold
+        self.rows = self.NUM_PERM // self.BANDS
+        self.signatures = {}  # key -> signature (list of ints)
+        self.stamps = {}  # key -> caller's marker of the signed version, e.g. [mtime, size]
+        self.buckets = {}  # (band, band hash) -> set of keys
+        self._pending = []  # journal lines not saved yet
+        self._logged = 0  # lines in the journal file
+        self._compact = False  # rewrite on the next save (older format)
+
+        # Fixed coefficients so signatures stay comparable across sessions
+        seed = 0x5EED
+        self._coeffs = []
+        for _ in range(self.NUM_PERM):
+            seed = (seed * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            a = (seed >> 3) % self._PRIME or 1
+            seed = (seed * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            b = (seed >> 3) % self._PRIME
+            self._coeffs.append((a, b))
+
+        if path:
+            self.load()
+
+    def signature(self, text):
+        """
+        Returns the MinHash signature of a text.
+        """
+        normalized = re.sub(r"\s+", " ", text.strip().lower())
+        size = self.SHINGLE_SIZE
+        if len(normalized) <= size:
+            shingles = {normalized}
+        else:
+            shingles = {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+
+        prime, max_hash = self._PRIME, self._MAX_HASH
+        return [min(((a * h + b) % prime) & max_hash for h in hashes) for a, b in self._coeffs]
+
+    def _bands(self, signature):
+        rows = self.rows
+        for band in range(self.BANDS):
+            yield band, hash(tuple(signature[band * rows:(band + 1) * rows]))
+
+    def add(self, key, text=None, signature=None, stamp=None):
+        """
+        Indexes a text (or a precomputed signature) under key. stamp is kept
+        with it (and saved) to tell later whether the text has changed.
+        """
+        if signature is None:
+            signature = self.signature(text)
+        self._index(key, signature, stamp)
+        if self.path:
+            self._pending.append(["+", key, signature, stamp])
+        return signature
+
+    def remove(self, key):
+        if self._unindex(key) and self.path:
+            self._pending.append(["-", key])
+
+    def _index(self, key, signature, stamp):
+        self._unindex(key)
+        self.signatures[key] = signature
+        if stamp is not None:
+            self.stamps[key] = stamp
+        for bucket in self._bands(signature):
+            self.buckets.setdefault(bucket, set()).add(key)
+
+    def _unindex(self, key):
+        signature = self.signatures.pop(key, None)
+        self.stamps.pop(key, None)
+        if signature is None:
+            return False
+        for bucket in self._bands(signature):
+            keys = self.buckets.get(bucket)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self.buckets[bucket]
+        return True
+
+    @staticmethod
+    def estimate(sig_a, sig_b):
+        """
+        Estimates the Jaccard similarity of two signatures.
+        """
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+    def similar(self, key=None, text=None, threshold=None):
+        """
+        Returns [(other_key, similarity)] for entries near-identical to the
+        given key or text, most similar first.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        signature = self.signatures.get(key) if key is not None else None
+        if signature is None:
+            signature = self.signature(text)
+
+        candidates = set()
+        for bucket in self._bands(signature):
+            candidates |= self.buckets.get(bucket, set())
+        candidates.discard(key)
+
+        matches = []
+        for other in candidates:
+            score = self.estimate(signature, self.signatures[other])
+            if score >= threshold:
+                matches.append((other, score))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+    def groups(self, threshold=None):
+        """
+        Returns clusters (lists of keys) of near-duplicate entries.
+        """
+        seen, groups = set(), []
+        for key in self.signatures:
+            if key in seen:
+                continue
+            group, stack = [key], [key]
+            seen.add(key)
+            while stack:
+                for other, _ in self.similar(stack.pop(), threshold=threshold):
+                    if other not in seen:
+                        seen.add(other)
+                        group.append(other)
+                        stack.append(other)
+            if len(group) > 1:
+                groups.append(group)
+        return groups
+
+    def load(self):
+        """
+        Replays the saved journal and rebuilds the band buckets. A line that
+        is a {key: signature} object is a snapshot in the older format.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line of an interrupted append
+                    self._logged += 1
+                    if isinstance(entry, dict):
+                        self._compact = True
+                        for key, signature in entry.items():
+                            if len(signature) == self.NUM_PERM:
+                                self._index(key, signature, None)
+                    elif entry[0] == "+" and len(entry[2]) == self.NUM_PERM:
+                        self._index(entry[1], entry[2], entry[3])
+                    elif entry[0] == "-":
+                        self._unindex(entry[1])
+        except OSError:
+            return
+
+    def save(self):
+        """
+        Writes the changes since the last save, compacting the journal when
+        it has grown well past the number of entries.
+        """
+        if not self.path or not self._pending:
+            return
+        if self._compact or self._logged + len(self._pending) > self.COMPACT_RATIO * len(self.signatures) + 64:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                for key, signature in self.signatures.items():
+                    f.write(json.dumps(["+", key, signature, self.stamps.get(key)], separators=(",", ":")) + "\n")
+            os.replace(tmp_path, self.path)
+            self._logged = len(self.signatures)
+            self._compact = False
+        else:
+            with open(self.path, "a") as f:
+                f.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in self._pending))
+            self._logged += len(self._pending)
+        self._pending = []
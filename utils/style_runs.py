@@ -0,0 +1,161 @@
+class StyleRuns:
+    """
+    Run-length model of the font applied to each character of a document.
+
+    The document is a list of [length, font] runs where font is a
+    (family, size) tuple. Adjacent runs never share a font: inserts extend
+    the neighbouring run when the font matches, and deletes merge the runs
+    they bring together. A cached position of the last touched run makes
+    sequential typing O(1) instead of a scan from the start.
+    """
+
+    def __init__(self, default_font):
+        self.default_font = tuple(default_font)
+        self.runs = []  # [length, font]
+        self.length = 0
+        self._hint = (0, 0)  # (run index, run start offset)
+
+    def reset(self, length=0, font=None):
+        """
+        Replaces the model with a single run of the given font.
+        """
+        font = tuple(font) if font else self.default_font
+        self.runs = [[length, font]] if length else []
+        self.length = length
+        self._hint = (0, 0)
+
+    def _locate(self, offset):
+        """
+        Returns (index, start) of the run containing offset, or
+        (len(runs), length) when offset is the end of the document.
+        """
+        index, start = self._hint
+        if index > len(self.runs) or start > self.length:
+            index, start = 0, 0
+        runs = self.runs
+        while index > 0 and start > offset:
+            index -= 1
+            start -= runs[index][0]
+        while index < len(runs) and start + runs[index][0] <= offset:
+            start += runs[index][0]
+            index += 1
+        self._hint = (index, start)
+        return index, start
+
+    def insert(self, offset, length, font):
+        """
+        Records length characters of font inserted at offset.
+        """
+        if length <= 0:
+            return
+        font = tuple(font)
+        offset = max(0, min(offset, self.length))
+        runs = self.runs
+        index, start = self._locate(offset)
+        self.length += length
+
+        if offset > start:
+            run = runs[index]
+            if run[1] == font:
+                run[0] += length
+            else:
+                head = offset - start
+                runs[index:index + 1] = [[head, run[1]], [length, font], [run[0] - head, run[1]]]
+                self._hint = (index + 1, offset)
+            return
+
+        # Insertion on a run boundary: extend a neighbour when the font matches
+        if index > 0 and runs[index - 1][1] == font:
+            runs[index - 1][0] += length
+            self._hint = (index - 1, start - runs[index - 1][0] + length)
+        elif index < len(runs) and runs[index][1] == font:
+            runs[index][0] += length
+        else:
+            runs.insert(index, [length, font])
+
+    def delete(self, offset, length):
+        """
+        Records length characters removed at offset.
+        """
+        offset = max(0, min(offset, self.length))
+        length = min(length, self.length - offset)
+        if length <= 0:
+            return
+        runs = self.runs
+        index, start = self._locate(offset)
+        cut = offset - start
+        remaining = length
+        end = index
+        while remaining > 0 and end < len(runs):
+            take = min(runs[end][0] - cut, remaining)
+            runs[end][0] -= take
+            remaining -= take
+            cut = 0
+            end += 1
+        runs[index:end] = [run for run in runs[index:end] if run[0] > 0]
+        self.length -= length
+        self._merge_around(index, start)
+
+    def set_font(self, start, end, font):
+        """
+        Applies font to the characters in [start, end).
+        """
+        start, end = max(0, start), min(end, self.length)
+        if start >= end:
+            return
+        font = tuple(font)
+        first = self._split(start)
+        last = self._split(end)
+        for run in self.runs[first:last]:
+            run[1] = font
+        self.runs[first:last] = [[end - start, font]]
+        self._hint = (0, 0)
+        self._merge_around(first + 1, end)
+        self._merge_around(first, start)
+
+    def _split(self, offset):
+        """
+        Ensures a run boundary at offset and returns the index of the run
+        starting there.
+        """
+        index, start = self._locate(offset)
+        if offset > start:
+            run = self.runs[index]
+            head = offset - start
+            self.runs[index:index + 1] = [[head, run[1]], [run[0] - head, run[1]]]
+            index += 1
+            self._hint = (index, offset)
+        return index
+
+    def _merge_around(self, index, start):
+        """
+        Merges the run at index with equal-font neighbours; start is its offset.
+        """
+        runs = self.runs
+        if 0 < index < len(runs) and runs[index - 1][1] == runs[index][1]:
+            start -= runs[index - 1][0]
+            runs[index - 1][0] += runs[index][0]
+            del runs[index]
+            index -= 1
+        if 0 <= index < len(runs) - 1 and runs[index][1] == runs[index + 1][1]:
+            runs[index][0] += runs[index + 1][0]
+            del runs[index + 1]
+        self._hint = (index, start) if index < len(runs) else (0, 0)
+
+    def spans(self):
+        """
+        Yields (start, end, font) for every run.
+        """
+        start = 0
+        for length, font in self.runs:
+            yield start, start + length, font
+            start += length
+
+    def font_at(self, offset):
+        """
+        Returns the font of the character at offset (or the last one).
+        """
+        if not self.runs:
+            return self.default_font
+        index, _ = self._locate(min(offset, self.length - 1))
+        return self.runs[min(index, len(self.runs) - 1)][1]
@@ -0,0 +1,236 @@
+import glob
+import itertools
+import json
+import os
+import time
+
+from utils import tdat_format
+from utils.background_worker import atomic_write
+from utils.file_loader import TEXT_ENCODING, file_stat
+
+# Distinguishes the swap files of documents opened by the same process
+_session_numbers = itertools.count(1)
+
+
+class SwapFile:
+    """
+    Crash-recovery journal for the text editor.
+
+    A session keeps two files in the swap directory:
+
+        session-<id>.journal   first line: the base, then one edit per line
+        session-<id>.tdat      snapshot base, written only at checkpoints
+
+    The base is either a reference to a file on disk (right after opening or
+    saving it), an empty document, or a snapshot. Edits reported by the
+    TextObserver are buffered in memory and appended on the worker every
+    flush, so autosave cost is proportional to what was typed. Edits that
+    cannot be journaled (undo/redo) or a journal that grew too long trigger
+    a new snapshot checkpoint. The live session touches its journal on every
+    flush; journals left untouched for a while belong to crashed sessions
+    and are offered for recovery.
+    """
+
+    MAX_JOURNAL_OPS = 5000
+
+    def __init__(self, worker, directory="editor_swap"):
+        self.worker = worker
+        self.directory = directory
+        self.session_id = f"{os.getpid()}-{int(time.time())}-{next(_session_numbers)}"
+        self.journal_path = os.path.join(directory, f"session-{self.session_id}.journal")
+        self.base_path = os.path.join(directory, f"session-{self.session_id}.tdat")
+        self.pending = []
+        self.journal_ops = 0
+        self.needs_checkpoint = False
+        self.paused = False
+        self.rebase_empty()
+
+    # Observer callbacks
+
+    def on_insert(self, offset, text):
+        if not self.paused:
+            self.pending.append(["i", offset, text])
+
+    def on_delete(self, offset, text):
+        if not self.paused:
+            self.pending.append(["d", offset, len(text)])
+
+    def on_reset(self):
+        if not self.paused:
+            self.needs_checkpoint = True
+
+    # Bases
+
+    def _start_journal(self, base):
+        self.pending = []
+        self.journal_ops = 0
+        self.needs_checkpoint = False
+        base = dict(base, time=time.time())
+
+        def write():
+            if base["base"] == "file":
+                # Stat on the worker, after a save queued before this has landed
+                base["stat"] = file_stat(base["path"])
+            line = json.dumps(base) + "\n"
+            os.makedirs(self.directory, exist_ok=True)
+            atomic_write(self.journal_path, lambda tmp: _write_text(tmp, line))
+
+        self.worker.submit(write)
+
+    def rebase_empty(self):
+        self._start_journal({"base": "empty"})
+
+    def rebase_file(self, path):
+        """
+        The document now equals the file at path; journal against it.
+        """
+        self._start_journal({"base": "file", "path": os.path.abspath(path)})
+
+    def checkpoint(self, text, runs, current_font):
+        """
+        Writes a snapshot base and starts a fresh journal on it.
+        """
+        runs = [tuple(run) for run in runs]
+        base_path = self.base_path
+        self.worker.submit(lambda: atomic_write(
+            base_path, lambda tmp: tdat_format.write_tdat(tmp, text, runs, current_font)))
+        self._start_journal({"base": "snapshot", "path": os.path.abspath(base_path)})
+
+    # Periodic work
+
+    def flush(self, snapshot):
+        """
+        Appends buffered edits to the journal, or checkpoints via snapshot()
+        (which returns text, runs, current_font) when the journal is stale.
+        """
+        journal_path = self.journal_path
+        if self.paused:
+            # A long load pauses journaling, not the liveness signal
+            self.worker.submit(lambda: _heartbeat(journal_path))
+            return
+        if self.needs_checkpoint or self.journal_ops + len(self.pending) > self.MAX_JOURNAL_OPS:
+            self.checkpoint(*snapshot())
+            return
+
+        ops, self.pending = self.pending, []
+        self.journal_ops += len(ops)
+
+        def append():
+            if ops:
+                with open(journal_path, "a") as f:
+                    f.write("".join(json.dumps(op) + "\n" for op in ops))
+            else:
+                _heartbeat(journal_path)
+
+        self.worker.submit(append)
+
+    def discard(self):
+        """
+        Removes this session's files (clean exit).
+        """
+        for path in (self.journal_path, self.base_path):
+            self.worker.run_now(_remove_quietly, path)
+
+    # Recovery
+
+    @staticmethod
+    def find_recoverable(directory="editor_swap", stale_seconds=90):
+        """
+        Returns journal paths of sessions that stopped without cleaning up.
+        """
+        now = time.time()
+        journals = []
+        for path in glob.glob(os.path.join(directory, "session-*.journal")):
+            try:
+                if now - os.path.getmtime(path) > stale_seconds:
+                    journals.append(path)
+            except OSError:
+                continue
+        return sorted(journals, key=os.path.getmtime, reverse=True)
+
+    @staticmethod
+    def recover(journal_path):
+        """
+        Rebuilds (text, runs, current_font, source_path, base_changed) from a
+        journal. Runs come from the base; text typed afterwards is left
+        unstyled. base_changed is True if the base file was modified after
+        the journal started, so the replayed edits may land in the wrong
+        places.
+        """
+        with open(journal_path, "r") as f:
+            base = json.loads(f.readline())
+            ops = [json.loads(line) for line in f if line.strip()]
+
+        text, runs, current_font, source_path, base_changed = "", [], None, None, False
+        if base["base"] == "file":
+            source_path = base["path"]
+            base_changed = "stat" in base and file_stat(source_path) != base["stat"]
+            if source_path.endswith(".tdat"):
+                text, runs, current_font = tdat_format.read_tdat(source_path)
+            else:
+                with open(source_path, "r", encoding=TEXT_ENCODING, errors="replace") as f:
+                    text = f.read()
+        elif base["base"] == "snapshot":
+            text, runs, current_font = tdat_format.read_tdat(base["path"])
+
+        # Journals are capped at MAX_JOURNAL_OPS, so replaying on a str is fine
+        for op in ops:
+            offset = min(op[1], len(text))
+            if op[0] == "i":
+                text = text[:offset] + op[2] + text[offset:]
+                runs = _shift_runs(runs, offset, len(op[2]))
+            else:
+                text = text[:offset] + text[offset + op[2]:]
+                runs = _shift_runs(runs, offset, -op[2])
+        return text, runs, current_font, source_path, base_changed
+
+    @staticmethod
+    def remove_session(journal_path):
+        _remove_quietly(journal_path)
+        _remove_quietly(journal_path[:-len(".journal")] + ".tdat")
+
+
+def _write_text(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _heartbeat(journal_path):
+    # Touching the journal marks this session as alive
+    if os.path.exists(journal_path):
+        os.utime(journal_path)
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _shift_runs(runs, offset, delta):
+    """
+    Adjusts [length, font] runs for delta characters inserted (delta > 0,
+    unstyled) or removed (delta < 0) at offset.
+    """
+    result, position = [], 0
+    if delta > 0:
+        inserted = False
+        for length, font_spec in runs:
+            if not inserted and position <= offset < position + length:
+                head = offset - position
+                result += [[head, font_spec], [delta, None], [length - head, font_spec]]
+                inserted = True
+            else:
+                result.append([length, font_spec])
+            position += length
+        if not inserted:
+            result.append([delta, None])
+    else:
+        end = offset - delta
+        for length, font_spec in runs:
+            start, stop = position, position + length
+            kept = length - max(0, min(stop, end) - max(start, offset))
+            result.append([kept, font_spec])
+            position = stop
+    return [run for run in result if run[0] > 0]
@@ -0,0 +1,358 @@
+import os
+import re
+
+# Placeholder for line states that have never been computed; it compares
+# unequal to every real state, so re-lexing cannot converge on it
+UNKNOWN = object()
+
+# Foreground colors for token types; languages emit these type names
+TOKEN_COLORS = {
+    "keyword": "#c678dd",
+    "builtin": "#e5a50a",
+    "string": "#2e9e44",
+    "comment": "#8a8a8a",
+    "number": "#d9534f",
+    "name": "#3b8eea",
+    "decorator": "#d08770",
+    "key": "#3b8eea",
+    "section": "#c678dd",
+    "constant": "#d9534f",
+}
+
+
+class Language:
+    """
+    A line-oriented lexer described by regex rules.
+
+    rules is a sequence of (pattern, token_type) or (pattern, token_type,
+    state) tried together at each position; patterns must not use named
+    groups. A rule with a state opens a construct that may continue onto
+    later lines (a triple-quoted string, a block comment): spans maps each
+    state to (end_pattern, token_type). The lexer state carried from one line
+    to the next is that state name, or None. Subclasses can override
+    lex_line for anything the rule table cannot express.
+    """
+
+    name = "Plain Text"
+    extensions = ()
+    rules = ()
+    spans = {}
+
+    def __init__(self):
+        self._rules = list(self.rules)
+        self._master = None
+        if self._rules:
+            self._master = re.compile("|".join(f"(?P<r{i}>{rule[0]})" for i, rule in enumerate(self._rules)),
+                                      re.MULTILINE)
+        self._ends = {state: (re.compile(pattern), token) for state, (pattern, token) in self.spans.items()}
+
+    def lex_line(self, line, state):
+        """
+        Returns (tokens, end_state) for one line (without its newline), where
+        tokens is a list of (start_col, end_col, token_type).
+        """
+        tokens = []
+        position = 0
+        if state is not None:
+            end_pattern, token = self._ends[state]
+            match = end_pattern.search(line)
+            if match is None:
+                if line:
+                    tokens.append((0, len(line), token))
+                return tokens, state
+            tokens.append((0, match.end(), token))
+            position, state = match.end(), None
+
+        while self._master is not None:
+            match = self._master.search(line, position)
+            if match is None:
+                break
+            rule = self._rules[int(match.lastgroup[1:])]
+            start, end = match.span()
+            if len(rule) > 2:
+                end_pattern, token = self._ends[rule[2]]
+                closing = end_pattern.search(line, end)
+                if closing is None:
+                    tokens.append((start, len(line), token))
+                    return tokens, rule[2]
+                end = closing.end()
+            if end > start:
+                tokens.append((start, end, rule[1]))
+            position = end if end > start else start + 1
+        return tokens, state
+
+
+class PythonLanguage(Language):
+    name = "Python"
+    extensions = (".py", ".pyw")
+    rules = (
+        (r"#.*", "comment"),
+        (r"[rRbBuUfF]{0,2}\"\"\"", "string", '"""'),
+        (r"[rRbBuUfF]{0,2}'''", "string", "'''"),
+        (r"[rRbBuUfF]{0,2}\"(?:\\.|[^\"\\])*\"?", "string"),
+        (r"[rRbBuUfF]{0,2}'(?:\\.|[^'\\])*'?", "string"),
+        (r"@\w+(?:\.\w+)*", "decorator"),
+        (r"\b(?:False|None|True|and|as|assert|async|await|break|class|continue|def|del|elif|else|except|"
+         r"finally|for|from|global|if|import|in|is|lambda|nonlocal|not|or|pass|raise|return|try|while|"
+         r"with|yield|match|case)\b", "keyword"),
+        (r"\b(?:print|len|range|open|str|int|float|list|dict|set|tuple|bool|isinstance|super|self|"
+         r"enumerate|zip|min|max|sorted|getattr|setattr|hasattr|Exception)\b", "builtin"),
+        (r"\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?j?)\b", "number"),
+    )
+    spans = {
+        '"""': (r'(?:\\.|[^\\])*?"""', "string"),
+        "'''": (r"(?:\\.|[^\\])*?'''", "string"),
+    }
+
+
+class JsonLanguage(Language):
+    name = "JSON"
+    extensions = (".json", ".geojson")
+    rules = (
+        (r"\"(?:\\.|[^\"\\])*\"(?=\s*:)", "key"),
+        (r"\"(?:\\.|[^\"\\])*\"?", "string"),
+        (r"\b(?:true|false|null)\b", "constant"),
+        (r"-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b", "number"),
+    )
+
+
+class IniLanguage(Language):
+    name = "INI / Config"
+    extensions = (".ini", ".cfg", ".conf", ".toml", ".properties", ".env")
+    rules = (
+        (r"^\s*[;#].*", "comment"),
+        (r"^\s*\[[^\]\n]*\]", "section"),
+        (r"^\s*[^=:\s;#\[][^=:]*?(?=\s*[=:])", "key"),
+        (r"\"(?:\\.|[^\"\\])*\"?|'[^'\n]*'?", "string"),
+        (r"\b(?:true|false|yes|no|on|off)\b", "constant"),
+        (r"\b\d+(?:\.\d+)?\b", "number"),
+    )
+
+
+class CLikeLanguage(Language):
+    name = "C / Java / JavaScript"
+    extensions = (".c", ".h", ".cpp", ".hpp", ".java", ".js", ".ts", ".css")
+    rules = (
+        (r"//.*", "comment"),
+        (r"/\*", "comment", "/*"),
+        (r"\"(?:\\.|[^\"\\])*\"?|'(?:\\.|[^'\\])*'?|`(?:\\.|[^`\\])*`?", "string"),
+        (r"\b(?:if|else|for|while|do|switch|case|default|break|continue|return|class|struct|enum|"
+         r"public|private|protected|static|final|const|let|var|function|new|this|import|export|"
+         r"try|catch|finally|throw|void|int|long|char|float|double|boolean|typeof|extends)\b", "keyword"),
+        (r"\b(?:true|false|null|undefined|NULL)\b", "constant"),
+        (r"\b(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)[fFlLuU]*\b", "number"),
+    )
+    spans = {"/*": (r"\*/", "comment")}
+
+
+LANGUAGES = []
+
+
+def register_language(language):
+    """
+    Makes a Language instance available to the editor.
+    """
+    LANGUAGES.append(language)
+    return language
+
+
+def language_for_path(path):
+    """
+    Returns the registered language for a file name, or None.
+    """
+    name = os.path.basename(path).lower()
+    for language in LANGUAGES:
+        if any(name.endswith(extension) for extension in language.extensions):
+            return language
+    return None
+
+
+for _language_class in (PythonLanguage, JsonLanguage, IniLanguage, CLikeLanguage):
+    register_language(_language_class())
+
+
+class LineStates:
+    """
+    Lexer state at the start of every line, re-lexed lazily.
+
+    states[i] is the state at the start of line i (0-based) and the last
+    entry is the state after the final line. states[:valid] are known to be
+    correct. An edit only invalidates from its first line; re-lexing then
+    walks forward until it produces the same state the next line already
+    had, past every line edited since, at which point all later states are
+    still correct. changed collects lines whose tokens may differ and need
+    retagging.
+    """
+
+    def __init__(self, language, line_count=1):
+        self.language = language
+        self.reset(line_count)
+
+    def reset(self, line_count):
+        self.states = [None] + [UNKNOWN] * line_count
+        self.valid = 1
+        self.dirty_to = line_count
+        self.changed = set()  # Callers retag everything after a reset
+
+    @property
+    def line_count(self):
+        return len(self.states) - 1
+
+    def edit(self, line, removed, added):
+        """
+        Records an edit on line that removed and added the given numbers of
+        line breaks.
+        """
+        fully_valid = self.valid == len(self.states)
+        if removed:
+            del self.states[line + 1:line + 1 + removed]
+        if added:
+            self.states[line + 1:line + 1] = [UNKNOWN] * added
+        self.valid = min(self.valid, line + 1)
+
+        delta = added - removed
+        if fully_valid:
+            self.dirty_to = line + added
+        else:
+            if self.dirty_to > line:
+                self.dirty_to = max(line, self.dirty_to + delta)
+            self.dirty_to = max(self.dirty_to, line + added)
+
+        if delta:
+            self.changed = {i + delta if i > line else i for i in self.changed
+                            if i <= line or i > line + removed}
+        self.changed.update(range(line, line + added + 1))
+
+    def relex(self, get_line, upto, budget):
+        """
+        Makes states valid through line upto, lexing at most budget lines
+        with get_line(i). Returns True once the states cover upto.
+        """
+        upto = min(upto, self.line_count)
+        while self.valid < len(self.states) and self.valid - 1 < upto:
+            if budget <= 0:
+                return False
+            budget -= 1
+            line = self.valid - 1
+            _, end_state = self.language.lex_line(get_line(line), self.states[line])
+            if end_state == self.states[line + 1] and line > self.dirty_to:
+                self.valid = len(self.states)  # Converged: the rest is unchanged
+                break
+            if end_state != self.states[line + 1]:
+                self.states[line + 1] = end_state
+                self.changed.add(line + 1)
+            self.valid += 1
+        return True
+
+    def tokens(self, line, text):
+        """
+        Returns the tokens of a line whose start state is valid.
+        """
+        return self.language.lex_line(text, self.states[line])[0]
+
+
+class SyntaxHighlighter:
+    """
+    Tags syntax in a Text widget incrementally.
+
+    Edits reported by the TextObserver update a LineStates; the actual work
+    happens once per idle: lex forward to the bottom of the visible region
+    plus MARGIN_LINES, in slices so a long jump never blocks the UI, and
+    then tag only that region. Typing retags just the lines whose tokens
+    changed; scrolling retags the newly visible region.
+    """
+
+    MARGIN_LINES = 40
+    LINES_PER_SLICE = 3000
+
+    def __init__(self, text_area, observer):
+        self.text_area = text_area
+        self.observer = observer
+        self.language = None
+        self.lines = None
+        self.tagged = None  # (first, last) line range currently tagged
+        self._after_id = None
+        for token, color in TOKEN_COLORS.items():
+            self.text_area.tag_configure(f"syntax_{token}", foreground=color)
+
+    def set_language(self, language):
+        """
+        Switches the highlighting language; None turns highlighting off.
+        """
+        self._clear("1.0", "end")
+        self.observer.remove_listener(self)
+        self.language = language
+        self.lines = None
+        self.tagged = None
+        if language is not None:
+            self.lines = LineStates(language, self._line_count())
+            self.observer.add_listener(self)
+            self.schedule()
+
+    # Observer callbacks
+
+    def on_insert(self, offset, text):
+        self.lines.edit(self._line_of(offset), 0, text.count("\n"))
+        self.schedule()
+
+    def on_delete(self, offset, text):
+        self.lines.edit(self._line_of(offset), text.count("\n"), 0)
+        self.schedule()
+
+    def on_reset(self):
+        self.lines.reset(self._line_count())
+        self.tagged = None
+        self.schedule()
+
+    # Work
+
+    def schedule(self):
+        if self.language is not None and self._after_id is None:
+            self._after_id = self.text_area.after_idle(self.update)
+
+    def update(self):
+        self._after_id = None
+        if self.lines is None:
+            return
+        line_count = self._line_count()
+        if line_count != self.lines.line_count:
+            self.lines.reset(line_count)  # Out of step (edit bypassed the observer)
+
+        first = int(self.text_area.index("@0,0").split(".")[0]) - 1
+        last = int(self.text_area.index(f"@0,{self.text_area.winfo_height()}").split(".")[0]) - 1
+        first = max(0, first - self.MARGIN_LINES)
+        last = min(line_count - 1, last + self.MARGIN_LINES)
+
+        if not self.lines.relex(self._get_line, last, self.LINES_PER_SLICE):
+            self._after_id = self.text_area.after(1, self.update)
+            return
+
+        if self.tagged != (first, last):
+            self._clear(f"{first + 1}.0", f"{last + 1}.0 lineend")
+            for line in range(first, last + 1):
+                self._tag_line(line)
+            self.tagged = (first, last)
+        else:
+            for line in sorted(self.lines.changed):
+                if first <= line <= last:
+                    self._clear(f"{line + 1}.0", f"{line + 1}.0 lineend")
+                    self._tag_line(line)
+        self.lines.changed.clear()
+
+    def _tag_line(self, line):
+        index = line + 1
+        for start, end, token in self.lines.tokens(line, self._get_line(line)):
+            self.text_area.tag_add(f"syntax_{token}", f"{index}.{start}", f"{index}.{end}")
+
+    def _clear(self, start, end):
+        for token in TOKEN_COLORS:
+            self.text_area.tag_remove(f"syntax_{token}", start, end)
+
+    def _get_line(self, line):
+        return self.observer.call("get", f"{line + 1}.0", f"{line + 1}.0 lineend")
+
+    def _line_of(self, offset):
+        return int(self.observer.index(offset).split(".")[0]) - 1
+
+    def _line_count(self):
+        return int(self.text_area.index("end - 1c").split(".")[0])
@@ -0,0 +1,211 @@
+"""
+Reading and writing of .tdat styled-text files.
+
+Version 2 is a compact binary layout:
+
+    b"TDAT" | version (1 byte) | flags (1 byte)
+    varint text_chars | varint payload_bytes
+    varint font_count  | font_count x (varint name_len, name utf-8, varint size)
+    varint current_font (index into the font table)
+    varint run_count   | run_count x (varint length_in_chars, varint font index)
+    payload: the text as UTF-8, zlib-compressed when flags & FLAG_ZLIB
+
+Everything before the payload is small, so a loader can read the header,
+then stream the payload in chunks. Version 1 files are the older JSON
+documents ({"text": ..., "tags": [...]} with "line.col" ranges); they are
+still readable and are converted to style runs on load.
+"""
+import json
+import zlib
+
+MAGIC = b"TDAT"
+VERSION = 2
+FLAG_ZLIB = 1
+
+
+def _write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(f):
+    shift = result = 0
+    while True:
+        data = f.read(1)
+        if not data:
+            raise ValueError("Truncated .tdat header")
+        result |= (data[0] & 0x7F) << shift
+        if not data[0] & 0x80:
+            return result
+        shift += 7
+
+
+def is_binary_tdat(path):
+    with open(path, "rb") as f:
+        return f.read(4) == MAGIC
+
+
+def write_tdat(path, text, runs, current_font, compress=True):
+    """
+    Writes text with its [length, (family, size)] style runs as a v2 file.
+    Runs are clipped to the length of text.
+    """
+    fonts, font_ids = [], {}
+
+    def font_id(font_spec):
+        font_spec = (font_spec[0], int(font_spec[1]))
+        if font_spec not in font_ids:
+            font_ids[font_spec] = len(fonts)
+            fonts.append(font_spec)
+        return font_ids[font_spec]
+
+    clipped, remaining = [], len(text)
+    for length, font_spec in runs:
+        length = min(length, remaining)
+        if length <= 0:
+            break
+        clipped.append((length, font_id(font_spec)))
+        remaining -= length
+    current_id = font_id(current_font)
+
+    payload = text.encode("utf-8")
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 6)
+        flags |= FLAG_ZLIB
+
+    header = bytearray(MAGIC)
+    header.append(VERSION)
+    header.append(flags)
+    _write_varint(header, len(text))
+    _write_varint(header, len(payload))
+    _write_varint(header, len(fonts))
+    for family, size in fonts:
+        name = family.encode("utf-8")
+        _write_varint(header, len(name))
+        header += name
+        _write_varint(header, size)
+    _write_varint(header, current_id)
+    _write_varint(header, len(clipped))
+    for length, index in clipped:
+        _write_varint(header, length)
+        _write_varint(header, index)
+
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(payload)
+
+
+def read_header(f):
+    """
+    Reads a v2 header from a binary file object positioned at the start.
+    Returns a dict with fonts, runs, current_font, text_chars, payload_bytes
+    and compressed; the file is left at the start of the payload.
+    """
+    if f.read(4) != MAGIC:
+        raise ValueError("Not a binary .tdat file")
+    version, flags = f.read(2)
+    if version != VERSION:
+        raise ValueError(f"Unsupported .tdat version {version}")
+
+    text_chars = _read_varint(f)
+    payload_bytes = _read_varint(f)
+    fonts = []
+    for _ in range(_read_varint(f)):
+        name = f.read(_read_varint(f)).decode("utf-8")
+        fonts.append((name, _read_varint(f)))
+    current_font = fonts[_read_varint(f)]
+    runs = []
+    for _ in range(_read_varint(f)):
+        length = _read_varint(f)
+        runs.append([length, fonts[_read_varint(f)]])
+
+    return {
+        "fonts": fonts,
+        "runs": runs,
+        "current_font": current_font,
+        "text_chars": text_chars,
+        "payload_bytes": payload_bytes,
+        "compressed": bool(flags & FLAG_ZLIB),
+    }
+
+
+def iter_payload(f, header, chunk_size=256 * 1024):
+    """
+    Yields (bytes_consumed, decoded_bytes) pieces of the payload.
+    """
+    decompressor = zlib.decompressobj() if header["compressed"] else None
+    remaining = header["payload_bytes"]
+    while remaining > 0:
+        data = f.read(min(chunk_size, remaining))
+        if not data:
+            raise ValueError("Truncated .tdat payload")
+        remaining -= len(data)
+        if decompressor:
+            yield len(data), decompressor.decompress(data)
+        else:
+            yield len(data), data
+    if decompressor:
+        tail = decompressor.flush()
+        if tail:
+            yield 0, tail
+
+
+def read_legacy(path):
+    """
+    Reads a version 1 JSON .tdat file. Returns (text, runs, current_font)
+    where runs is a list of [length, (family, size)], or None for
+    characters the file did not style.
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    text = data.get("text", "")
+    tags_data = data.get("tags", [])
+
+    line_starts = [0]
+    position = text.find("\n")
+    while position != -1:
+        line_starts.append(position + 1)
+        position = text.find("\n", position + 1)
+
+    def to_offset(index):
+        line, col = map(int, str(index).split("."))
+        line = min(max(line, 1), len(line_starts))
+        return min(line_starts[line - 1] + col, len(text))
+
+    current_font = None
+    fonts = [None] * len(text)
+    for tag_info in tags_data:
+        font_spec = (tag_info["font_family"], int(tag_info["font_size"]))
+        if tag_info["name"] == "current_font":
+            current_font = font_spec
+        for start, end in tag_info["ranges"]:
+            start, end = to_offset(start), to_offset(end)
+            fonts[start:end] = [font_spec] * (end - start)
+
+    runs = []
+    for font_spec in fonts:
+        if runs and runs[-1][1] == font_spec:
+            runs[-1][0] += 1
+        else:
+            runs.append([1, font_spec])
+    return text, runs, current_font
+
+
+def read_tdat(path):
+    """
+    Reads a whole .tdat file of either version. Returns (text, runs,
+    current_font) like read_legacy.
+    """
+    if not is_binary_tdat(path):
+        return read_legacy(path)
+    with open(path, "rb") as f:
+        header = read_header(f)
+        data = b"".join(piece for _, piece in iter_payload(f, header))
+    return data.decode("utf-8", errors="replace"), header["runs"], header["current_font"]
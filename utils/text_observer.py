@@ -0,0 +1,140 @@
+class TextObserver:
+    """
+    Intercepts a Text widget's insert/delete commands and reports edits as
+    character offsets.
+
+    The widget's Tcl command is renamed and replaced by a Python dispatcher,
+    so every edit (typing, paste, cut, programmatic insert) passes through
+    here. Listeners get on_insert(offset, text), on_delete(offset, text) and
+    on_reset() when the buffer changed in a way that cannot be expressed as a
+    delta (undo/redo). insert_tags, when set, returns the tags to give plain
+    inserts so new text is styled in the same Tk call.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.tk = widget.tk
+        self.listeners = []
+        self.insert_tags = None
+        self._cache = None  # (line, col, offset) of the last edit position
+
+        self.orig = widget._w + "_orig"
+        self.tk.call("rename", widget._w, self.orig)
+        self.tk.createcommand(widget._w, self._dispatch)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def close(self):
+        """
+        Restores the widget's original Tcl command.
+        """
+        self.tk.deletecommand(self.widget._w)
+        self.tk.call("rename", self.orig, self.widget._w)
+
+    def call(self, *args):
+        """
+        Calls the real widget command, bypassing the observer.
+        """
+        return self.tk.call((self.orig,) + args)
+
+    def offset(self, index, remember=True):
+        """
+        Returns the character offset of a Text index. Lookups away from the
+        editing position (viewport queries) pass remember=False so they do
+        not evict the cached edit position.
+        """
+        line, col = map(int, self.call("index", index).split("."))
+        if self._cache and self._cache[0] == line:
+            return self._cache[2] + col - self._cache[1]
+        offset = self._count("1.0", f"{line}.{col}")
+        if remember:
+            self._cache = (line, col, offset)
+        return offset
+
+    def index(self, offset):
+        """
+        Returns the Text index of a character offset, counted from the cached
+        edit position when there is one (cheap for listeners, which are
+        called right after the edit).
+        """
+        if self._cache is None:
+            return self.call("index", f"1.0 + {offset} chars")
+        line, col, cached = self._cache
+        delta = offset - cached
+        if delta >= 0:
+            return self.call("index", f"{line}.{col} + {delta} chars")
+        return self.call("index", f"{line}.{col} - {-delta} chars")
+
+    def count(self, start, end):
+        """
+        Returns the number of characters between two Text indices.
+        """
+        return self._count(start, end)
+
+    def _count(self, start, end):
+        result = self.call("count", "-chars", start, end)
+        if isinstance(result, tuple):
+            result = result[0] if result else 0
+        return int(result or 0)
+
+    def _clamp(self, index):
+        """
+        Normalizes an index, keeping it before the widget's final newline.
+        """
+        index = self.call("index", index)
+        last = self.call("index", "end - 1c")
+        return last if self.tk.getboolean(self.call("compare", index, ">", last)) else index
+
+    def _remember(self, index, offset):
+        line, col = map(int, self.call("index", index).split("."))
+        self._cache = (line, col, offset)
+
+    def _dispatch(self, operation, *args):
+        if operation == "insert" and len(args) >= 2:
+            return self._insert(args)
+        if operation == "delete" and 1 <= len(args) <= 2:
+            return self._delete(args)
+        if operation == "replace" and len(args) >= 3:
+            self._delete(args[:2])
+            return self._insert((args[0],) + args[2:])
+
+        result = self.call(operation, *args)
+        if operation in ("delete", "insert", "replace") or (
+                operation == "edit" and args and args[0] in ("undo", "redo")):
+            self._cache = None
+            for listener in self.listeners:
+                listener.on_reset()
+        return result
+
+    def _insert(self, args):
+        index = self._clamp(args[0])
+        offset = self.offset(index)
+        text = "".join(args[1::2])
+        if self.insert_tags and len(args) == 2:
+            result = self.call("insert", index, args[1], self.insert_tags())
+        else:
+            result = self.call("insert", index, *args[1:])
+        if text:
+            self._cache = None
+            self._remember(f"{index} + {len(text)} chars", offset + len(text))
+            for listener in self.listeners:
+                listener.on_insert(offset, text)
+        return result
+
+    def _delete(self, args):
+        start = self._clamp(args[0])
+        end = self._clamp(args[1]) if len(args) > 1 else self._clamp(f"{start} + 1c")
+        if not self.tk.getboolean(self.call("compare", start, "<", end)):
+            return ""
+        offset = self.offset(start)
+        text = self.call("get", start, end)
+        result = self.call("delete", start, end)
+        self._remember(start, offset)
+        for listener in self.listeners:
+            listener.on_delete(offset, text)
+        return result
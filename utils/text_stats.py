@@ -0,0 +1,92 @@
+def count_text(text):
+    """
+    Returns (lines, words, chars) of a text; words are whitespace-separated.
+    """
+    return text.count("\n") + 1, len(text.split()), len(text)
+
+
+def _words(text):
+    return len(text.split())
+
+
+class TextStats:
+    """
+    Line, word and character counts kept current from edit deltas.
+
+    An edit only looks at the changed text and the character on either side
+    of it: an insert that lands inside a word, or a delete that joins two,
+    is accounted for by counting the words of that small neighbourhood
+    before and after. Undo/redo cannot be expressed as a delta, so it marks
+    the counts stale until the next recount. Recounts run on a snapshot off
+    the Tk thread; edits made while one runs are added on top of its result.
+    """
+
+    def __init__(self, observer, on_change=None):
+        self.observer = observer
+        self.on_change = on_change
+        self.lines, self.words, self.chars = 1, 0, 0
+        self.stale = False
+        self._since_snapshot = None  # deltas since the pending recount's snapshot
+        self._recount_id = 0
+
+    # Observer callbacks
+
+    def on_insert(self, offset, text):
+        before, after = self._context(offset, len(text))
+        words = _words(before + text + after) - _words(before + after)
+        self._add(text.count("\n"), words, len(text))
+
+    def on_delete(self, offset, text):
+        before, after = self._context(offset, 0)
+        words = _words(before + after) - _words(before + text + after)
+        self._add(-text.count("\n"), words, -len(text))
+
+    def on_reset(self):
+        self.stale = True
+        self._since_snapshot = None
+        if self.on_change:
+            self.on_change()
+
+    def _context(self, offset, length):
+        """Returns the characters just before and just after [offset, offset + length)."""
+        start = self.observer.index(offset)
+        end = self.observer.call("index", f"{start} + {length} chars") if length else start
+        return self.observer.call("get", f"{start} - 1c", start), self.observer.call("get", end)
+
+    def _add(self, lines, words, chars):
+        self.lines += lines
+        self.words += words
+        self.chars += chars
+        if self._since_snapshot is not None:
+            self._since_snapshot = [a + b for a, b in zip(self._since_snapshot, (lines, words, chars))]
+        if self.on_change:
+            self.on_change()
+
+    # Recounts
+
+    @property
+    def recounting(self):
+        return self._since_snapshot is not None
+
+    def begin_recount(self):
+        """
+        Call when taking the snapshot to recount; deltas from here on are
+        kept so the result can be brought up to date. Returns the id to pass
+        to finish_recount.
+        """
+        self._recount_id += 1
+        self._since_snapshot = [0, 0, 0]
+        return self._recount_id
+
+    def finish_recount(self, recount_id, counts):
+        """
+        Applies count_text() of the snapshot. Ignored if an undo/redo
+        happened since the snapshot was taken.
+        """
+        if self._since_snapshot is None or recount_id != self._recount_id:
+            return
+        self.lines, self.words, self.chars = (a + b for a, b in zip(counts, self._since_snapshot))
+        self._since_snapshot = None
+        self.stale = False
+        if self.on_change:
+            self.on_change()
@@ -1,30 +1,180 @@
+import weakref
 import tkinter as tk
+from collections import namedtuple
 from tkinter import ttk
 
+Palette = namedtuple("Palette", "bg fg button_bg button_fg")
+
+PALETTES = {
+    "dark": Palette("darkblue", "Black", "darkgray", "black"),
+    "light": Palette("white", "black", "lightgray", "black"),
+}
+
+# Widget role -> Tk classes that take its colors from the option database
+ROLE_CLASSES = {
+    "window": ("Toplevel",),
+    "frame": ("Frame", "Canvas", "Panedwindow", "Labelframe"),
+    "button": ("Button", "Label"),
+    "toggle": ("Checkbutton", "Radiobutton", "Message"),
+    "input": ("Entry", "Text"),
+    "menu": ("Menu",),
+}
+
+# Roles of classic Tk widgets; ttk widgets are themed through ttk.Style instead
+_WIDGET_ROLES = (
+    ((tk.Tk, tk.Toplevel), "window"),
+    ((tk.Frame, tk.Canvas, tk.PanedWindow, tk.LabelFrame), "frame"),
+    ((tk.Button, tk.Label), "button"),
+    ((tk.Checkbutton, tk.Radiobutton, tk.Message), "toggle"),
+    ((tk.Entry, tk.Text), "input"),
+    ((tk.Menu,), "menu"),
+)
+
+# Reconfigures a list of widgets in one call, skipping destroyed ones
+_CONFIGURE_PROC = "::theme_manager::configure"
+_CONFIGURE_SCRIPT = """
+namespace eval ::theme_manager {}
+proc ::theme_manager::configure {widgets args} {
+    foreach w $widgets {
+        if {[winfo exists $w]} { catch {$w configure {*}$args} }
+    }
+}
+"""
+
+
+_shared_manager = None
+
+
+def get_theme_manager():
+    """
+    Returns the process-wide ThemeManager every window and dialog shares.
+    """
+    global _shared_manager
+    if _shared_manager is None:
+        _shared_manager = ThemeManager()
+    return _shared_manager
+
+
+def role_for(widget):
+    """
+    Returns the theme role of a widget, or None for widgets the theme leaves alone.
+    """
+    for classes, role in _WIDGET_ROLES:
+        if isinstance(widget, classes):
+            return role
+    return None
+
 
 class ThemeManager:
     """
     Manages light and dark themes for Tkinter applications.
+
+    Widgets are registered with a role when they are created, so switching
+    themes never walks the widget tree: each role's widgets are reconfigured
+    with a single Tcl call and the option database is updated, so widgets
+    created later without explicit colors match too. The widgets a root
+    already contains when it is first themed are registered once.
+
+    Apps share one manager (get_theme_manager()), so the current theme is
+    the same in every window and dialog. Anything the roles cannot express
+    subscribes to be told once per theme change.
     """
 
     def __init__(self):
         self.current_theme = "dark"  # Default theme
+        self.widgets = {role: weakref.WeakSet() for role in ROLE_CLASSES}
+        self._roots = weakref.WeakSet()
+        self._role_options = {}  # theme -> {role: {resource: color}}
+        self._applied_theme = None  # theme registered widgets currently show
+        self._styled_theme = None  # theme last applied to ttk styles
+        self._subscribers = []  # (callback or WeakMethod, owner widget or None)
+
+    @property
+    def palette(self):
+        """The Palette of the current theme."""
+        return self.get_theme_colors(self.current_theme)
+
+    def subscribe(self, callback, owner=None):
+        """
+        Calls callback(theme, palette) after every theme change. Bound methods
+        are held weakly; with an owner widget the subscription also ends when
+        that widget is destroyed.
+        """
+        if hasattr(callback, "__self__"):
+            callback = weakref.WeakMethod(callback)
+        self._subscribers.append((callback, owner))
+
+    def unsubscribe(self, callback):
+        self._subscribers = [(ref, owner) for ref, owner in self._subscribers
+                             if self._resolve(ref) not in (None, callback)]
+
+    @staticmethod
+    def _resolve(ref):
+        return ref() if isinstance(ref, weakref.WeakMethod) else ref
+
+    def _notify(self, theme):
+        live = []
+        for ref, owner in self._subscribers:
+            callback = self._resolve(ref)
+            if callback is None or (owner is not None and not owner.winfo_exists()):
+                continue
+            live.append((ref, owner))
+            callback(theme, self.get_theme_colors(theme))
+        self._subscribers = live
+
+    def register(self, widget, role=None):
+        """
+        Registers a widget for theme switches under a role (guessed from its
+        class when omitted). Returns the widget.
+        """
+        role = role or role_for(widget)
+        if role is not None:
+            self.widgets[role].add(widget)
+        return widget
+
+    def register_tree(self, widget):
+        """
+        Registers a widget and all of its descendants, e.g. a freshly built
+        view. Returns {role: [widget, ...]} of what was registered.
+        """
+        registered = {}
+        stack = [widget]
+        while stack:
+            widget = stack.pop()
+            role = role_for(widget)
+            if role is not None:
+                self.widgets[role].add(widget)
+                registered.setdefault(role, []).append(widget)
+            stack.extend(widget.winfo_children())
+        return registered
 
     def apply_theme(self, root, theme):
         """
-        Applies the specified theme to the given root window and its child widgets.
+        Applies the specified theme, registering the widgets of the given
+        root window the first time it is seen. Only a real theme change
+        touches every registered widget and notifies subscribers; otherwise
+        just the newly registered widgets are configured.
         """
         self.current_theme = theme
-        bg_color, fg_color, button_bg, button_fg = self.get_theme_colors(theme)
+        new_widgets = {}
+        if root not in self._roots:
+            self._roots.add(root)
+            new_widgets = self.register_tree(root)
 
-        # Apply theme to root window
-        root.config(bg=bg_color)
-
-        # Apply theme to child widgets recursively
-        self._apply_theme_to_children(root, bg_color, fg_color, button_bg, button_fg)
+        changed = theme != self._applied_theme
+        self._applied_theme = theme
+        # A new root may belong to another Tcl interpreter, whose option database is still unset
+        self._configure(self.widgets if changed else new_widgets, theme,
+                        option_database=changed or bool(new_widgets))
 
         # Apply theme to ttk widgets using ttk.Style
-        self._apply_ttk_theme(bg_color, fg_color, button_bg, button_fg)
+        if theme != self._styled_theme:
+            self._styled_theme = theme
+            bg_color, fg_color, button_bg, button_fg = self.get_theme_colors(theme)
+            self._apply_ttk_theme(root, bg_color, fg_color, button_bg, button_fg)
+
+        if changed:
+            self._notify(theme)
 
     def toggle_theme(self, root):
         """
@@ -35,54 +185,65 @@ class ThemeManager:
 
     def get_theme_colors(self, theme):
         """
-        Returns color settings based on the theme.
+        Returns the (bg, fg, button_bg, button_fg) Palette of a theme.
         """
-        if theme == "dark":
-            return "darkblue", "Black", "darkgray", "black"
-        else:
-            return "white", "black", "lightgray", "black"
+        return PALETTES.get(theme, PALETTES["light"])
 
-    def _apply_theme_to_children(self, widget, bg_color, fg_color, button_bg, button_fg):
+    def role_options(self, theme):
         """
-        Recursively applies the theme to all Tkinter widgets.
+        Returns {role: {resource name: color}} for a theme, computed once per theme.
         """
-        for child in widget.winfo_children():
-            # Skip ttk widgets (handled separately)
-            if isinstance(child, (ttk.Combobox, ttk.Button, ttk.Entry, ttk.Label, ttk.Frame)):
-                continue
-
-            # Apply background color universally
-            if isinstance(child, (tk.Frame, tk.Canvas, tk.PanedWindow, tk.LabelFrame)):
-                child.config(bg=bg_color)
-
-            # Apply text-based foreground color
-            if isinstance(child, (tk.Button, tk.Checkbutton, tk.Radiobutton, tk.Message)):
-                child.config(bg=bg_color, fg=fg_color)
-
-            # Ensure input fields (Entry, Text) have correct colors
-            if isinstance(child, tk.Entry):
-                child.config(bg=button_bg, fg=fg_color, insertbackground=fg_color)
-            elif isinstance(child, tk.Text):
-                child.config(bg=button_bg, fg=fg_color, insertbackground=fg_color)
-
-            # Apply styling to menu widgets
-            if isinstance(child, tk.Menu):
-                child.config(bg=button_bg, fg=fg_color)
-
-            # Apply button-specific colors
-            if isinstance(child, (tk.Label, tk.Button)):
-                child.config(bg=button_bg, fg=button_fg, activebackground=button_bg, activeforeground=button_fg)
-
-            # Recursively apply theme to children
-            self._apply_theme_to_children(child, bg_color, fg_color, button_bg, button_fg)
+        options = self._role_options.get(theme)
+        if options is None:
+            bg_color, fg_color, button_bg, button_fg = self.get_theme_colors(theme)
+            options = {
+                "window": {"background": bg_color},
+                "frame": {"background": bg_color},
+                "button": {"background": button_bg, "foreground": button_fg,
+                           "activeBackground": button_bg, "activeForeground": button_fg},
+                "toggle": {"background": bg_color, "foreground": fg_color},
+                "input": {"background": button_bg, "foreground": fg_color, "insertBackground": fg_color},
+                "menu": {"background": button_bg, "foreground": fg_color},
+            }
+            self._role_options[theme] = options
+        return options
+
+    def _configure(self, widgets, theme, option_database=True):
+        """
+        Configures {role: widgets} with one call per role and Tcl interpreter.
+        """
+        options = self.role_options(theme)
+        paths = {}  # Tcl interpreter -> {role: [widget path, ...]}
+        for role, role_widgets in widgets.items():
+            for widget in list(role_widgets):
+                paths.setdefault(widget.tk, {}).setdefault(role, []).append(widget._w)
 
+        for interp, roles in paths.items():
+            self._configure_roles(interp, roles, options, option_database)
 
-    def _apply_ttk_theme(self, bg_color, fg_color, button_bg, button_fg):
+    def _configure_roles(self, interp, roles, options, option_database):
+        """
+        One configure call per role for the widgets of one Tcl interpreter,
+        plus the option database entries for the role's widget classes.
+        """
+        if not interp.call("info", "commands", _CONFIGURE_PROC):
+            interp.eval(_CONFIGURE_SCRIPT)
+        for role, role_options in options.items():
+            if option_database:
+                for widget_class in ROLE_CLASSES[role]:
+                    for resource, color in role_options.items():
+                        interp.call("option", "add", f"*{widget_class}.{resource}", color)
+            if role in roles:
+                args = []
+                for resource, color in role_options.items():
+                    args += ["-" + resource.lower(), color]
+                interp.call(_CONFIGURE_PROC, tuple(roles[role]), *args)
+
+    def _apply_ttk_theme(self, root, bg_color, fg_color, button_bg, button_fg):
         """
         Applies the theme to ttk widgets using ttk.Style.
         """
-        style = ttk.Style()
+        style = ttk.Style(root)
         style.configure("TCombobox", fieldbackground=bg_color, foreground=fg_color, background=bg_color)
         style.configure("TButton", background=button_bg, foreground=button_fg)
         style.configure("TEntry", fieldbackground=bg_color, foreground=fg_color)
-
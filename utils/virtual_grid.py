@@ -0,0 +1,156 @@
+import tkinter as tk
+
+
+class VirtualGrid:
+    """
+    A scrollable grid of tiles that only creates widgets for the visible rows.
+
+    Tiles are plain tk.Labels placed on a Canvas. When the view scrolls, the
+    tiles that leave the viewport are handed to the rows that enter it, so the
+    number of live widgets stays bounded by the window size rather than by the
+    number of items.
+    """
+
+    def __init__(self, parent, render_tile, columns=3, tile_width=20, tile_height=6,
+                 row_height=None, padding=5, bg=None, on_click=None, on_double_click=None,
+                 theme_manager=None):
+        """
+        render_tile(label, item) configures a recycled label for the given item.
+        tile_width / tile_height are in text units, like tk.Label width/height.
+        The frame, canvas and pooled tiles are registered with theme_manager.
+        """
+        self.render_tile = render_tile
+        self.columns = columns
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.padding = padding
+        self.on_click = on_click
+        self.on_double_click = on_double_click
+        self.theme_manager = theme_manager
+
+        self.items = []
+        self.tiles = []  # Pool of (window_id, label)
+        self._first_row = None
+
+        self.frame = tk.Frame(parent, bg=bg)
+        self.canvas = tk.Canvas(self.frame, bg=bg, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        if theme_manager:
+            theme_manager.register(self.frame, "frame")
+            theme_manager.register(self.canvas, "frame")
+
+        # Measure one tile so the layout is known before any item is shown
+        probe = tk.Label(self.canvas, text="", width=tile_width, height=tile_height,
+                         relief="solid", borderwidth=1)
+        self.cell_width = probe.winfo_reqwidth() + 2 * padding
+        self.row_height = row_height or probe.winfo_reqheight() + 2 * padding
+        probe.destroy()
+        self.canvas.configure(yscrollincrement=self.row_height)
+
+        self.canvas.bind("<Configure>", lambda event: self._layout(force=True))
+        for widget in (self.canvas, self.frame):
+            widget.bind("<MouseWheel>", self._on_mousewheel)
+            widget.bind("<Button-4>", lambda event: self.scroll(-1, "units"))
+            widget.bind("<Button-5>", lambda event: self.scroll(1, "units"))
+        self.canvas.bind("<Prior>", lambda event: self.scroll(-1, "pages"))
+        self.canvas.bind("<Next>", lambda event: self.scroll(1, "pages"))
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def destroy(self):
+        self.frame.destroy()
+
+    def set_items(self, items):
+        """
+        Replaces the items shown by the grid and scrolls back to the top.
+        """
+        self.items = list(items)
+        rows = self._row_count()
+        self.canvas.configure(scrollregion=(0, 0, self.columns * self.cell_width, rows * self.row_height))
+        self.canvas.yview_moveto(0)
+        self._layout(force=True)
+
+    def refresh_visible(self):
+        """
+        Re-renders the tiles currently on screen (e.g. after a selection change).
+        """
+        self._layout(force=True)
+
+    def scroll(self, amount, what="units"):
+        self.canvas.yview_scroll(amount, what)
+        self._layout()
+
+    def _row_count(self):
+        return (len(self.items) + self.columns - 1) // self.columns
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self._layout()
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._layout()
+
+    def _on_mousewheel(self, event):
+        self.scroll(-1 if event.delta > 0 else 1, "units")
+
+    def _layout(self, force=False):
+        """
+        Places pooled tiles over the rows intersecting the viewport.
+        """
+        rows = self._row_count()
+        view_height = max(self.canvas.winfo_height(), self.row_height)
+        top = self.canvas.canvasy(0)
+        first_row = max(0, int(top // self.row_height))
+        if first_row == self._first_row and not force:
+            return
+        self._first_row = first_row
+
+        visible_rows = int(view_height // self.row_height) + 2
+        last_row = min(rows, first_row + visible_rows)
+        needed = (last_row - first_row) * self.columns
+        self._grow_pool(min(needed, len(self.items)))
+
+        # Center the grid horizontally like the old packed layout
+        offset_x = max(0, (self.canvas.winfo_width() - self.columns * self.cell_width) // 2)
+
+        slot = 0
+        for row in range(first_row, last_row):
+            for column in range(self.columns):
+                index = row * self.columns + column
+                if index >= len(self.items):
+                    break
+                window_id, label = self.tiles[slot]
+                label.item = self.items[index]
+                self.render_tile(label, label.item)
+                self.canvas.coords(window_id,
+                                   offset_x + column * self.cell_width + self.padding,
+                                   row * self.row_height + self.padding)
+                self.canvas.itemconfigure(window_id, state="normal")
+                slot += 1
+
+        # Hide whatever the current viewport does not need
+        for window_id, label in self.tiles[slot:]:
+            self.canvas.itemconfigure(window_id, state="hidden")
+            label.item = None
+
+    def _grow_pool(self, count):
+        while len(self.tiles) < count:
+            label = tk.Label(self.canvas, width=self.tile_width, height=self.tile_height,
+                             relief="solid", borderwidth=1, cursor="hand2", wraplength=250)
+            label.item = None
+            if self.theme_manager:
+                self.theme_manager.register(label, "button")
+            if self.on_click:
+                label.bind("<Button-1>", lambda event, lbl=label: lbl.item is not None and self.on_click(lbl, lbl.item))
+            if self.on_double_click:
+                label.bind("<Double-Button-1>", lambda event, lbl=label: lbl.item is not None and self.on_double_click(lbl, lbl.item))
+            label.bind("<MouseWheel>", self._on_mousewheel)
+            label.bind("<Button-4>", lambda event: self.scroll(-1, "units"))
+            label.bind("<Button-5>", lambda event: self.scroll(1, "units"))
+            window_id = self.canvas.create_window(0, 0, window=label, anchor=tk.NW, state="hidden")
+            self.tiles.append((window_id, label))